@@ -9,12 +9,22 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from all_tests.test_domain import TestPenguin, TestPenguinValidator
-from all_tests.test_repo import TestPenguinRepo
+from all_tests.test_repo import (
+    TestPenguinRepo, TestPenguinTable, TestBitmapIndex, TestRunningStats,
+    TestPenguinRepoFile
+)
 from all_tests.test_service import (
     TestPenguinServiceFilter,
     TestPenguinServiceDescribe,
     TestPenguinServiceUnique,
-    TestPenguinServiceSort
+    TestPenguinServiceSort,
+    TestPenguinServiceGroupBy,
+    TestClassifierService,
+    TestOrderStatistics,
+    TestKllSketch,
+    TestPenguinServiceQuery,
+    TestSortEngines,
+    TestAugmentToFile
 )
 
 
@@ -30,12 +40,23 @@ def run_all_tests():
 
     # Add repository tests
     suite.addTests(loader.loadTestsFromTestCase(TestPenguinRepo))
+    suite.addTests(loader.loadTestsFromTestCase(TestPenguinTable))
+    suite.addTests(loader.loadTestsFromTestCase(TestBitmapIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunningStats))
+    suite.addTests(loader.loadTestsFromTestCase(TestPenguinRepoFile))
 
     # Add service tests
     suite.addTests(loader.loadTestsFromTestCase(TestPenguinServiceFilter))
     suite.addTests(loader.loadTestsFromTestCase(TestPenguinServiceDescribe))
     suite.addTests(loader.loadTestsFromTestCase(TestPenguinServiceUnique))
     suite.addTests(loader.loadTestsFromTestCase(TestPenguinServiceSort))
+    suite.addTests(loader.loadTestsFromTestCase(TestPenguinServiceGroupBy))
+    suite.addTests(loader.loadTestsFromTestCase(TestClassifierService))
+    suite.addTests(loader.loadTestsFromTestCase(TestOrderStatistics))
+    suite.addTests(loader.loadTestsFromTestCase(TestKllSketch))
+    suite.addTests(loader.loadTestsFromTestCase(TestPenguinServiceQuery))
+    suite.addTests(loader.loadTestsFromTestCase(TestSortEngines))
+    suite.addTests(loader.loadTestsFromTestCase(TestAugmentToFile))
 
     # Run tests with verbosity
     runner = unittest.TextTestRunner(verbosity=2)
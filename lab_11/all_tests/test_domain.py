@@ -50,6 +50,38 @@ class TestPenguin(unittest.TestCase):
         with self.assertRaises(AttributeError):
             penguin.get_attribute('invalid_attr')
 
+    def test_penguin_get_attribute_all(self):
+        """Test every attribute name resolves to the matching getter"""
+        penguin = Penguin("Gentoo", 220.0, 47.5, 15.0, 5500.0, "Biscoe", "FEMALE")
+
+        self.assertEqual([penguin.get_attribute(a) for a in Penguin.get_all_attributes()],
+                         list(penguin.to_dict().values()))
+
+    def test_penguin_get_attribute_after_setter(self):
+        """Test get_attribute sees values changed through setters"""
+        penguin = Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE")
+        penguin.set_island("Dream")
+
+        self.assertEqual(penguin.get_attribute('island'), "Dream")
+
+    def test_penguin_attribute_getter(self):
+        """Test attribute getter works as a key function"""
+        penguins = [
+            Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE"),
+            Penguin("Gentoo", 220.0, 47.5, 15.0, 3000.0, "Biscoe", "FEMALE"),
+        ]
+        getter = Penguin.get_attribute_getter('body_mass_g')
+
+        self.assertEqual(min(penguins, key=getter).get_species(), "Gentoo")
+        with self.assertRaises(AttributeError):
+            Penguin.get_attribute_getter('invalid_attr')
+
+    def test_penguin_has_no_instance_dict(self):
+        """Test penguins use __slots__ (no per-object __dict__)"""
+        penguin = Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE")
+
+        self.assertFalse(hasattr(penguin, '__dict__'))
+
     def test_penguin_to_dict(self):
         """Test converting penguin to dictionary"""
         penguin = Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE")
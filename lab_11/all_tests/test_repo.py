@@ -1,9 +1,20 @@
 """
 Tests for Repository layer - PenguinRepo
 """
+import os
+import shutil
+import statistics
+import tempfile
 import unittest
+from array import array
 from domain.penguin import Penguin
+from domain.exceptions import FileNotFoundException, InvalidFileFormatException
+from repository.bitmap_index import BitmapIndex
 from repository.penguin_repo import PenguinRepo
+from repository.penguin_repo_file import PenguinRepoFile
+from repository.penguin_table import PenguinTable
+from repository.running_stats import RunningStats
+from repository.sorted_index import SortedIndex
 
 
 class TestPenguinRepo(unittest.TestCase):
@@ -77,6 +88,490 @@ class TestPenguinRepo(unittest.TestCase):
         self.assertIn("Adelie", species_values)
         self.assertIn("Gentoo", species_values)
 
+    def test_get_all_penguins_rebuilt_after_change(self):
+        """Test cached penguin list follows repository changes"""
+        self.repo.add_penguin(self.penguin1)
+        self.assertEqual(self.repo.get_all_penguins(), [self.penguin1])
+
+        self.repo.add_penguin(self.penguin2)
+        self.assertEqual(self.repo.get_all_penguins(), [self.penguin1, self.penguin2])
+
+    def test_count_values(self):
+        """Test counting values of an attribute"""
+        self.repo.add_all([self.penguin1, self.penguin2, self.penguin3, self.penguin1])
+
+        self.assertEqual(self.repo.count_values('sex'), {'MALE': 3, 'FEMALE': 1})
+        self.assertEqual(self.repo.count_values('body_mass_g'), {3750.0: 2, 4950.0: 1, 3950.0: 1})
+
+    def test_filter_range(self):
+        """Test range filter is inclusive and keeps repository order"""
+        self.repo.add_all([self.penguin2, self.penguin1, self.penguin3, self.penguin1])
+
+        result = self.repo.get_penguins_in_range('body_mass_g', 3750.0, 3950.0)
+
+        self.assertEqual(result, [self.penguin1, self.penguin3, self.penguin1])
+        self.assertEqual(self.repo.get_penguins_in_range('body_mass_g', 4000.0, 3000.0), [])
+
+    def test_filter_conjunction(self):
+        """Test AND of string equalities"""
+        self.repo.add_all([self.penguin1, self.penguin2, self.penguin3])
+        self.repo.add_all([self.penguin1])
+
+        self.assertEqual(self.repo.get_penguins_matching({'species': 'Adelie', 'sex': 'MALE'}),
+                         [self.penguin1, self.penguin1])
+        self.assertEqual(self.repo.count_matching({'sex': 'MALE', 'island': 'Dream'}), 1)
+        self.assertEqual(self.repo.get_penguins_matching({'species': 'Emperor'}), [])
+
+    def test_bitmaps_follow_table_replacement(self):
+        """Test bitmap indexes are rebuilt when the table is replaced"""
+        self.repo.add_all([self.penguin1, self.penguin2])
+        table = PenguinTable()
+        table.extend([self.penguin3, self.penguin3, self.penguin2])
+        self.repo.set_table(table)
+
+        self.assertEqual(self.repo.count_values('species'), {'Chinstrap': 2, 'Gentoo': 1})
+        self.assertEqual(self.repo.get_penguins_by_filter('island', 'Biscoe', False), [self.penguin2])
+
+        self.repo.clear()
+        self.assertEqual(self.repo.count_values('species'), {})
+
+    def test_aggregates_follow_changes(self):
+        """Test running aggregates are updated on add and rebuilt after replacement"""
+        self.repo.add_all([self.penguin1, self.penguin2])
+        stats = self.repo.get_aggregates('body_mass_g')
+        self.assertEqual((stats.get_count(), stats.get_min(), stats.get_max()), (2, 3750.0, 4950.0))
+
+        self.repo.add_penguin(self.penguin3)
+        self.assertEqual(self.repo.get_aggregates('body_mass_g').get_sum(), 12650.0)
+
+        self.repo.set_penguins([self.penguin3])
+        stats = self.repo.get_aggregates('body_mass_g')
+        self.assertEqual((stats.get_count(), stats.get_mean()), (1, 3950.0))
+
+    def test_group_rows(self):
+        """Test rows are grouped by one or several attributes"""
+        self.repo.add_all([self.penguin1, self.penguin2, self.penguin3, self.penguin1])
+
+        self.assertEqual(self.repo.group_rows(['sex']), {('MALE',): [0, 2, 3], ('FEMALE',): [1]})
+        self.assertEqual(self.repo.group_rows(['species', 'body_mass_g']),
+                         {('Adelie', 3750.0): [0, 3], ('Gentoo', 4950.0): [1], ('Chinstrap', 3950.0): [2]})
+        self.assertEqual(self.repo.group_values(['sex'], 'flipper_length_mm'),
+                         {('MALE',): [181.0, 195.0, 181.0], ('FEMALE',): [217.0]})
+
+    def test_sorted_index_invalidated_on_change(self):
+        """Test threshold filters see penguins added after the index was built"""
+        self.repo.add_all([self.penguin1, self.penguin2])
+        self.assertEqual(self.repo.get_penguins_by_filter('flipper_length_mm', 190.0, True),
+                         [self.penguin2])
+
+        self.repo.add_all([self.penguin3])
+        self.assertEqual(self.repo.get_penguins_by_filter('flipper_length_mm', 190.0, True),
+                         [self.penguin2, self.penguin3])
+
+        self.repo.set_penguins([self.penguin1])
+        self.assertEqual(self.repo.get_penguins_by_filter('flipper_length_mm', 190.0, True), [])
+
+
+    def test_appends_extend_caches(self):
+        """Test single adds between reads extend the cached penguins and sorted index instead of rebuilding"""
+        import random
+        rng = random.Random(4)
+        self.repo.add_all([self.penguin1, self.penguin2])
+        cached = self.repo.get_all_penguins()
+        index = self.repo.get_sorted_index('body_mass_g')
+        added = []
+        for step in range(100):
+            penguin = Penguin("Adelie", 190.0, 40.0, 18.0, float(rng.randrange(3000, 3100, 10)), "Dream", "MALE")
+            if step % 3:
+                self.repo.add_penguin(penguin)
+                added.append(penguin)
+            else:
+                batch = [penguin] * 40
+                self.repo.add_all(batch)
+                added.extend(batch)
+            self.assertIs(self.repo.get_all_penguins(), cached)
+            self.assertIs(self.repo.get_sorted_index('body_mass_g'), index)
+
+        self.assertEqual(self.repo.get_all_penguins(), [self.penguin1, self.penguin2] + added)
+        rebuilt = SortedIndex(self.repo.get_numeric_column('body_mass_g'))
+        self.assertEqual(index.get_values(), rebuilt.get_values())
+        for low in range(3000, 3100, 10):
+            self.assertEqual(index.rows_between(low, low + 15), rebuilt.rows_between(low, low + 15))
+        self.assertEqual(self.repo.get_penguins_in_range('body_mass_g', 3000.0, 3020.0),
+                         [p for p in self.repo.get_all_penguins() if 3000.0 <= p.get_body_mass_g() <= 3020.0])
+
+class TestPenguinTable(unittest.TestCase):
+    """Test cases for the columnar PenguinTable"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.table = PenguinTable()
+        self.penguin1 = Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE")
+        self.penguin2 = Penguin("Gentoo", 217.0, 46.1, 13.2, 4950.0, "Biscoe", "FEMALE")
+        self.table.extend([self.penguin1, self.penguin2, self.penguin1])
+
+    def test_round_trip_rows(self):
+        """Test rows come back equal to the penguins that were added"""
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.get_row(0), self.penguin1)
+        self.assertEqual(self.table.get_row(1), self.penguin2)
+        self.assertEqual(list(self.table.iter_rows()), [self.penguin1, self.penguin2, self.penguin1])
+
+    def test_string_columns_dictionary_encoded(self):
+        """Test string columns store one code per row and one entry per value"""
+        self.assertEqual(self.table.get_dictionary('species'), ["Adelie", "Gentoo"])
+        self.assertEqual(list(self.table.get_codes('species')), [0, 1, 0])
+
+    def test_numeric_column_buffer(self):
+        """Test numeric columns are contiguous double arrays"""
+        column = self.table.get_numeric_column('body_mass_g')
+
+        self.assertEqual(column.typecode, 'd')
+        self.assertEqual(list(column), [3750.0, 4950.0, 3750.0])
+
+    def test_find_rows(self):
+        """Test numeric and string filters return row indices"""
+        self.assertEqual(self.table.find_rows('body_mass_g', 4000.0, True), [1])
+        self.assertEqual(self.table.find_rows('species', 'Adelie', False), [0, 2])
+        self.assertEqual(self.table.find_rows('species', 'Chinstrap', False), [])
+
+    def test_invalid_attribute(self):
+        """Test unknown attributes raise AttributeError"""
+        with self.assertRaises(AttributeError):
+            self.table.get_values('invalid_attr')
+
+    def test_many_distinct_values_widen_codes(self):
+        """Test code column grows past one byte per value"""
+        table = PenguinTable()
+        for i in range(300):
+            table.append(Penguin(f"Species{i}", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE"))
+
+        self.assertEqual(table.get_value('species', 299), "Species299")
+        self.assertEqual(table.get_value('species', 3), "Species3")
+        self.assertEqual(len(table.count_values('species')), 300)
+
+
+class TestBitmapIndex(unittest.TestCase):
+    """Test cases for BitmapIndex"""
+
+    def test_chunks_match_single_build(self):
+        """Test indexing in chunks gives the same bitsets as one pass"""
+        codes = array('B', [i * 7 % 3 for i in range(1000)])
+        whole = BitmapIndex()
+        whole.extend(codes)
+        chunked = BitmapIndex()
+        for start in range(0, len(codes), 128):
+            chunked.extend(codes[start:start + 128])
+
+        for code in range(3):
+            self.assertEqual(chunked.get_bitmap(code), whole.get_bitmap(code))
+            self.assertEqual(BitmapIndex.to_rows(whole.get_bitmap(code)),
+                             [i for i, c in enumerate(codes) if c == code])
+        self.assertEqual(whole.counts(), {code: codes.count(code) for code in range(3)})
+
+    def test_wide_codes(self):
+        """Test two-byte codes are indexed too"""
+        codes = array('H', [300, 5, 300, 0])
+        index = BitmapIndex()
+        index.extend(codes)
+
+        self.assertEqual(BitmapIndex.to_rows(index.get_bitmap(300)), [0, 2])
+        self.assertEqual(index.count(5), 1)
+        self.assertEqual(BitmapIndex.to_rows(0), [])
+
+    def test_single_row_appends_are_batched(self):
+        """Test buffered single-row appends give the same bitsets as one pass"""
+        codes = array('B', [i * 5 % 4 for i in range(BitmapIndex.BATCH_ROWS + 300)])
+        whole = BitmapIndex()
+        whole.extend(codes)
+        single = BitmapIndex()
+        for position, code in enumerate(codes):
+            single.extend(codes[position:position + 1])
+            if position in (10, BitmapIndex.BATCH_ROWS + 100):
+                self.assertEqual(single.count(1), codes[:position + 1].count(1))
+
+        self.assertEqual(len(single), len(codes))
+        for code in range(4):
+            self.assertEqual(single.get_bitmap(code), whole.get_bitmap(code))
+        single.extend(array('H', [300]))
+        self.assertEqual(single.counts()[300], 1)
+        self.assertEqual(BitmapIndex.to_rows(single.get_bitmap(300)), [len(codes)])
+
+
+class TestRunningStats(unittest.TestCase):
+    """Test cases for RunningStats"""
+
+    def test_chunks_match_statistics_module(self):
+        """Test chunked updates give the same results as one pass"""
+        values = [3000.0 + (i * 37) % 1700 for i in range(500)]
+        stats = RunningStats()
+        for start in range(0, len(values), 64):
+            stats.update(values[start:start + 64])
+
+        self.assertEqual(stats.get_count(), 500)
+        self.assertEqual((stats.get_min(), stats.get_max()), (min(values), max(values)))
+        self.assertAlmostEqual(stats.get_mean(), statistics.fmean(values))
+        self.assertAlmostEqual(stats.get_variance(), statistics.variance(values), places=6)
+        self.assertAlmostEqual(stats.get_stddev(sample=False), statistics.pstdev(values), places=6)
+
+    def test_empty(self):
+        """Test an empty summary"""
+        stats = RunningStats.from_values([])
+
+        self.assertEqual((stats.get_count(), stats.get_mean(), stats.get_variance()), (0, 0.0, 0.0))
+
+
+class TestPenguinRepoFile(unittest.TestCase):
+    """Test cases for CSV loading in PenguinRepoFile"""
+
+    def setUp(self):
+        """Create a temporary data directory with a preprocessed and a raw file"""
+        self.directory = tempfile.mkdtemp()
+        self.file_repo = PenguinRepoFile(self.directory)
+        self.penguins = [
+            Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE"),
+            Penguin("Gentoo", 217.0, 46.1, 13.2, 4950.0, "Biscoe", "FEMALE"),
+            Penguin("Chinstrap", 195.0, 49.0, 19.5, 3950.0, "Dream", "MALE"),
+        ]
+        self.file_repo.save_to_file("clean.csv", self.penguins)
+
+        with open(os.path.join(self.directory, "raw.csv"), 'w', encoding='utf-8') as f:
+            f.write("Sample,Species,Island,Culmen Length (mm),Culmen Depth (mm),"
+                    "Flipper Length (mm),Body Mass (g),Sex\n")
+            f.write("1,Adelie Penguin (Pygoscelis adeliae),Torgersen,39.1,18.7,181,3750,male\n")
+            f.write("2,Gentoo penguin (Pygoscelis papua),Biscoe,NA,13.2,217,4950,FEMALE\n")
+            f.write("3,Chinstrap penguin (Pygoscelis antarctica),Dream,49.0,19.5,195,3950,MALE\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_load_from_file(self):
+        """Test loading a preprocessed file"""
+        self.assertEqual(self.file_repo.load_from_file("clean.csv"), self.penguins)
+
+    def test_iter_penguins_raw_format(self):
+        """Test raw column names are mapped and invalid rows are skipped"""
+        loaded = list(self.file_repo.iter_penguins("raw.csv"))
+
+        self.assertEqual(loaded, [self.penguins[0], self.penguins[2]])
+
+    def test_iter_penguins_chunks(self):
+        """Test chunked iteration yields lists of at most chunk_size penguins"""
+        chunks = list(self.file_repo.iter_penguins("clean.csv", chunk_size=2))
+
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual(chunks[0] + chunks[1], self.penguins)
+
+    def test_iter_measurements(self):
+        """Test measurement rows keep their values and unparsable measurements give no point"""
+        attributes = ('culmen_length_mm', 'flipper_length_mm')
+        header, chunks = self.file_repo.iter_measurements("raw.csv", attributes, chunk_size=2)
+        chunks = list(chunks)
+
+        self.assertEqual(header[1], "Species")
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual([point for chunk in chunks for _, point in chunk], [(39.1, 181.0), None, (49.0, 195.0)])
+        self.assertEqual(chunks[0][0][0][0], "1")
+        with self.assertRaises(InvalidFileFormatException):
+            self.file_repo.iter_measurements("raw.csv", ('culmen_length_mm', 'missing_mm'), 2)
+
+    def test_preprocess_parallel_matches_serial(self):
+        """Test parallel preprocessing writes exactly the serial output"""
+        with open(os.path.join(self.directory, "export.csv"), 'w', encoding='utf-8', newline='') as f:
+            f.write("species,island,culmen_length_mm,culmen_depth_mm,flipper_length_mm,body_mass_g,sex\r\n")
+            for i in range(200):
+                mass = "NA" if i % 7 == 0 else str(3000 + i)
+                f.write(f"Adelie,Dream,{39 + i % 5}.1,18.{i % 10},{180 + i % 20},{mass},male\r\n")
+                if i % 50 == 0:
+                    f.write("\r\n")
+
+        count = self.file_repo.preprocess_raw_data("export.csv", "serial.csv")
+        report = self.file_repo.preprocess_raw_data_parallel("export.csv", "parallel.csv",
+                                                             workers=2, chunks_per_worker=3)
+
+        with open(os.path.join(self.directory, "serial.csv"), 'rb') as f:
+            serial = f.read()
+        with open(os.path.join(self.directory, "parallel.csv"), 'rb') as f:
+            parallel = f.read()
+        self.assertEqual(parallel, serial)
+        self.assertEqual(report['rows'], count)
+        self.assertEqual(report['rejected'], 29)
+        self.assertEqual(sum(c['rows'] for c in report['chunks']), count)
+        self.assertGreater(len(report['chunks']), 1)
+
+    def test_preprocess_failure_keeps_previous_output(self):
+        """Test a preprocessing run that fails midway leaves no partial output"""
+        with open(os.path.join(self.directory, "raw.csv"), 'ab') as f:
+            f.write(b"4,Adelie,Dream,39.1,18.7,181,\xff\xfe,male\n")
+        self.file_repo.save_to_file("out.csv", self.penguins)
+        with open(os.path.join(self.directory, "out.csv"), 'rb') as f:
+            previous = f.read()
+
+        with self.assertRaises(UnicodeDecodeError):
+            self.file_repo.preprocess_raw_data("raw.csv", "out.csv")
+        with self.assertRaises(UnicodeDecodeError):
+            self.file_repo.preprocess_raw_data_parallel("raw.csv", "out.csv", workers=1)
+
+        with open(os.path.join(self.directory, "out.csv"), 'rb') as f:
+            self.assertEqual(f.read(), previous)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "out.csv.tmp")))
+
+    def test_sidecar_cache_round_trip(self):
+        """Test a saved sidecar is returned until the CSV changes"""
+        self.assertIsNone(self.file_repo.load_cached_table("clean.csv"))
+
+        table = PenguinTable()
+        table.extend(self.file_repo.load_from_file("clean.csv"))
+        self.file_repo.save_cached_table("clean.csv", table, self.file_repo.get_source_state("clean.csv"))
+        cached = self.file_repo.load_cached_table("clean.csv")
+        self.assertEqual(list(cached.iter_rows()), self.penguins)
+
+        self.file_repo.save_to_file("clean.csv", self.penguins[:2])
+        self.assertIsNone(self.file_repo.load_cached_table("clean.csv"))
+
+    def test_sidecar_cache_survives_touch(self):
+        """Test a new mtime with unchanged content keeps the sidecar"""
+        table = PenguinTable()
+        table.extend(self.penguins)
+        self.file_repo.save_cached_table("clean.csv", table, self.file_repo.get_source_state("clean.csv"))
+        path = os.path.join(self.directory, "clean.csv")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual(len(self.file_repo.load_cached_table("clean.csv")), 3)
+
+    def test_sidecar_cache_corrupt(self):
+        """Test a corrupt sidecar is ignored and removed"""
+        cache_path = os.path.join(self.directory, ".clean.csv.pcache")
+        with open(cache_path, 'wb') as f:
+            f.write(b"garbage")
+
+        self.assertIsNone(self.file_repo.load_cached_table("clean.csv"))
+        self.assertFalse(os.path.exists(cache_path))
+
+    def test_sidecar_cache_lru_eviction(self):
+        """Test least recently used sidecars are evicted over the size limit"""
+        table = PenguinTable()
+        table.extend(self.penguins)
+        self.file_repo.save_cached_table("clean.csv", table, self.file_repo.get_source_state("clean.csv"))
+        cache_path = os.path.join(self.directory, ".clean.csv.pcache")
+        old_stat = os.stat(cache_path)
+        os.utime(cache_path, ns=(old_stat.st_atime_ns, old_stat.st_mtime_ns - 10 ** 9))
+        # Room for one sidecar only
+        file_repo = PenguinRepoFile(self.directory, cache_max_bytes=old_stat.st_size * 3 // 2)
+        file_repo.save_to_file("other.csv", self.penguins)
+        file_repo.save_cached_table("other.csv", table, file_repo.get_source_state("other.csv"))
+
+        self.assertIsNone(file_repo.load_cached_table("clean.csv"))
+        self.assertIsNotNone(file_repo.load_cached_table("other.csv"))
+
+    def test_sidecar_cache_state_taken_before_parse(self):
+        """Test an edit between capturing the CSV state and saving the sidecar leaves it stale"""
+        state = self.file_repo.get_source_state("clean.csv")
+        table = PenguinTable()
+        table.extend(self.file_repo.load_from_file("clean.csv"))
+        self.file_repo.save_to_file("clean.csv", self.penguins[:2])
+        self.file_repo.save_cached_table("clean.csv", table, state)
+
+        self.assertIsNone(self.file_repo.load_cached_table("clean.csv"))
+
+    def test_sidecar_cache_write_failure_is_ignored(self):
+        """Test loading still works when the sidecar cannot be written"""
+        from repository.penguin_repo import PenguinRepo
+        from service.penguin_service import PenguinService
+        # A directory in the way of the temporary file makes the write fail
+        os.makedirs(os.path.join(self.directory, ".clean.csv.pcache.tmp"))
+        service = PenguinService(PenguinRepo(), self.file_repo)
+
+        self.assertEqual(service.load_data("clean.csv"), 3)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, ".clean.csv.pcache")))
+
+    def test_sidecar_cache_in_subdirectory(self):
+        """Test a CSV in a subdirectory gets its sidecar next to it"""
+        from repository.penguin_repo import PenguinRepo
+        from service.penguin_service import PenguinService
+        os.makedirs(os.path.join(self.directory, "sub"))
+        self.file_repo.save_to_file(os.path.join("sub", "clean.csv"), self.penguins)
+        service = PenguinService(PenguinRepo(), self.file_repo)
+
+        self.assertEqual(service.load_data(os.path.join("sub", "clean.csv")), 3)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "sub", ".clean.csv.pcache")))
+        self.assertEqual(len(self.file_repo.load_cached_table(os.path.join("sub", "clean.csv"))), 3)
+
+    def test_columnar_round_trip(self):
+        """Test a mapped columnar file answers queries without copying"""
+        table = PenguinTable()
+        table.extend(self.penguins)
+        self.file_repo.save_columnar("clean.pcol", table)
+        mapped = self.file_repo.open_columnar("clean.pcol")
+
+        self.assertTrue(mapped.is_read_only())
+        self.assertEqual(list(mapped.iter_rows()), self.penguins)
+        self.assertEqual(mapped.find_rows('body_mass_g', 3800.0, True), [1, 2])
+        self.assertEqual(mapped.count_values('sex'), {'MALE': 2, 'FEMALE': 1})
+        self.assertIn("clean.pcol", self.file_repo.get_available_files())
+
+    def test_columnar_copy_on_write(self):
+        """Test appending to a mapped table leaves the file unchanged"""
+        table = PenguinTable()
+        table.extend(self.penguins)
+        self.file_repo.save_columnar("clean.pcol", table)
+        path = os.path.join(self.directory, "clean.pcol")
+        with open(path, 'rb') as f:
+            before = f.read()
+
+        mapped = self.file_repo.open_columnar("clean.pcol")
+        mapped.append(self.penguins[0])
+
+        self.assertFalse(mapped.is_read_only())
+        self.assertEqual(len(mapped), 4)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(len(self.file_repo.open_columnar("clean.pcol")), 3)
+
+    def test_columnar_invalid_file(self):
+        """Test a file that is not in columnar format is rejected"""
+        with open(os.path.join(self.directory, "bad.pcol"), 'wb') as f:
+            f.write(b"not a columnar file")
+
+        with self.assertRaises(InvalidFileFormatException):
+            self.file_repo.open_columnar("bad.pcol")
+
+    def test_columnar_truncated_file(self):
+        """Test a truncated columnar file is rejected at every length, not with a raw struct.error"""
+        table = PenguinTable()
+        table.extend(self.penguins)
+        self.file_repo.save_columnar("clean.pcol", table)
+        with open(os.path.join(self.directory, "clean.pcol"), 'rb') as f:
+            data = f.read()
+
+        for length in (1, 10, 30, 100, len(data) - 1):
+            with self.subTest(length=length):
+                with open(os.path.join(self.directory, "cut.pcol"), 'wb') as f:
+                    f.write(data[:length])
+                with self.assertRaises(InvalidFileFormatException):
+                    self.file_repo.open_columnar("cut.pcol")
+
+    def test_columnar_close(self):
+        """Test closing a mapped table releases its columns and empties it"""
+        table = PenguinTable()
+        table.extend(self.penguins)
+        self.file_repo.save_columnar("clean.pcol", table)
+        mapped = self.file_repo.open_columnar("clean.pcol")
+        column = mapped.get_numeric_column('body_mass_g')
+
+        mapped.close()
+
+        self.assertEqual(len(mapped), 0)
+        self.assertFalse(mapped.is_read_only())
+        with self.assertRaises(ValueError):
+            column[0]
+
+    def test_iter_penguins_missing_file(self):
+        """Test missing file is reported when the iterator is created"""
+        with self.assertRaises(FileNotFoundException):
+            self.file_repo.iter_penguins("missing.csv")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,14 +2,28 @@
 Tests for Service layer - PenguinService
 Specifically tests filter, describe, and unique functionalities
 """
+import bisect
+import itertools
+import math
+import random
+import statistics
 import unittest
 from domain.penguin import Penguin
 from domain.exceptions import (
-    NoDataLoadedException, InvalidAttributeException, NonNumericAttributeException
+    NoDataLoadedException, InvalidAttributeException, NonNumericAttributeException,
+    InvalidSortAlgorithmException, InvalidFilterValueException, InvalidQueryException,
+    InvalidAggregationException, ValidationException, InvalidFileFormatException, FileNotFoundException,
+    InvalidPercentageException, InvalidAugmentModeException
 )
 from repository.penguin_repo import PenguinRepo
 from repository.penguin_repo_file import PenguinRepoFile
 from service.penguin_service import PenguinService
+from service.classifier_service import ClassifierService
+from service.kd_tree import KdTree
+from service.order_statistics import quantiles, select_ranks
+from service.quantile_sketch import KllSketch
+from service.query import parse_query
+from service.sorting import SORT_ALGORITHMS, get_sort_algorithm
 
 
 class TestPenguinServiceFilter(unittest.TestCase):
@@ -65,6 +79,69 @@ class TestPenguinServiceFilter(unittest.TestCase):
         for penguin in result:
             self.assertEqual(penguin.get_species(), 'Adelie')
 
+    def test_load_data_streams_into_repo(self):
+        """Test load_data replaces the repository content chunk by chunk"""
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            file_repo = PenguinRepoFile(directory)
+            file_repo.save_to_file("data.csv", self.repo.get_all_penguins())
+            service = PenguinService(self.repo, file_repo)
+            service.LOAD_CHUNK_SIZE = 2
+
+            self.assertEqual(service.load_data("data.csv"), 5)
+            self.assertEqual(self.repo.get_penguin_count(), 5)
+            # Second load comes from the sidecar cache
+            self.assertEqual(service.load_data("data.csv"), 5)
+            self.assertEqual(service.filter_data('species', 'Adelie'),
+                             file_repo.load_from_file("data.csv")[:2])
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def test_load_data_columnar(self):
+        """Test load_data maps a saved columnar file"""
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            file_repo = PenguinRepoFile(directory)
+            service = PenguinService(self.repo, file_repo)
+            expected = list(self.repo.get_all_penguins())
+            self.assertEqual(service.save_columnar("data"), 5)
+
+            self.repo.clear()
+            self.assertEqual(service.load_data("data.pcol"), 5)
+            self.assertTrue(self.repo.get_table().is_read_only())
+            self.assertEqual(self.repo.get_all_penguins(), expected)
+            self.assertEqual(len(service.filter_data('species', 'Adelie')), 2)
+            self.assertEqual(sum(service.unique_values('island').values()), 5)
+            self.assertEqual(service.describe_attribute('body_mass_g')['max'],
+                             max(p.get_body_mass_g() for p in expected))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def test_filter_range(self):
+        """Test range filter (low <= attribute <= high)"""
+        result = self.service.filter_range('body_mass_g', '3800', '4950')
+
+        self.assertEqual([p.get_body_mass_g() for p in result], [3800.0, 4950.0, 3950.0])
+
+    def test_filter_matching(self):
+        """Test filtering on several string attributes at once"""
+        result = self.service.filter_matching({'species': 'Gentoo', 'sex': 'MALE'})
+
+        self.assertEqual([p.get_body_mass_g() for p in result], [5700.0])
+        with self.assertRaises(InvalidFilterValueException):
+            self.service.filter_matching({'body_mass_g': '3750'})
+
+    def test_filter_range_invalid(self):
+        """Test range filter rejects string attributes and non-numeric bounds"""
+        with self.assertRaises(NonNumericAttributeException):
+            self.service.filter_range('species', '1', '2')
+        with self.assertRaises(InvalidFilterValueException):
+            self.service.filter_range('body_mass_g', 'low', '2')
+
     def test_filter_no_match(self):
         """Test filter returns empty list when no matches"""
         result = self.service.filter_data('body_mass_g', '10000')
@@ -138,6 +215,46 @@ class TestPenguinServiceDescribe(unittest.TestCase):
         self.assertEqual(stats['mean'], 190.0)
 
 
+    def test_describe_all(self):
+        """Test describe_all reports extended statistics for every numeric attribute"""
+        described = self.service.describe_all()
+
+        self.assertEqual(set(described), set(Penguin.get_numeric_attributes()))
+        mass = described['body_mass_g']
+        self.assertEqual((mass['count'], mass['min'], mass['max'], mass['mean']), (3, 3000.0, 5000.0, 4000.0))
+        self.assertEqual((mass['q1'], mass['median'], mass['q3'], mass['std']), (3500.0, 4000.0, 4500.0, 1000.0))
+
+    def test_describe_all_uses_sorted_index(self):
+        """Test quartiles are the same whether or not a sorted index exists"""
+        before = self.service.describe_all()
+        self.service.filter_data('body_mass_g', '3500')
+
+        self.assertEqual(self.service.describe_all(), before)
+
+    def test_describe_approximate_streams_file(self):
+        """Test streaming describe of a file matches exact statistics of its rows"""
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            penguins = [Penguin("Adelie", 170.0 + i % 40, 40.0, 18.0, 3000.0 + i, "Dream", "MALE")
+                        for i in range(2000)]
+            file_repo = PenguinRepoFile(directory)
+            file_repo.save_to_file("big.csv", penguins)
+            service = PenguinService(PenguinRepo(), file_repo)
+            service.LOAD_CHUNK_SIZE = 300
+
+            mass = service.describe_approximate("big.csv", epsilon=0.01, seed=3)['body_mass_g']
+
+            self.assertEqual((mass['count'], mass['min'], mass['max'], mass['mean']),
+                             (2000, 3000.0, 4999.0, 3999.5))
+            self.assertLessEqual(abs(mass['p50'] - 3999.5), 0.01 * 2000)
+            self.assertLessEqual(abs(mass['p95'] - 4899.0), 0.01 * 2000)
+            # One seed reproduces the run even though every chunk sketch gets its own seed
+            self.assertEqual(service.describe_approximate("big.csv", epsilon=0.01, seed=3)['body_mass_g'], mass)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
 class TestPenguinServiceUnique(unittest.TestCase):
     """Test cases for unique functionality
     
@@ -242,6 +359,473 @@ class TestPenguinServiceSort(unittest.TestCase):
                 sorted_penguins[i+1].get_body_mass_g()
             )
 
+    def test_sort_every_algorithm(self):
+        """Test every registered algorithm gives the same order through the service"""
+        for algorithm in SORT_ALGORITHMS:
+            sorted_penguins = self.service.sort_data('flipper_length_mm', 'desc', algorithm)
+            self.assertEqual([p.get_flipper_length_mm() for p in sorted_penguins], [230.0, 195.0, 181.0])
+
+    def test_sort_string_attribute(self):
+        """Test sorting by a string attribute"""
+        sorted_penguins = self.service.sort_data('species', 'asc', 'merge')
+
+        self.assertEqual([p.get_species() for p in sorted_penguins], ["Adelie", "Chinstrap", "Gentoo"])
+
+    def test_sort_invalid_algorithm(self):
+        """Test unknown algorithm raises exception"""
+        with self.assertRaises(InvalidSortAlgorithmException):
+            self.service.sort_data('body_mass_g', 'asc', 'bogosort')
+
+
+class TestPenguinServiceGroupBy(unittest.TestCase):
+    """Test cases for group_by aggregation"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.repo = PenguinRepo()
+        self.service = PenguinService(self.repo, PenguinRepoFile("test_data"))
+        self.penguins = [
+            Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE"),
+            Penguin("Adelie", 186.0, 39.5, 17.4, 3800.0, "Dream", "FEMALE"),
+            Penguin("Adelie", 190.0, 38.0, 18.0, 3400.0, "Dream", "FEMALE"),
+            Penguin("Gentoo", 217.0, 46.1, 13.2, 4950.0, "Biscoe", "FEMALE"),
+            Penguin("Gentoo", 230.0, 49.6, 16.0, 5700.0, "Biscoe", "MALE"),
+        ]
+        self.repo.add_all(self.penguins)
+
+    def test_group_by_two_keys(self):
+        """Test mean body mass per species per island"""
+        result = self.service.group_by(['species', 'island'], {'body_mass_g': ['mean', 'count']})
+
+        self.assertEqual(list(result), [('Adelie', 'Dream'), ('Adelie', 'Torgersen'), ('Gentoo', 'Biscoe')])
+        self.assertEqual(result[('Adelie', 'Dream')], {'body_mass_g': {'mean': 3600.0, 'count': 2}})
+        self.assertEqual(result[('Gentoo', 'Biscoe')]['body_mass_g']['mean'], 5325.0)
+
+    def test_group_by_all_functions(self):
+        """Test an empty function list selects every aggregation"""
+        result = self.service.group_by(['sex'], {'flipper_length_mm': []})
+        female = result[('FEMALE',)]['flipper_length_mm']
+
+        self.assertEqual(list(female), list(PenguinService.AGGREGATIONS))
+        values = [186.0, 190.0, 217.0]
+        self.assertEqual((female['count'], female['sum'], female['min'], female['max']),
+                         (3, sum(values), 186.0, 217.0))
+        self.assertEqual(female['std'], round(statistics.stdev(values), 2))
+
+    def test_group_by_invalid(self):
+        """Test invalid keys, attributes and functions"""
+        with self.assertRaises(InvalidAttributeException):
+            self.service.group_by(['color'], {'body_mass_g': []})
+        with self.assertRaises(NonNumericAttributeException):
+            self.service.group_by(['species'], {'island': []})
+        with self.assertRaises(InvalidAggregationException):
+            self.service.group_by(['species'], {'body_mass_g': ['median']})
+
+
+class TestClassifierService(unittest.TestCase):
+    """Test cases for kNN classification"""
+
+    def setUp(self):
+        """Set up a dataset with duplicated points so that ties occur"""
+        rng = random.Random(5)
+        self.repo = PenguinRepo()
+        self.classifier = ClassifierService(self.repo)
+        species = ["Adelie", "Chinstrap", "Gentoo"]
+        self.repo.add_all([Penguin(rng.choice(species), float(rng.randint(180, 200)), float(rng.randint(38, 45)),
+                                   float(rng.randint(15, 19)), 4000.0, "Dream", "MALE") for _ in range(400)])
+
+    def brute_force(self, point, k):
+        """Reference: sort every (distance, row) pair"""
+        columns = [self.repo.get_numeric_column(f) for f in ClassifierService.FEATURES]
+        return sorted((math.dist(point, other), row) for row, other in enumerate(zip(*columns)))[:k]
+
+    def test_kd_tree_matches_brute_force(self):
+        """Test the KD-tree finds exactly the brute-force neighbours, ties broken by row"""
+        columns = [self.repo.get_numeric_column(f) for f in ClassifierService.FEATURES]
+        tree = KdTree(columns)
+        rng = random.Random(6)
+        for _ in range(50):
+            point = (rng.randint(36, 47), rng.randint(14, 20), rng.randint(178, 202))
+            k = rng.randint(1, 30)
+            self.assertEqual(tree.nearest(point, k), self.brute_force(point, k))
+        self.assertEqual(len(tree.nearest((40, 17, 190), 1000)), 400)
+
+    def test_kd_tree_path_matches_small_path(self):
+        """Test classify gives the same answer below and above the KD-tree threshold"""
+        small = self.classifier.classify_with_details(41.0, 17.0, 190.0, 7)
+        self.classifier.KD_TREE_THRESHOLD = 1
+        self.assertEqual(self.classifier.classify_with_details(41.0, 17.0, 190.0, 7), small)
+
+    def test_kd_tree_rebuilt_after_change(self):
+        """Test the cached KD-tree follows repository changes"""
+        self.classifier.KD_TREE_THRESHOLD = 1
+        self.classifier.classify(41.0, 17.0, 190.0, 3)
+        self.repo.add_all([Penguin("Gentoo", 500.0, 100.0, 50.0, 4000.0, "Biscoe", "MALE")])
+
+        self.assertEqual(self.classifier.classify_with_details(100.0, 50.0, 500.0, 1)['prediction'], "Gentoo")
+
+    def test_model_cached_until_data_changes(self):
+        """Test the model is reused between queries and rebuilt after the repository changes"""
+        model = self.classifier.get_model()
+        self.classifier.classify(41.0, 17.0, 190.0, 3)
+        self.assertIs(self.classifier.get_model(), model)
+
+        self.repo.add_all([Penguin("Gentoo", 230.0, 50.0, 15.0, 5000.0, "Biscoe", "MALE")])
+        self.assertIsNot(self.classifier.get_model(), model)
+        self.assertEqual(len(self.classifier.get_model()), 401)
+
+    def test_model_standardizes_features(self):
+        """Test distances are measured in standard deviations, so millimetres of flipper do not dominate"""
+        repo = PenguinRepo()
+        repo.add_all([Penguin("Adelie", 190.0, 40.0, 18.0, 3700.0, "Dream", "MALE"),
+                      Penguin("Gentoo", 230.0, 48.0, 14.0, 5000.0, "Biscoe", "MALE")])
+        model = ClassifierService(repo).get_model()
+
+        self.assertEqual(model.get_means(), (44.0, 16.0, 210.0))
+        self.assertEqual(model.get_stds(), (4.0, 2.0, 20.0))
+        self.assertEqual(model.standardize((47.0, 15.0, 205.0)), (0.75, -0.5, -0.25))
+        # In millimetres the Adelie is nearer (flipper difference 15 vs 25), in standard deviations the Gentoo
+        self.assertEqual(ClassifierService(repo).classify(47.0, 15.0, 205.0, 1), "Gentoo")
+
+    def test_model_save_and_load(self):
+        """Test a saved model answers like the original without any data loaded, with and without KD-tree"""
+        import os
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            rng = random.Random(9)
+            points = [(rng.randint(36, 47), rng.randint(14, 20), rng.randint(178, 202)) for _ in range(30)]
+            for threshold in (1, 1000):
+                classifier = ClassifierService(self.repo, PenguinRepoFile(directory))
+                classifier.KD_TREE_THRESHOLD = threshold
+                expected = classifier.classify_batch(points, 5)
+                classifier.save_model("model.pknn")
+
+                repo = PenguinRepo()
+                server = ClassifierService(repo, PenguinRepoFile(directory))
+                self.assertEqual(server.load_model("model.pknn"), 400)
+                self.assertEqual(server.get_model().has_kd_tree(), threshold == 1)
+                self.assertEqual(server.classify_batch(points, 5), expected)
+                self.assertEqual(server.classify_with_details(*points[0], 5),
+                                 classifier.classify_with_details(*points[0], 5))
+
+                # Loading data replaces the loaded model
+                repo.add_all([Penguin("Gentoo", 230.0, 50.0, 15.0, 5000.0, "Biscoe", "MALE")])
+                self.assertEqual(len(server.get_model()), 1)
+
+            with open(os.path.join(directory, "broken.pknn"), 'wb') as f:
+                f.write(b"PKNN" + bytes(20))
+            with self.assertRaises(InvalidFileFormatException):
+                server.load_model("broken.pknn")
+            with self.assertRaises(FileNotFoundException):
+                server.load_model("missing.pknn")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def test_classify_batch_matches_classify(self):
+        """Test classify_batch answers like classify, for small tiles and both search paths"""
+        rng = random.Random(7)
+        points = [(rng.randint(36, 47), rng.randint(14, 20), rng.randint(178, 202)) for _ in range(40)]
+        expected = [self.classifier.classify_with_details(*point, 9) for point in points]
+        expected = [(details['prediction'], details['confidence']) for details in expected]
+
+        self.classifier.BATCH_TILE_ELEMENTS = 1000
+        self.assertEqual(self.classifier.classify_batch(points, 9), expected)
+        self.classifier.KD_TREE_THRESHOLD = 1
+        self.assertEqual(self.classifier.classify_batch(points, 9), expected)
+
+    def test_predict_file(self):
+        """Test file predictions keep input order and match classify_batch, with and without workers"""
+        import csv
+        import os
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            rng = random.Random(8)
+            points = [(rng.randint(36, 47), rng.randint(14, 20), rng.randint(178, 202)) for _ in range(50)]
+            with open(os.path.join(directory, "field.csv"), 'w', encoding='utf-8') as f:
+                f.write("tag,Flipper Length (mm),culmen_length_mm,culmen_depth_mm\n")
+                for i, (cl, cd, fl) in enumerate(points):
+                    f.write(f"t{i},{fl},{cl},{cd}\n")
+                f.write("broken,NA,40,17\n")
+            classifier = ClassifierService(self.repo, PenguinRepoFile(directory))
+            classifier.PREDICTION_CHUNK_SIZE = 7
+
+            serial = classifier.predict_file("field.csv", "serial.csv", 5)
+            parallel = classifier.predict_file("field.csv", "parallel.csv", 5, workers=2)
+
+            self.assertEqual((serial['rows'], serial['classified'], serial['skipped']), (51, 50, 1))
+            self.assertEqual(parallel['classified'], 50)
+            with open(os.path.join(directory, "serial.csv"), encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+            with open(os.path.join(directory, "parallel.csv"), encoding='utf-8') as f:
+                self.assertEqual(list(csv.reader(f)), rows)
+            self.assertEqual(rows[0][-2:], ['predicted_species', 'confidence'])
+            self.assertEqual([row[0] for row in rows[1:-1]], [f"t{i}" for i in range(50)])
+            self.assertEqual([(row[-2], float(row[-1])) for row in rows[1:-1]],
+                             self.classifier.classify_batch(points, 5))
+            self.assertEqual(rows[-1], ['broken', 'NA', '40', '17', '', ''])
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def reference_predictions(self, penguins, held_out, k):
+        """Reference: retrain without the held-out rows and classify each of them"""
+        repo = PenguinRepo()
+        repo.add_all([p for row, p in enumerate(penguins) if row not in held_out])
+        classifier = ClassifierService(repo)
+        return {row: classifier.classify(penguins[row].get_culmen_length_mm(), penguins[row].get_culmen_depth_mm(),
+                                         penguins[row].get_flipper_length_mm(), k) for row in held_out}
+
+    def test_evaluate_leave_one_out_matches_brute_force(self):
+        """Test leave-one-out results equal a vote among every other penguin, standardized with the dataset scales"""
+        penguins = self.repo.get_all_penguins()[:60]
+        self.repo.set_penguins(penguins)
+        report = self.classifier.evaluate([1, 3, 7], workers=1)
+        model = self.classifier.get_model()
+        points = [model.standardize((p.get_culmen_length_mm(), p.get_culmen_depth_mm(), p.get_flipper_length_mm()))
+                  for p in penguins]
+
+        self.assertEqual(report['folds'], 'loo')
+        for k in (1, 3, 7):
+            confusion = {}
+            correct = 0
+            for row, penguin in enumerate(penguins):
+                nearest = sorted((math.dist(points[row], point), other)
+                                 for other, point in enumerate(points) if other != row)[:k]
+                votes = {}
+                for _, other in nearest:
+                    votes[penguins[other].get_species()] = votes.get(penguins[other].get_species(), 0) + 1
+                predicted = max(votes, key=votes.get)
+                actual = penguin.get_species()
+                confusion.setdefault(actual, {})
+                confusion[actual][predicted] = confusion[actual].get(predicted, 0) + 1
+                correct += predicted == actual
+            self.assertEqual(report['results'][k]['confusion'], confusion)
+            self.assertEqual((report['results'][k]['correct'], report['results'][k]['total']), (correct, 60))
+        best = max(report['results'][k]['accuracy'] for k in (1, 3, 7))
+        self.assertEqual(report['results'][report['best_k']]['accuracy'], best)
+        self.assertEqual(self.classifier.evaluate([1, 3, 7], workers=2), report)
+
+    def test_evaluate_k_fold_parallel_matches_retraining(self):
+        """Test k-fold results are the same in worker processes and equal retraining per fold"""
+        penguins = self.repo.get_all_penguins()[:80]
+        self.repo.set_penguins(penguins)
+        serial = self.classifier.evaluate([2, 5], folds=4, seed=3)
+        parallel = self.classifier.evaluate([5, 2], folds=4, workers=2, seed=3)
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial['folds'], 4)
+        order = list(range(80))
+        random.Random(3).shuffle(order)
+        correct = 0
+        for fold in range(4):
+            held_out = set(order[fold::4])
+            predictions = self.reference_predictions(penguins, held_out, 5)
+            correct += sum(predictions[row] == penguins[row].get_species() for row in held_out)
+        self.assertEqual(serial['results'][5]['correct'], correct)
+        self.assertEqual(serial['results'][5]['total'], 80)
+
+    def test_evaluate_validation(self):
+        """Test invalid k values and fold counts are rejected"""
+        with self.assertRaises(ValidationException):
+            self.classifier.evaluate([0, 3])
+        with self.assertRaises(ValidationException):
+            self.classifier.evaluate([3], folds=1)
+        with self.assertRaises(NoDataLoadedException):
+            ClassifierService(PenguinRepo()).evaluate([3])
+
+    def test_classify_batch_edge_cases(self):
+        """Test k larger than the dataset, no points and invalid k"""
+        self.assertEqual(self.classifier.classify_batch([], 3), [])
+        everyone = self.classifier.classify_with_details(41.0, 17.0, 190.0, 400)
+        self.assertEqual(self.classifier.classify_batch([(41.0, 17.0, 190.0)], 1000),
+                         [(everyone['prediction'], everyone['confidence'])])
+        with self.assertRaises(ValidationException):
+            self.classifier.classify_batch([(41.0, 17.0, 190.0)], 0)
+        with self.assertRaises(NoDataLoadedException):
+            ClassifierService(PenguinRepo()).classify_batch([(41.0, 17.0, 190.0)], 3)
+
+
+class TestOrderStatistics(unittest.TestCase):
+    """Test cases for quickselect order statistics"""
+
+    def test_select_ranks_matches_sorted(self):
+        """Test selected ranks equal the sorted sequence, with many duplicates"""
+        values = [(i * 7919) % 101 // 3 for i in range(1000)]
+        ordered = sorted(values)
+        ranks = [0, 1, 250, 499, 500, 750, 999]
+
+        self.assertEqual(select_ranks(values, ranks), {r: ordered[r] for r in ranks})
+
+    def test_quantiles_match_statistics_module(self):
+        """Test interpolated quartiles equal statistics.quantiles(method='inclusive')"""
+        for n in (2, 3, 10, 257):
+            values = [((i * 37) % n) * 1.5 for i in range(n)]
+            with self.subTest(n=n):
+                expected = statistics.quantiles(values, n=4, method='inclusive')
+                for got, want in zip(quantiles(values, [0.25, 0.5, 0.75]), expected):
+                    self.assertAlmostEqual(got, want)
+
+    def test_quantiles_single_value(self):
+        """Test a single value is every quantile"""
+        self.assertEqual(quantiles([7.0], [0.25, 0.5, 0.75]), [7.0, 7.0, 7.0])
+
+
+class TestKllSketch(unittest.TestCase):
+    """Test cases for the mergeable quantile sketch"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.gauss(4000.0, 800.0) for _ in range(50000)]
+        self.ordered = sorted(self.values)
+
+    def rank_error(self, sketch, fraction):
+        rank = bisect.bisect_right(self.ordered, sketch.quantile(fraction)) / len(self.ordered)
+        return abs(rank - fraction)
+
+    def test_error_bound(self):
+        """Test quantiles of a streamed sketch are within epsilon of the true ranks"""
+        sketch = KllSketch(0.02, seed=1)
+        for start in range(0, len(self.values), 1000):
+            sketch.update(self.values[start:start + 1000])
+
+        self.assertEqual(sketch.get_count(), len(self.values))
+        self.assertLess(sketch.get_retained(), 1000)
+        for fraction in (0.01, 0.25, 0.5, 0.75, 0.99):
+            self.assertLessEqual(self.rank_error(sketch, fraction), 0.02)
+        self.assertEqual((sketch.quantile(0), sketch.quantile(1)), (self.ordered[0], self.ordered[-1]))
+
+    def test_merged_chunks(self):
+        """Test sketches of separate chunks merge into an accurate sketch"""
+        merged = KllSketch(0.02, seed=2)
+        for start in range(0, len(self.values), 5000):
+            chunk = KllSketch(0.02, seed=start)
+            chunk.update(self.values[start:start + 5000])
+            merged.merge(chunk)
+
+        self.assertEqual(merged.get_count(), len(self.values))
+        for fraction in (0.05, 0.5, 0.95):
+            self.assertLessEqual(self.rank_error(merged, fraction), 0.02)
+
+    def test_invalid(self):
+        """Test invalid epsilon and queries on an empty sketch"""
+        with self.assertRaises(ValueError):
+            KllSketch(0)
+        with self.assertRaises(ValueError):
+            KllSketch().quantile(0.5)
+
+
+class TestPenguinServiceQuery(unittest.TestCase):
+    """Test cases for the filter query language"""
+
+    def setUp(self):
+        """Set up a dataset with every species/island/sex combination"""
+        self.repo = PenguinRepo()
+        self.service = PenguinService(self.repo, PenguinRepoFile("test_data"))
+        self.penguins = []
+        for i in range(60):
+            self.penguins.append(Penguin(
+                ["Adelie", "Gentoo", "Chinstrap"][i % 3], 170.0 + i, 35.0 + i % 10, 15.0 + i % 6,
+                3000.0 + 50 * (i % 20), ["Dream", "Biscoe", "Torgersen"][i // 20], ["MALE", "FEMALE"][i % 2]))
+        self.repo.add_all(self.penguins)
+
+    def test_queries_match_python_filters(self):
+        """Test query results equal the same condition evaluated on every penguin"""
+        queries = {
+            "species == Gentoo and island = Biscoe":
+                lambda p: p.get_species() == "Gentoo" and p.get_island() == "Biscoe",
+            "body_mass_g >= 3800 and sex != MALE":
+                lambda p: p.get_body_mass_g() >= 3800 and p.get_sex() != "MALE",
+            "flipper_length_mm between 180 and 190 or not island in (Dream, 'Biscoe')":
+                lambda p: 180 <= p.get_flipper_length_mm() <= 190 or p.get_island() == "Torgersen",
+            "NOT (species == Adelie OR culmen_depth_mm <= 17) AND body_mass_g IN (3100, 3500)":
+                lambda p: not (p.get_species() == "Adelie" or p.get_culmen_depth_mm() <= 17)
+                and p.get_body_mass_g() in (3100, 3500),
+            "culmen_length_mm < 37 and body_mass_g not between 3200 and 3800":
+                lambda p: p.get_culmen_length_mm() < 37 and not 3200 <= p.get_body_mass_g() <= 3800,
+        }
+        for query, condition in queries.items():
+            with self.subTest(query=query):
+                self.assertEqual(self.service.query_data(query),
+                                 [p for p in self.penguins if condition(p)])
+
+    def test_and_starts_from_most_selective_predicate(self):
+        """Test the AND node orders its children by index estimates"""
+        plan = parse_query("sex == MALE and flipper_length_mm > 225")
+
+        estimates = [child.estimate(self.repo) for child in plan.children]
+        self.assertEqual(estimates, [30, 4])
+        self.assertEqual(len(plan.rows(self.repo)), 2)
+
+    def test_invalid_queries(self):
+        """Test malformed queries are rejected with a reason"""
+        for query in ["", "species ==", "species < Adelie", "(sex == MALE", "sex == MALE FEMALE", "sex ? 1"]:
+            with self.subTest(query=query):
+                with self.assertRaises(InvalidQueryException):
+                    self.service.query_data(query)
+        with self.assertRaises(InvalidAttributeException):
+            self.service.query_data("weight > 3")
+        with self.assertRaises(InvalidFilterValueException):
+            self.service.query_data("body_mass_g == heavy")
+
+    def test_incomplete_node_cannot_be_created(self):
+        """Test a plan node missing a method fails when created, not while a plan runs"""
+        from service.query import QueryNode
+
+        class EstimateOnly(QueryNode):
+            def estimate(self, repo):
+                return 0
+
+        with self.assertRaises(TypeError):
+            EstimateOnly()
+
+
+class TestSortEngines(unittest.TestCase):
+    """Test cases for the sorting engines on larger inputs"""
+
+    def setUp(self):
+        """Build key lists with different shapes"""
+        import random
+        rng = random.Random(11)
+        random_keys = [rng.uniform(2700, 6300) for _ in range(500)]
+        self.shapes = {
+            'random': random_keys,
+            'sorted': sorted(random_keys),
+            'reversed': sorted(random_keys, reverse=True),
+            'duplicates': [rng.choice([3000.0, 4000.0, 5000.0]) for _ in range(500)],
+            'tiny': [2.0, 1.0],
+            'empty': [],
+        }
+
+    def test_engines_match_builtin_sort(self):
+        """Test every engine orders keys like sorted() in both directions"""
+        for name, (_, engine) in SORT_ALGORITHMS.items():
+            for shape, keys in self.shapes.items():
+                for reverse in (False, True):
+                    items = list(range(len(keys)))
+                    result = engine(items, keys, reverse)
+                    self.assertEqual([keys[i] for i in result], sorted(keys, reverse=reverse),
+                                     f"{name} failed on {shape} (reverse={reverse})")
+                    self.assertEqual(sorted(result), items)
+
+    def test_stable_engines(self):
+        """Test merge sort and timsort keep equal keys in input order"""
+        keys = self.shapes['duplicates']
+        items = list(range(len(keys)))
+        for name in ('merge', 'timsort'):
+            engine = SORT_ALGORITHMS[name][1]
+            self.assertEqual(engine(items, keys, False), sorted(items, key=keys.__getitem__))
+            self.assertEqual(engine(items, keys, True),
+                             sorted(items, key=keys.__getitem__, reverse=True))
+
+    def test_get_sort_algorithm(self):
+        """Test lookup returns the log name and rejects unknown names"""
+        self.assertEqual(get_sort_algorithm('Merge')[0], 'MergeSort')
+        with self.assertRaises(InvalidSortAlgorithmException):
+            get_sort_algorithm('bogosort')
+
 
 class TestSaveRandomFunctionality(unittest.TestCase):
     """Test cases for save_random functionality
@@ -317,15 +901,103 @@ class TestSaveRandomFunctionality(unittest.TestCase):
             empty_service.save_random(3, "test.csv")
 
 
+class TestAugmentToFile(unittest.TestCase):
+    """Test cases for the streaming, seeded augment_to_file"""
+
+    def setUp(self):
+        """Set up a temporary data directory and a small dataset"""
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+        self.repo = PenguinRepo()
+        self.file_repo = PenguinRepoFile(self.directory)
+        self.service = PenguinService(self.repo, self.file_repo)
+        self.penguins = [
+            Penguin("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE"),
+            Penguin("Adelie", 186.0, 39.5, 17.4, 3800.0, "Torgersen", "FEMALE"),
+            Penguin("Gentoo", 211.0, 46.1, 13.2, 4500.0, "Biscoe", "FEMALE"),
+            Penguin("Gentoo", 230.0, 49.9, 16.1, 5200.0, "Biscoe", "MALE"),
+            Penguin("Chinstrap", 195.0, 46.5, 17.9, 3500.0, "Dream", "FEMALE"),
+        ]
+        self.repo.add_all(self.penguins)
+
+    def tearDown(self):
+        """Remove the temporary data directory"""
+        import shutil
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def read_csv(self, filename):
+        return [str(p) for p in self.file_repo.load_from_file(filename)]
+
+    def test_duplicate_keeps_originals_and_samples_them(self):
+        """Test the loaded rows come first and every added row is a copy of one of them"""
+        report = self.service.augment_to_file(300, 'duplicate', "dup.csv", seed=1)
+        self.assertEqual((report['rows'], report['added'], report['seed']), (20, 15, 1))
+        rows = self.read_csv("dup.csv")
+        self.assertEqual(rows[:5], [str(p) for p in self.penguins])
+        self.assertTrue(set(rows[5:]) <= set(rows[:5]))
+
+    def test_create_stays_within_ranges(self):
+        """Test created rows use known strings and numbers between the column min and max"""
+        self.service.augment_to_file(1000, 'create', "new.csv", seed=2)
+        created = self.file_repo.load_from_file("new.csv")[5:]
+        self.assertEqual(len(created), 50)
+        for penguin in created:
+            self.assertIn(penguin.get_species(), {"Adelie", "Gentoo", "Chinstrap"})
+            self.assertIn(penguin.get_island(), {"Torgersen", "Biscoe", "Dream"})
+            self.assertTrue(3500.0 <= penguin.get_body_mass_g() <= 5200.0)
+            self.assertTrue(181.0 <= penguin.get_flipper_length_mm() <= 230.0)
+
+    def test_seed_is_reproducible_across_chunks_and_formats(self):
+        """Test one seed gives the same rows for any chunk size, as CSV or columnar file"""
+        for mode in ('duplicate', 'create'):
+            with self.subTest(mode=mode):
+                self.service.augment_to_file(700, mode, "a.csv", seed=3, chunk_size=4)
+                self.service.augment_to_file(700, mode, "b.csv", seed=3)
+                self.service.augment_to_file(700, mode, "c.pcol", seed=3, chunk_size=6)
+                self.service.augment_to_file(700, mode, "d.csv", seed=4)
+                rows = self.read_csv("a.csv")
+                self.assertEqual(len(rows), 40)
+                self.assertEqual(self.read_csv("b.csv"), rows)
+                self.assertEqual([str(p) for p in self.file_repo.open_columnar("c.pcol").iter_rows()], rows)
+                self.assertNotEqual(self.read_csv("d.csv"), rows)
+
+    def test_matches_in_memory_csv_format(self):
+        """Test the streamed CSV is byte-identical to saving the same penguins with save_to_file"""
+        import os
+        self.service.augment_to_file(200, 'create', "stream.csv", seed=5)
+        self.file_repo.save_to_file("saved.csv", self.file_repo.load_from_file("stream.csv"))
+        with open(os.path.join(self.directory, "stream.csv"), encoding='utf-8') as f:
+            streamed = f.read()
+        with open(os.path.join(self.directory, "saved.csv"), encoding='utf-8') as f:
+            self.assertEqual(streamed, f.read())
+
+    def test_random_seed_is_reported(self):
+        """Test a run without a seed reports the seed that reproduces it"""
+        report = self.service.augment_to_file(100, 'create', "first.csv")
+        self.service.augment_to_file(100, 'create', "second.csv", seed=report['seed'])
+        self.assertEqual(self.read_csv("first.csv"), self.read_csv("second.csv"))
+
+    def test_augment_to_file_validation(self):
+        """Test invalid percent, mode, chunk size and missing data"""
+        with self.assertRaises(InvalidPercentageException):
+            self.service.augment_to_file(-5, 'create', "x.csv")
+        with self.assertRaises(InvalidAugmentModeException):
+            self.service.augment_to_file(50, 'clone', "x.csv")
+        with self.assertRaises(ValueError):
+            self.service.augment_to_file(50, 'create', "x.csv", chunk_size=0)
+        with self.assertRaises(NoDataLoadedException):
+            PenguinService(PenguinRepo(), self.file_repo).augment_to_file(50, 'create', "x.csv")
+
+
 class TestGenerateResearchGroups(unittest.TestCase):
     """Test cases for generate_research_groups functionality
     
-    Time Complexity: O(C(n,k)) where C(n,k) is combinations
-    Space Complexity: O(C(n,k) * k) for storing valid groups
+    Time Complexity: O(g * k) for g generated groups
+    Space Complexity: O(g * k) for storing valid groups
     """
     
     def setUp(self):
-        """Set up test fixtures with small dataset (max 10 penguins)"""
+        """Set up test fixtures with small dataset"""
         self.repo = PenguinRepo()
         self.file_repo = PenguinRepoFile("test_data")
         self.service = PenguinService(self.repo, self.file_repo)
@@ -383,6 +1055,72 @@ class TestGenerateResearchGroups(unittest.TestCase):
         with self.assertRaises(NoDataLoadedException):
             empty_service.generate_research_groups(3)
 
+    def test_generate_groups_match_all_combinations(self):
+        """Test the pruned generator yields exactly the covering combinations, in combination order"""
+        from itertools import combinations
+        rng = random.Random(12)
+        for _ in range(30):
+            species = rng.sample(["Adelie", "Gentoo", "Chinstrap"], rng.randint(1, 3))
+            penguins = [Penguin(rng.choice(species), 190.0, 40.0, 18.0, float(rng.randint(3000, 5000)),
+                                "Dream", "MALE") for _ in range(rng.randint(3, 11))]
+            self.repo.set_penguins(penguins)
+            k = rng.randint(3, len(penguins))
+            everyone = set(p.get_species() for p in penguins)
+            expected = [list(group) for group in combinations(penguins, k)
+                        if set(p.get_species() for p in group) == everyone]
+            self.assertEqual(self.service.generate_research_groups(k, limit=None), expected)
+
+    def test_generate_groups_lazy_and_limited(self):
+        """Test large datasets stream groups and the limit caps the number of results"""
+        rng = random.Random(13)
+        self.repo.add_all([Penguin(rng.choice(["Adelie", "Gentoo", "Chinstrap"]), 190.0, 40.0, 18.0, 4000.0,
+                                   "Dream", "MALE") for _ in range(34)])
+        groups = self.service.iter_research_groups(8)
+        first = next(groups)
+        self.assertEqual(len(first), 8)
+        self.assertEqual(set(p.get_species() for p in first), {"Adelie", "Gentoo", "Chinstrap"})
+        self.assertEqual(len(self.service.generate_research_groups(8, limit=25)), 25)
+        self.assertEqual(len(self.service.generate_research_groups(8)), PenguinService.RESEARCH_GROUP_LIMIT)
+
+    def test_count_groups_matches_generator(self):
+        """Property: on random small datasets the count equals the number of generated groups"""
+        rng = random.Random(14)
+        for trial in range(200):
+            species = ["Adelie", "Gentoo", "Chinstrap", "Emperor"][:rng.randint(1, 4)]
+            penguins = [Penguin(rng.choice(species), 190.0, 40.0, 18.0, 4000.0, "Dream", "MALE")
+                        for _ in range(rng.randint(3, 12))]
+            self.repo.set_penguins(penguins)
+            k = rng.randint(3, len(penguins))
+            with self.subTest(trial=trial):
+                self.assertEqual(self.service.count_research_groups(k),
+                                 len(self.service.generate_research_groups(k, limit=None)))
+
+    def test_count_groups_large_dataset(self):
+        """Test counting does not depend on the number of groups"""
+        from math import comb
+        self.repo.add_all([Penguin(species, 190.0, 40.0, 18.0, 4000.0, "Dream", "MALE")
+                           for species in ["Adelie"] * 5000 + ["Gentoo"] * 3000 + ["Chinstrap"] * 2000])
+        n = 10006
+        expected = (comb(n, 20) - comb(n - 5002, 20) - comb(n - 3002, 20) - comb(n - 2002, 20)
+                    + comb(2002, 20) + comb(3002, 20) + comb(5002, 20))
+        self.assertEqual(self.service.count_research_groups(20), expected)
+
+    def test_count_groups_validation(self):
+        """Test the count rejects the same arguments as the generator"""
+        with self.assertRaises(ValueError):
+            self.service.count_research_groups(2)
+        with self.assertRaises(ValueError):
+            self.service.count_research_groups(7)
+        with self.assertRaises(NoDataLoadedException):
+            PenguinService(PenguinRepo(), self.file_repo).count_research_groups(3)
+
+    def test_iter_groups_validates_immediately(self):
+        """Test invalid arguments raise before the first group is requested"""
+        with self.assertRaises(ValueError):
+            self.service.iter_research_groups(2)
+        with self.assertRaises(ValueError):
+            self.service.iter_research_groups(3, limit=-1)
+
 
 class TestSplitIntoGroups(unittest.TestCase):
     """Test cases for split_into_groups functionality
@@ -454,6 +1192,140 @@ class TestSplitIntoGroups(unittest.TestCase):
         with self.assertRaises(NoDataLoadedException):
             empty_service.split_into_groups(10000)
 
+    @staticmethod
+    def reference_splits(penguins, threshold):
+        """Reference: every assignment, filtered, mirror images removed (first occurrence kept)"""
+        splits = []
+        seen = set()
+        for assignment in range(2 ** len(penguins)):
+            g1 = [p for i, p in enumerate(penguins) if not assignment >> (len(penguins) - 1 - i) & 1]
+            g2 = [p for i, p in enumerate(penguins) if assignment >> (len(penguins) - 1 - i) & 1]
+            if (len(g1) >= 2 and len(g2) >= 2 and sum(p.get_body_mass_g() for p in g1) <= threshold
+                    and sum(p.get_body_mass_g() for p in g2) <= threshold):
+                key = tuple(sorted([tuple(sorted(map(id, g1))), tuple(sorted(map(id, g2)))]))
+                if key not in seen:
+                    seen.add(key)
+                    splits.append((g1, g2))
+        return splits
+
+    def test_split_matches_exhaustive_enumeration(self):
+        """Test the pruned search returns the same splits in the same order as trying every assignment"""
+        rng = random.Random(15)
+        for trial in range(40):
+            penguins = [Penguin("Adelie", 190.0, 40.0, 18.0, float(rng.randrange(2800, 6000, 50)), "Dream", "MALE")
+                        for _ in range(rng.randint(4, 10))]
+            self.repo.set_penguins(penguins)
+            threshold = rng.uniform(0.3, 1.0) * sum(p.get_body_mass_g() for p in penguins)
+            with self.subTest(trial=trial):
+                expected = self.reference_splits(penguins, threshold)
+                self.assertEqual(self.service.split_into_groups(threshold, limit=None), expected)
+                self.assertEqual(self.service.count_splits(threshold), len(expected))
+
+    def test_meet_in_the_middle_matches_depth_first(self):
+        """Test both engines find the same splits and counts around the switch-over size"""
+        import service.partition as partition
+        rng = random.Random(16)
+        default = partition.MEET_IN_THE_MIDDLE_THRESHOLD
+        try:
+            for n in (4, 5, 9, 14):
+                masses = [float(rng.randrange(2800, 6000, 100)) for _ in range(n)]
+                capacity = rng.uniform(0.5, 0.8) * sum(masses)
+                partition.MEET_IN_THE_MIDDLE_THRESHOLD = 100
+                depth_first = sorted(partition.iter_splits(masses, capacity))
+                count = partition.count_splits(masses, capacity)
+                partition.MEET_IN_THE_MIDDLE_THRESHOLD = 0
+                self.assertEqual(sorted(partition.iter_splits(masses, capacity)), depth_first)
+                self.assertEqual(partition.count_splits(masses, capacity), count)
+                self.assertEqual(count, len(depth_first))
+        finally:
+            partition.MEET_IN_THE_MIDDLE_THRESHOLD = default
+
+    def test_split_large_colony(self):
+        """Test 36 penguins are counted and streamed without the old 10-penguin limit"""
+        rng = random.Random(17)
+        self.repo.set_penguins([Penguin("Adelie", 190.0, 40.0, 18.0, float(rng.randrange(2800, 6000, 50)),
+                                        "Dream", "MALE") for _ in range(36)])
+        total = sum(self.repo.get_numeric_column('body_mass_g'))
+        count = self.service.count_splits(total * 0.51)
+        self.assertGreater(count, 10000)
+        splits = self.service.split_into_groups(total * 0.51, limit=50)
+        self.assertEqual(len(splits), 50)
+        for g1, g2 in splits:
+            self.assertEqual(len(g1) + len(g2), 36)
+            self.assertLessEqual(sum(p.get_body_mass_g() for p in g1), total * 0.51)
+            self.assertLessEqual(sum(p.get_body_mass_g() for p in g2), total * 0.51)
+
+
+    def test_split_too_many_penguins(self):
+        """Test more penguins than MAX_SPLIT_ITEMS raise ValueError instead of exhausting memory"""
+        from service.partition import MAX_SPLIT_ITEMS
+        self.repo.set_penguins([Penguin("Adelie", 190.0, 40.0, 18.0, 4000.0, "Dream", "MALE")
+                                for _ in range(MAX_SPLIT_ITEMS + 1)])
+        with self.assertRaises(ValueError):
+            self.service.split_into_groups(10000, limit=5)
+        with self.assertRaises(ValueError):
+            self.service.count_splits(10000)
+        with self.assertRaises(ValueError):
+            self.service.iter_splits(10000)
+
+    def test_balanced_split_matches_exhaustive_search(self):
+        """Test the DP finds the smallest possible mass difference, including when sizes bind"""
+        rng = random.Random(18)
+        for trial in range(60):
+            n = rng.randint(4, 10)
+            min_size = rng.randint(1, n // 2)
+            # An occasional giant penguin makes the unconstrained optimum a group of one
+            masses = [float(rng.choice([rng.randrange(2800, 6000, 25), 30000])) for _ in range(n)]
+            self.repo.set_penguins([Penguin("Adelie", 190.0, 40.0, 18.0, mass, "Dream", "MALE")
+                                    for mass in masses])
+            best = min(abs(sum(masses) - 2 * sum(group))
+                       for size in range(min_size, n - min_size + 1)
+                       for group in itertools.combinations(masses, size))
+            with self.subTest(trial=trial):
+                report = self.service.balanced_split(min_size)
+                g1, g2 = report['groups']
+                self.assertTrue(report['optimal'])
+                self.assertEqual(len(g1) + len(g2), n)
+                self.assertGreaterEqual(min(len(g1), len(g2)), min_size)
+                self.assertEqual(report['imbalance'], best)
+                self.assertEqual(report['masses'], (sum(p.get_body_mass_g() for p in g1),
+                                                    sum(p.get_body_mass_g() for p in g2)))
+
+    def test_balanced_split_large_colony(self):
+        """Test hundreds of penguins are split exactly by the DP, and near-evenly by the heuristic"""
+        import service.partition as partition
+        rng = random.Random(19)
+        masses = [float(rng.randrange(2800, 6300, 25)) for _ in range(400)]
+        self.repo.set_penguins([Penguin("Adelie", 190.0, 40.0, 18.0, mass, "Dream", "MALE")
+                                for mass in masses])
+        report = self.service.balanced_split()
+        self.assertEqual(report['method'], 'subset_sum_dp')
+        # Every mass is a multiple of 25 g, so the best possible difference is 0 or 25 g
+        self.assertEqual(report['imbalance'], sum(masses) % 50)
+        self.assertGreaterEqual(report['seconds'], 0)
+
+        first, second, method = partition.balanced_split(masses, 2, budget=0)
+        self.assertEqual(method, 'karmarkar_karp')
+        self.assertEqual(sorted(first + second), list(range(400)))
+        self.assertLess(abs(sum(masses[i] for i in first) - sum(masses[i] for i in second)), 500)
+
+    def test_karmarkar_karp_respects_min_size(self):
+        """Test the heuristic moves penguins into a group that would be too small"""
+        import service.partition as partition
+        first, second, method = partition.balanced_split([10000.0, 3000.0, 3000.0, 3000.0, 1000.0],
+                                                         2, budget=0)
+        self.assertEqual(method, 'karmarkar_karp')
+        self.assertGreaterEqual(min(len(first), len(second)), 2)
+
+    def test_balanced_split_validation(self):
+        """Test too few penguins, bad min_size and no data"""
+        with self.assertRaises(ValueError):
+            self.service.balanced_split(3)
+        with self.assertRaises(ValueError):
+            self.service.balanced_split(0)
+        with self.assertRaises(NoDataLoadedException):
+            PenguinService(PenguinRepo(), self.file_repo).balanced_split()
+
 
 class TestComplexityDocumentation(unittest.TestCase):
     """Verify that time and space complexity is documented for all methods"""
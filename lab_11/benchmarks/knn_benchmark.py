@@ -0,0 +1,70 @@
+"""
+kNN Benchmark
+Compares a brute-force neighbour search over the standardized training points
+with the model's KD-tree on synthetic datasets of increasing size and checks
+both find the same neighbours
+Run: python benchmarks/knn_benchmark.py [queries]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.penguin import Penguin
+from repository.penguin_repo import PenguinRepo
+from service.classifier_service import ClassifierService
+
+SIZES = [1_000, 10_000, 100_000, 500_000]
+K = 5
+
+
+def make_repo(size: int, rng: random.Random) -> PenguinRepo:
+    """Build a repository of random penguins"""
+    species = ['Adelie', 'Chinstrap', 'Gentoo']
+    repo = PenguinRepo()
+    repo.add_all([Penguin(rng.choice(species), round(rng.uniform(170, 231), 1), round(rng.uniform(32, 60), 1),
+                          round(rng.uniform(13, 22), 1), 4000.0, 'Dream', 'MALE') for _ in range(size)])
+    return repo
+
+
+def brute_force_nearest(model, point: tuple, k: int) -> list:
+    """Sort the distance to every standardized training point"""
+    qx, qy, qz = model.standardize(point)
+    return sorted((math.sqrt((qx - x) * (qx - x) + (qy - y) * (qy - y) + (qz - z) * (qz - z)), row)
+                  for row, (x, y, z) in enumerate(zip(*model.get_columns())))[:k]
+
+
+def run_benchmark(queries: int = 200, seed: int = 11):
+    """Print build time, per-query latency of both paths and the speedup"""
+    rng = random.Random(seed)
+    print(f"{'size':>8} {'build s':>9} {'brute ms':>10} {'kd-tree ms':>11} {'speedup':>8} same")
+    print("-" * 58)
+    for size in SIZES:
+        repo = make_repo(size, rng)
+        service = ClassifierService(repo)
+        points = [(rng.uniform(32, 60), rng.uniform(13, 22), rng.uniform(170, 231)) for _ in range(queries)]
+        # Brute force is timed on fewer queries on big inputs
+        brute_points = points[:max(5, queries * 1000 // size)]
+
+        start = time.perf_counter()
+        model = service.get_model()
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        brute = [brute_force_nearest(model, p, K) for p in brute_points]
+        brute_ms = (time.perf_counter() - start) / len(brute_points) * 1000
+
+        start = time.perf_counter()
+        found = [model.nearest(p, K) for p in points]
+        tree_ms = (time.perf_counter() - start) / len(points) * 1000
+
+        same = found[:len(brute)] == brute
+        print(f"{size:8} {build:9.3f} {brute_ms:10.3f} {tree_ms:11.3f} {brute_ms / tree_ms:8.1f} {same}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
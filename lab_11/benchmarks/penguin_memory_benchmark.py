@@ -0,0 +1,97 @@
+"""
+Penguin Memory / Latency Benchmark
+Compares the compact __slots__ Penguin with the previous dict-based layout
+Run: python benchmarks/penguin_memory_benchmark.py [count]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.penguin import Penguin
+
+
+class LegacyPenguin:
+    """Previous Penguin layout: instance __dict__ and a dict built per get_attribute call"""
+
+    def __init__(self, species, flipper_length_mm, culmen_length_mm, culmen_depth_mm,
+                 body_mass_g, island, sex):
+        self.__species = species
+        self.__flipper_length_mm = flipper_length_mm
+        self.__culmen_length_mm = culmen_length_mm
+        self.__culmen_depth_mm = culmen_depth_mm
+        self.__body_mass_g = body_mass_g
+        self.__island = island
+        self.__sex = sex
+
+    def get_attribute(self, attribute: str):
+        attribute_map = {
+            'species': self.__species,
+            'flipper_length_mm': self.__flipper_length_mm,
+            'culmen_length_mm': self.__culmen_length_mm,
+            'culmen_depth_mm': self.__culmen_depth_mm,
+            'body_mass_g': self.__body_mass_g,
+            'island': self.__island,
+            'sex': self.__sex
+        }
+        if attribute not in attribute_map:
+            raise AttributeError(f"Unknown attribute: {attribute}")
+        return attribute_map[attribute]
+
+
+def build(cls, count: int) -> list:
+    """Build count penguins of the given class (values shared so only objects are measured)"""
+    return [cls("Adelie", 181.0, 39.1, 18.7, 3750.0, "Torgersen", "MALE") for _ in range(count)]
+
+
+def measure_memory(cls, count: int) -> int:
+    """
+    Measure bytes allocated to hold count penguins
+    :return: total allocated bytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    penguins = build(cls, count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del penguins
+    return current
+
+
+def measure_latency(penguins: list, attribute: str, repeats: int = 3) -> float:
+    """
+    Measure the best time to read one attribute from every penguin
+    :return: seconds per get_attribute call
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for p in penguins:
+            p.get_attribute(attribute)
+        best = min(best, time.perf_counter() - start)
+    return best / len(penguins)
+
+
+def run_benchmark(count: int = 100_000):
+    """Print a memory and latency comparison for count objects"""
+    print(f"Penguin layout benchmark ({count} objects)")
+    print("=" * 60)
+
+    results = {}
+    for name, cls in (("legacy (dict)", LegacyPenguin), ("compact (__slots__)", Penguin)):
+        memory = measure_memory(cls, count)
+        latency = measure_latency(build(cls, count), 'body_mass_g')
+        results[name] = (memory, latency)
+        print(f"{name:22} {memory / count:8.1f} bytes/object   {latency * 1e9:8.1f} ns/get_attribute")
+
+    (old_mem, old_lat), (new_mem, new_lat) = results.values()
+    print("-" * 60)
+    print(f"Memory: {old_mem / new_mem:.2f}x smaller   Latency: {old_lat / new_lat:.2f}x faster")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
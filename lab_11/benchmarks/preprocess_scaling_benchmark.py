@@ -0,0 +1,74 @@
+"""
+Preprocess Scaling Benchmark
+Times serial and parallel preprocessing of a synthetic raw export for
+increasing worker counts and checks that every output is byte-identical
+Run: python benchmarks/preprocess_scaling_benchmark.py [rows]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repository.penguin_repo_file import PenguinRepoFile
+
+
+def write_raw_file(filepath: str, rows: int, seed: int = 7):
+    """
+    Write a raw survey export with some unusable rows (NA, '.', missing values)
+    :param filepath: output path
+    :param rows: number of data lines
+    :param seed: random seed
+    """
+    rng = random.Random(seed)
+    species = ['Adelie', 'Chinstrap', 'Gentoo']
+    islands = ['Torgersen', 'Biscoe', 'Dream']
+    sexes = ['MALE', 'FEMALE', 'NA', '.']
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write("species,island,culmen_length_mm,culmen_depth_mm,flipper_length_mm,body_mass_g,sex\n")
+        for _ in range(rows):
+            mass = 'NA' if rng.random() < 0.02 else f"{rng.randint(2700, 6300)}"
+            f.write(f"{rng.choice(species)},{rng.choice(islands)},{rng.uniform(32, 60):.1f},"
+                    f"{rng.uniform(13, 22):.1f},{rng.randint(170, 231)},{mass},{rng.choice(sexes)}\n")
+
+
+def file_bytes(filepath: str) -> bytes:
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+def run_benchmark(rows: int = 1_000_000):
+    """Print elapsed time and speedup per worker count"""
+    directory = tempfile.mkdtemp()
+    try:
+        file_repo = PenguinRepoFile(directory)
+        print(f"Writing raw file with {rows} rows...")
+        write_raw_file(os.path.join(directory, "raw.csv"), rows)
+
+        start = time.perf_counter()
+        count = file_repo.preprocess_raw_data("raw.csv", "serial.csv")
+        serial_time = time.perf_counter() - start
+        expected = file_bytes(os.path.join(directory, "serial.csv"))
+
+        print(f"\n{'workers':>8} {'seconds':>9} {'speedup':>8} {'rows':>9} {'rejected':>9} identical")
+        print("-" * 60)
+        print(f"{'serial':>8} {serial_time:9.3f} {1.0:8.2f} {count:9}")
+
+        workers = 1
+        cpu_count = os.cpu_count() or 1
+        while workers <= cpu_count:
+            report = file_repo.preprocess_raw_data_parallel("raw.csv", "parallel.csv", workers)
+            identical = file_bytes(os.path.join(directory, "parallel.csv")) == expected
+            print(f"{workers:8} {report['seconds']:9.3f} {serial_time / report['seconds']:8.2f} "
+                  f"{report['rows']:9} {report['rejected']:9} {identical}")
+            workers *= 2
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
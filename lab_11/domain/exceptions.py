@@ -15,6 +15,16 @@ class FileNotFoundException(PenguinAppException):
         super().__init__(f"File not found: {filename}")
 
 
+class InvalidFileFormatException(PenguinAppException):
+    """Raised when a data file cannot be read in its expected format"""
+    def __init__(self, filename, reason=""):
+        self.filename = filename
+        msg = f"Invalid file format: {filename}"
+        if reason:
+            msg += f" ({reason})"
+        super().__init__(msg)
+
+
 class NoDataLoadedException(PenguinAppException):
     """Raised when an operation is attempted without loaded data"""
     def __init__(self):
@@ -48,6 +58,23 @@ class InvalidFilterValueException(PenguinAppException):
         super().__init__(f"Invalid filter value: {value}. Expected {expected_type}.")
 
 
+class InvalidQueryException(PenguinAppException):
+    """Raised when a filter query cannot be parsed or planned"""
+    def __init__(self, query, reason):
+        self.query = query
+        self.reason = reason
+        super().__init__(f"Invalid query '{query}': {reason}")
+
+
+class InvalidAggregationException(PenguinAppException):
+    """Raised when an unknown aggregation function is requested"""
+    def __init__(self, aggregation, valid_aggregations):
+        self.aggregation = aggregation
+        self.valid_aggregations = valid_aggregations
+        super().__init__(f"Invalid aggregation: {aggregation}. "
+                         f"Valid aggregations are: {', '.join(valid_aggregations)}")
+
+
 class InvalidCommandException(PenguinAppException):
     """Raised when an invalid command is entered"""
     def __init__(self, command):
@@ -62,6 +89,17 @@ class InvalidSortOrderException(PenguinAppException):
         super().__init__(f"Invalid sort order: {order}. Use 'asc' or 'desc'.")
 
 
+class InvalidSortAlgorithmException(PenguinAppException):
+    """Raised when an unknown sorting algorithm is requested"""
+    def __init__(self, algorithm, valid_algorithms=None):
+        self.algorithm = algorithm
+        self.valid_algorithms = valid_algorithms
+        msg = f"Invalid sort algorithm: {algorithm}"
+        if valid_algorithms:
+            msg += f". Use one of: {', '.join(valid_algorithms)}"
+        super().__init__(msg)
+
+
 class InvalidPercentageException(PenguinAppException):
     """Raised when an invalid percentage is provided"""
     def __init__(self, value):
@@ -2,9 +2,25 @@
 Penguin domain entity
 Represents a single penguin with its attributes
 """
+from operator import attrgetter
 
 
 class Penguin:
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ('__species', '__flipper_length_mm', '__culmen_length_mm', '__culmen_depth_mm',
+                 '__body_mass_g', '__island', '__sex')
+
+    # Attribute name -> getter, built once for the class (names are mangled by __slots__)
+    _ATTRIBUTE_GETTERS = {
+        'species': attrgetter('_Penguin__species'),
+        'flipper_length_mm': attrgetter('_Penguin__flipper_length_mm'),
+        'culmen_length_mm': attrgetter('_Penguin__culmen_length_mm'),
+        'culmen_depth_mm': attrgetter('_Penguin__culmen_depth_mm'),
+        'body_mass_g': attrgetter('_Penguin__body_mass_g'),
+        'island': attrgetter('_Penguin__island'),
+        'sex': attrgetter('_Penguin__sex')
+    }
+
     def __init__(self, species: str, flipper_length_mm: float, culmen_length_mm: float,
                  culmen_depth_mm: float, body_mass_g: float, island: str, sex: str):
         """
@@ -72,22 +88,30 @@ class Penguin:
     def get_attribute(self, attribute: str):
         """
         Get attribute value by name
+        Uses the precomputed getter table, nothing is allocated per call
         :param attribute: attribute name
         :return: attribute value
         :raises AttributeError if attribute does not exist
         """
-        attribute_map = {
-            'species': self.__species,
-            'flipper_length_mm': self.__flipper_length_mm,
-            'culmen_length_mm': self.__culmen_length_mm,
-            'culmen_depth_mm': self.__culmen_depth_mm,
-            'body_mass_g': self.__body_mass_g,
-            'island': self.__island,
-            'sex': self.__sex
-        }
-        if attribute not in attribute_map:
+        try:
+            getter = Penguin._ATTRIBUTE_GETTERS[attribute]
+        except KeyError:
+            raise AttributeError(f"Unknown attribute: {attribute}")
+        return getter(self)
+
+    @staticmethod
+    def get_attribute_getter(attribute: str):
+        """
+        Get a callable that reads an attribute from a penguin
+        Useful as a sort/group key: getter(penguin) == penguin.get_attribute(attribute)
+        :param attribute: attribute name
+        :return: getter function
+        :raises AttributeError if attribute does not exist
+        """
+        try:
+            return Penguin._ATTRIBUTE_GETTERS[attribute]
+        except KeyError:
             raise AttributeError(f"Unknown attribute: {attribute}")
-        return attribute_map[attribute]
 
     def to_dict(self) -> dict:
         """
@@ -1,118 +1,309 @@
 """
 Generate Sort Benchmarks
-Creates datasets of various sizes and logs sorting performance
-Run this script to populate sort_performance.log with required benchmarks
+Sweeps dataset sizes, sorting algorithms, attributes, orders and input shapes,
+runs several timed trials of each configuration and writes the results as
+JSON and CSV (median, p95, stddev, ...)
+
+Run: python generate_sort_benchmarks.py --help
 """
+import argparse
+import csv
+import gc
+import json
+import math
 import os
+import platform
+import random
+import statistics
 import sys
+import time
+from datetime import datetime
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from domain.penguin import Penguin
 from repository.penguin_repo import PenguinRepo
 from repository.penguin_repo_file import PenguinRepoFile
+from repository.penguin_table import PenguinTable
 from service.penguin_service import PenguinService
+from service.sorting import SORT_ALGORITHMS, get_sort_algorithm
+
+SHAPES = ['random', 'presorted', 'reversed', 'duplicates']
+# Distinct source rows used for the 'duplicates' shape
+DUPLICATE_POOL_SIZE = 8
+# Algorithms that are too slow to run on big inputs
+QUADRATIC_ALGORITHMS = {'selection'}
+
+
+def build_dataset(base: PenguinTable, size: int, attribute: str, shape: str, rng: random.Random) -> tuple:
+    """
+    Build an input of a given size and shape by sampling base rows
+    Only the sampled rows become Penguin objects
+    :param base: table to sample from
+    :param size: number of penguins
+    :param attribute: attribute the keys are taken from
+    :param shape: 'random', 'presorted', 'reversed' or 'duplicates'
+    :param rng: random generator
+    :return: tuple (penguins, keys)
+    """
+    getter = Penguin.get_attribute_getter(attribute)
+    if shape == 'duplicates':
+        rows = rng.sample(range(len(base)), min(DUPLICATE_POOL_SIZE, len(base)))
+        pool = [base.get_row(row) for row in rows]
+        penguins = [rng.choice(pool) for _ in range(size)]
+    else:
+        penguins = [base.get_row(rng.randrange(len(base))) for _ in range(size)]
+
+    if shape == 'presorted':
+        penguins.sort(key=getter)
+    elif shape == 'reversed':
+        penguins.sort(key=getter, reverse=True)
+
+    return penguins, [getter(p) for p in penguins]
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values
+    :param sorted_values: sorted samples
+    :param fraction: percentile in [0, 1]
+    :return: sample value
+    """
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list) -> dict:
+    """
+    Compute summary statistics of timing samples (seconds)
+    :param samples: list of trial durations
+    :return: dictionary of statistics
+    """
+    ordered = sorted(samples)
+    return {
+        'trials': len(samples),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': percentile(ordered, 0.95),
+        'max': ordered[-1],
+        'stddev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def time_trials(engine, penguins: list, keys: list, reverse: bool, trials: int, warmup: int) -> list:
+    """
+    Time repeated runs of one sorting engine with the garbage collector paused
+    :return: list of durations in seconds (warm-up runs excluded)
+    """
+    for _ in range(warmup):
+        engine(penguins, keys, reverse)
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(trials):
+            start = time.perf_counter()
+            engine(penguins, keys, reverse)
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def run_suite(base: PenguinTable, args) -> list:
+    """
+    Run every benchmark configuration
+    :param base: table to sample inputs from
+    :param args: parsed command line arguments
+    :return: list of result rows
+    """
+    rng = random.Random(args.seed)
+    results = []
+
+    for size in args.sizes:
+        for attribute in args.attributes:
+            for shape in args.shapes:
+                penguins, keys = build_dataset(base, size, attribute, shape, rng)
+                for algorithm in args.algorithms:
+                    if algorithm in QUADRATIC_ALGORITHMS and size > args.max_quadratic_size:
+                        continue
+                    log_name, engine = get_sort_algorithm(algorithm)
+                    for order in args.orders:
+                        samples = time_trials(engine, penguins, keys, order == 'desc',
+                                              args.trials, args.warmup)
+                        row = {
+                            'size': size,
+                            'algorithm': log_name,
+                            'attribute': attribute,
+                            'order': order,
+                            'shape': shape,
+                        }
+                        row.update(summarize(samples))
+                        results.append(row)
+                        print(f"  n={size:<8} {log_name:14} {attribute:18} {order:4} {shape:10} "
+                              f"median={row['median']:.6f}s p95={row['p95']:.6f}s")
+    return results
+
+
+def write_results(results: list, output: str, args):
+    """
+    Write results to <output>.json and <output>.csv
+    :return: -
+    """
+    metadata = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'trials': args.trials,
+        'warmup': args.warmup,
+    }
+    with open(output + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'metadata': metadata, 'results': results}, f, indent=2)
 
+    if results:
+        with open(output + '.csv', 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
 
-def generate_benchmarks():
-    """Generate sort benchmarks for various dataset sizes"""
-    
-    # Initialize services
+
+def compare_with_baseline(results: list, baseline_file: str, tolerance: float) -> list:
+    """
+    Find configurations whose median got slower than a previous run
+    :param results: current result rows
+    :param baseline_file: JSON file written by an earlier run
+    :param tolerance: allowed slowdown ratio (e.g. 1.2 = 20% slower)
+    :return: list of (row, ratio) regressions
+    """
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+
+    def config(row):
+        return row['size'], row['algorithm'], row['attribute'], row['order'], row['shape']
+
+    previous = {config(row): row['median'] for row in baseline}
+    regressions = []
+    for row in results:
+        old_median = previous.get(config(row))
+        if old_median and row['median'] / old_median > tolerance:
+            regressions.append((row, row['median'] / old_median))
+    return regressions
+
+
+def load_base(args) -> PenguinTable:
+    """
+    Load the rows to sample inputs from
+    With --augment the base file is first grown on disk by PenguinService.augment_to_file
+    (streamed, seeded with --seed) into a columnar file, which is memory-mapped
+    rather than turned into Penguin objects
+    :param args: parsed command line arguments
+    :return: table of base rows (empty if the base file has none)
+    """
+    file_repo = PenguinRepoFile(args.data_dir)
+    if not args.augment:
+        table = PenguinTable()
+        table.extend(file_repo.iter_penguins(args.base))
+        return table
+
+    service = PenguinService(PenguinRepo(), file_repo)
+    if service.load_data(args.base) == 0:
+        return PenguinTable()
+    filename = (f"{os.path.basename(args.output)}_base_{args.augment_mode}_"
+                f"{int(args.augment)}pct_{args.seed}{PenguinRepoFile.COLUMNAR_SUFFIX}")
+    report = service.augment_to_file(args.augment, args.augment_mode, filename, seed=args.seed)
+    print(f"Augmented base written to '{filename}' ({report['rows']} penguins, {report['seconds']:.2f}s)")
+    return file_repo.open_columnar(filename)
+
+
+def log_through_service(base: PenguinTable, args):
+    """
+    Run one sort per size and algorithm through PenguinService.sort_data so the
+    runs are recorded in sort_performance.log like interactive sorts
+    """
     repo = PenguinRepo()
-    repo_file = PenguinRepoFile("data")
-    service = PenguinService(repo, repo_file)
-    
-    # Load base data
+    service = PenguinService(repo, PenguinRepoFile(args.data_dir))
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        for algorithm in args.algorithms:
+            if algorithm in QUADRATIC_ALGORITHMS and size > args.max_quadratic_size:
+                continue
+            repo.set_penguins([base.get_row(rng.randrange(len(base))) for _ in range(size)])
+            service.sort_data(args.attributes[0], args.orders[0], algorithm)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Sort benchmark suite for the penguin analyzer")
+    parser.add_argument('--base', default='good_penguins.csv',
+                        help="CSV file in the data directory to sample penguins from")
+    parser.add_argument('--data-dir', default='data', help="data directory")
+    parser.add_argument('--augment', type=float, default=0,
+                        help="grow the base set by this percentage (written to the data directory) before sampling")
+    parser.add_argument('--augment-mode', default='create', choices=['duplicate', 'create'])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 10000])
+    parser.add_argument('--algorithms', nargs='+', default=list(SORT_ALGORITHMS.keys()),
+                        choices=list(SORT_ALGORITHMS.keys()))
+    parser.add_argument('--attributes', nargs='+', default=['body_mass_g', 'species'],
+                        choices=Penguin.get_all_attributes())
+    parser.add_argument('--orders', nargs='+', default=['asc', 'desc'], choices=['asc', 'desc'])
+    parser.add_argument('--shapes', nargs='+', default=SHAPES, choices=SHAPES)
+    parser.add_argument('--trials', type=int, default=5, help="timed runs per configuration")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed runs per configuration")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-quadratic-size', type=int, default=2000,
+                        help="skip O(n^2) algorithms above this size")
+    parser.add_argument('--output', default='sort_benchmarks',
+                        help="output path prefix (.json and .csv are appended)")
+    parser.add_argument('--baseline', help="previous JSON results to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=1.2,
+                        help="median slowdown ratio reported as a regression")
+    parser.add_argument('--log', action='store_true',
+                        help="also record one sort per size/algorithm in sort_performance.log")
+    return parser.parse_args(argv)
+
+
+def generate_benchmarks(argv=None) -> int:
+    """
+    Run the benchmark suite
+    :return: process exit code (1 if regressions were found)
+    """
+    args = parse_args(argv)
+
     print("Loading base dataset...")
-    count = service.load_data("penguins.csv")
-    print(f"Loaded {count} penguins\n")
-    
-    print("=" * 60)
-    print("GENERATING SORT BENCHMARKS")
+    base = load_base(args)
+    if not len(base):
+        print(f"No penguins found in '{args.base}'")
+        return 1
+    print(f"Loaded {len(base)} penguins\n")
+
     print("=" * 60)
-    
-    # Benchmark 1: Less than 100 penguins (filter to get subset)
-    print("\n1. Testing with < 100 penguins...")
-    service.load_data("penguins.csv")
-    # Filter to get Chinstrap only (~68 penguins)
-    filtered = service.filter_data("species", "Chinstrap")
-    # Save and reload
-    service.save_filtered_data(filtered, "benchmark_small.csv")
-    service.load_data("benchmark_small.csv")
-    print(f"   Dataset size: {service.get_penguin_count()}")
-    service.sort_data("body_mass_g", "asc")
-    print("   ✓ Sort completed and logged")
-    
-    # Benchmark 2: 500-1000 penguins
-    print("\n2. Testing with 500-1000 penguins...")
-    service.load_data("penguins.csv")
-    augmented, filename = service.augment_data(150, "duplicate")
-    service.save_augmented_data(augmented, "benchmark_500_1000.csv")
-    service.load_data("benchmark_500_1000.csv")
-    print(f"   Dataset size: {service.get_penguin_count()}")
-    service.sort_data("flipper_length_mm", "desc")
-    print("   ✓ Sort completed and logged")
-    
-    # Benchmark 3: 1000-2000 penguins
-    print("\n3. Testing with 1000-2000 penguins...")
-    service.load_data("penguins.csv")
-    augmented, filename = service.augment_data(350, "create")
-    service.save_augmented_data(augmented, "benchmark_1000_2000.csv")
-    service.load_data("benchmark_1000_2000.csv")
-    print(f"   Dataset size: {service.get_penguin_count()}")
-    service.sort_data("culmen_length_mm", "asc")
-    print("   ✓ Sort completed and logged")
-    
-    # Benchmark 4: 5000-10000 penguins
-    print("\n4. Testing with 5000-10000 penguins...")
-    service.load_data("penguins.csv")
-    augmented, filename = service.augment_data(2000, "duplicate")
-    service.save_augmented_data(augmented, "benchmark_5000_10000.csv")
-    service.load_data("benchmark_5000_10000.csv")
-    print(f"   Dataset size: {service.get_penguin_count()}")
-    service.sort_data("body_mass_g", "desc")
-    print("   ✓ Sort completed and logged")
-    
-    # Benchmark 5: > 10000 penguins
-    print("\n5. Testing with > 10000 penguins...")
-    service.load_data("penguins.csv")
-    augmented, filename = service.augment_data(3500, "create")
-    service.save_augmented_data(augmented, "benchmark_10000_plus.csv")
-    service.load_data("benchmark_10000_plus.csv")
-    print(f"   Dataset size: {service.get_penguin_count()}")
-    service.sort_data("culmen_depth_mm", "asc")
-    print("   ✓ Sort completed and logged")
-    
-    print("\n" + "=" * 60)
-    print("BENCHMARKS COMPLETE")
+    print("RUNNING SORT BENCHMARKS")
     print("=" * 60)
-    
-    # Display log file contents
-    print("\nSort Performance Log (sort_performance.log):")
-    print("-" * 60)
-    try:
-        with open("sort_performance.log", "r") as f:
-            print(f.read())
-    except FileNotFoundError:
-        print("Log file not found!")
-    
-    # Cleanup benchmark files
-    print("\nCleaning up benchmark files...")
-    benchmark_files = [
-        "data/benchmark_small.csv",
-        "data/benchmark_500_1000.csv", 
-        "data/benchmark_1000_2000.csv",
-        "data/benchmark_5000_10000.csv",
-        "data/benchmark_10000_plus.csv"
-    ]
-    for f in benchmark_files:
-        try:
-            os.remove(f)
-            print(f"  Deleted {f}")
-        except FileNotFoundError:
-            pass
-    print("Cleanup complete!")
+    results = run_suite(base, args)
+    write_results(results, args.output, args)
+    print(f"\nWrote {len(results)} results to {args.output}.json and {args.output}.csv")
+
+    if args.log:
+        log_through_service(base, args)
+        print("Runs recorded in sort_performance.log")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.2f}x:")
+            for row, ratio in regressions:
+                print(f"  n={row['size']} {row['algorithm']} {row['attribute']} {row['order']} "
+                      f"{row['shape']}: {ratio:.2f}x slower")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
 
 
 if __name__ == "__main__":
-    generate_benchmarks()
+    sys.exit(generate_benchmarks())
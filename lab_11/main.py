@@ -18,23 +18,77 @@ from service.classifier_service import ClassifierService
 from ui.console import Console
 
 
-def preprocess_data():
+def preprocess_data(workers: int = 1):
     """
     Preprocess raw penguins.csv to create penguins_data.csv
     This should be run before the main application if working with raw data.
+    :param workers: number of worker processes, 1 runs in this process
     """
     file_repo = PenguinRepoFile("data")
     repo = PenguinRepo()
     service = PenguinService(repo, file_repo)
     
     try:
-        count = service.preprocess_data("penguins.csv", "penguins_data.csv")
-        print(f"Preprocessing complete: {count} valid rows saved to penguins_data.csv")
+        if workers > 1:
+            report = service.preprocess_data_parallel("penguins.csv", "penguins_data.csv", workers)
+            print(f"Preprocessing complete: {report['rows']} valid rows saved to penguins_data.csv "
+                  f"({report['rejected']} rejected, {report['workers']} workers, {report['seconds']:.3f}s)")
+            for i, chunk in enumerate(report['chunks'], 1):
+                print(f"  chunk {i}: bytes {chunk['start']}-{chunk['end']}, {chunk['rows']} rows, "
+                      f"{chunk['rejected']} rejected, {chunk['seconds']:.3f}s")
+        else:
+            count = service.preprocess_data("penguins.csv", "penguins_data.csv")
+            print(f"Preprocessing complete: {count} valid rows saved to penguins_data.csv")
     except Exception as e:
         print(f"Preprocessing failed: {e}")
         print("Make sure 'penguins.csv' exists in the 'data' directory.")
 
 
+def predict_file(arguments: list):
+    """
+    Label an unlabeled CSV file with the kNN classifier trained on a loaded dataset
+    :param arguments: [input file, output file] followed by optional
+                      --train FILE, --model FILE, --k K and --workers N options
+    """
+    usage = ("Usage: python main.py --predict <input> <output> [--train FILE | --model FILE] "
+             "[--k K] [--workers N]")
+    if len(arguments) < 2:
+        print(usage)
+        return
+    input_file, output_file = arguments[0], arguments[1]
+    options = {'--train': "penguins_data.csv", '--model': None, '--k': "5",
+               '--workers': str(os.cpu_count() or 1)}
+    for option in options:
+        if option in arguments:
+            try:
+                options[option] = arguments[arguments.index(option) + 1]
+            except IndexError:
+                print(usage)
+                return
+    try:
+        k, workers = int(options['--k']), int(options['--workers'])
+    except ValueError:
+        print(usage)
+        return
+
+    file_repo = PenguinRepoFile("data")
+    repo = PenguinRepo()
+    service = PenguinService(repo, file_repo)
+    classifier = ClassifierService(repo, file_repo)
+    try:
+        if options['--model']:
+            # A saved model starts without loading or indexing the training data
+            classifier.load_model(options['--model'])
+        else:
+            service.load_data(options['--train'])
+        report = classifier.predict_file(input_file, output_file, k, workers)
+        print(f"Prediction complete: {report['classified']} of {report['rows']} rows classified into "
+              f"{output_file} ({report['skipped']} skipped, {report['workers']} workers, "
+              f"{report['seconds']:.3f}s)")
+    except Exception as e:
+        print(f"Prediction failed: {e}")
+
+
 def run_tests():
     """Run all unit tests"""
     from all_tests.run_all_tests import run_all_tests
@@ -47,7 +101,17 @@ def main():
     # Check command line arguments
     if len(sys.argv) > 1:
         if sys.argv[1] == '--preprocess':
-            preprocess_data()
+            workers = 1
+            if '--workers' in sys.argv:
+                try:
+                    workers = int(sys.argv[sys.argv.index('--workers') + 1])
+                except (IndexError, ValueError):
+                    print("Usage: python main.py --preprocess [--workers N]")
+                    return
+            preprocess_data(workers)
+            return
+        elif sys.argv[1] == '--predict':
+            predict_file(sys.argv[2:])
             return
         elif sys.argv[1] == '--test':
             success = run_tests()
@@ -58,6 +122,9 @@ def main():
             print("Usage:")
             print("  python main.py           - Run the application")
             print("  python main.py --preprocess - Preprocess raw data")
+            print("  python main.py --preprocess --workers N - Preprocess with N processes")
+            print("  python main.py --predict <input> <output> [--train FILE | --model FILE] [--k K] [--workers N]")
+            print("                           - Label a CSV of measurements with kNN")
             print("  python main.py --test    - Run unit tests")
             print("  python main.py --help    - Show this help")
             return
@@ -68,7 +135,7 @@ def main():
     
     penguin_service = PenguinService(penguin_repo, penguin_repo_file)
     stats_service = StatsService(penguin_repo)
-    classifier_service = ClassifierService(penguin_repo)
+    classifier_service = ClassifierService(penguin_repo, penguin_repo_file)
     
     # Create and run console
     console = Console(penguin_service, stats_service, classifier_service)
@@ -0,0 +1,146 @@
+"""
+Bitmap Index
+One bitset per distinct value of a dictionary-encoded column, stored as a
+Python int where bit i is set if row i has that value. Equality filters,
+conjunctions (AND of bitsets) and value counts (popcount) then work on whole
+machine words instead of comparing rows one by one
+"""
+from array import array
+from itertools import compress
+
+# Turns the ASCII binary digits of a bitset into 0/1 selector bytes
+_SELECTOR_TABLE = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class BitmapIndex:
+    # Appends shorter than this are buffered and merged into the bitsets in one batch
+    BATCH_ROWS = 4096
+
+    def __init__(self):
+        # code -> int bitset of the rows holding that code
+        self.__bitmaps = {}
+        self.__size = 0
+        # Codes of appended rows not yet merged into the bitsets
+        self.__pending = []
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def extend(self, codes):
+        """
+        Index rows appended after the ones already indexed
+        Every merge rebuilds each touched bitset (Python ints are immutable), so
+        short appends such as single rows are buffered and merged together once
+        BATCH_ROWS rows are pending or the next read comes. Longer slices get
+        their own bitsets which are shifted into place and OR-ed in directly
+
+        Time Complexity: O(m) amortized for a buffered append, O(m + d * n / 64)
+                         for a merge where m is the number of new rows, d the
+                         number of distinct codes among them and n the row count
+        Space Complexity: O(n * d / 8) bytes for all bitsets
+
+        :param codes: code column slice of the new rows (array or memoryview)
+        :return: -
+        """
+        if len(codes) < self.BATCH_ROWS:
+            self.__pending.extend(codes)
+            self.__size += len(codes)
+            if len(self.__pending) >= self.BATCH_ROWS:
+                self._flush()
+            return
+        self._flush()
+        self._merge(codes, self.__size)
+        self.__size += len(codes)
+
+    def _flush(self):
+        """
+        Merge the buffered rows into the bitsets
+        :return: -
+        """
+        if not self.__pending:
+            return
+        pending = self.__pending
+        self.__pending = []
+        codes = bytes(pending) if max(pending) < 256 else array('H', pending)
+        self._merge(codes, self.__size - len(pending))
+
+    def _merge(self, codes, offset: int):
+        """
+        OR the bitsets of a code slice into place
+        :param codes: code column slice
+        :param offset: row id of the first row of the slice
+        :return: -
+        """
+        for code, bits in self.chunk_bitmaps(codes).items():
+            self.__bitmaps[code] = self.__bitmaps.get(code, 0) | (bits << offset)
+
+    @staticmethod
+    def chunk_bitmaps(codes) -> dict:
+        """
+        Build the bitsets of a code column slice
+        One-byte codes are turned into a string of '0'/'1' characters with
+        bytes.translate and parsed with int(..., 2), wider codes fall back to
+        a comprehension per distinct code
+
+        :param codes: sequence of integer codes
+        :return: dictionary code -> int bitset (bit 0 = first row of the slice)
+        """
+        if not len(codes):
+            return {}
+        result = {}
+        if memoryview(codes).itemsize == 1:
+            data = bytes(codes)
+            for code in set(data):
+                table = bytearray(b'0' * 256)
+                table[code] = ord('1')
+                # Row 0 must be the least significant bit, so reverse before parsing
+                result[code] = int(data.translate(table)[::-1], 2)
+        else:
+            for code in set(codes):
+                result[code] = int(bytes(48 + (c == code) for c in reversed(codes)), 2)
+        return result
+
+    def get_bitmap(self, code: int) -> int:
+        """
+        Get the bitset of one code
+        :param code: dictionary code
+        :return: int bitset (0 if no row has the code)
+        """
+        self._flush()
+        return self.__bitmaps.get(code, 0)
+
+    def count(self, code: int) -> int:
+        """
+        Count rows holding a code
+
+        Time Complexity: O(n / 64) popcount
+        Space Complexity: O(1)
+
+        :param code: dictionary code
+        :return: number of rows
+        """
+        return self.get_bitmap(code).bit_count()
+
+    def counts(self) -> dict:
+        """
+        Count rows per code
+        :return: dictionary code -> number of rows (codes without rows omitted)
+        """
+        self._flush()
+        return {code: bits.bit_count() for code, bits in self.__bitmaps.items() if bits}
+
+    @staticmethod
+    def to_rows(bits: int) -> list:
+        """
+        Get the row ids of the set bits of a bitset
+
+        Time Complexity: O(n) C-level work where n is the position of the highest set bit
+        Space Complexity: O(n) bytes for the temporary selector string
+
+        :param bits: int bitset
+        :return: ascending list of row ids
+        """
+        if not bits:
+            return []
+        selectors = format(bits, 'b').encode()[::-1].translate(_SELECTOR_TABLE)
+        return list(compress(range(len(selectors)), selectors))
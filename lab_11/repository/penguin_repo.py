@@ -1,13 +1,88 @@
 """
 In-memory Penguin Repository
 Handles CRUD operations for penguins in memory
+Data is stored column by column in a PenguinTable
 """
 from domain.penguin import Penguin
+from repository.bitmap_index import BitmapIndex
+from repository.penguin_table import PenguinTable
+from repository.running_stats import RunningStats
+from repository.sorted_index import SortedIndex
 
 
 class PenguinRepo:
     def __init__(self):
-        self.__penguins = []
+        self.__table = PenguinTable()
+        # Penguin objects are only built when a caller asks for them
+        self.__penguins = None
+        # attribute -> SortedIndex, built on the first range filter and
+        # brought up to date with appended rows on the next read
+        self.__sorted_indexes = {}
+        # string attribute -> BitmapIndex, kept up to date on every change
+        self.__bitmaps = {}
+        self._rebuild_bitmaps()
+        # numeric attribute -> RunningStats, None until first needed after a replacement
+        self.__aggregates = None
+        # Incremented on every change so services can tell when derived data is stale
+        self.__version = 0
+
+    def _invalidate(self):
+        """
+        Drop everything derived from the table after it changed
+        :return: -
+        """
+        self.__penguins = None
+        self.__sorted_indexes = {}
+        self.__version += 1
+
+    def _appended(self, old_size: int):
+        """
+        Keep derived data after rows were appended: cached Penguin objects get
+        the new rows only, sorted indexes catch up on their next read
+        :param old_size: row count before the append
+        :return: -
+        """
+        if self.__penguins is not None:
+            get_row = self.__table.get_row
+            self.__penguins.extend(get_row(i) for i in range(old_size, len(self.__table)))
+        self.__version += 1
+
+    def get_version(self) -> int:
+        """
+        Get the dataset version, which changes whenever the penguins change
+        :return: version number
+        """
+        return self.__version
+
+    def _update_aggregates(self):
+        """
+        Fold the rows appended since the last update into the running aggregates
+        :return: -
+        """
+        if self.__aggregates is None:
+            return
+        for attr, stats in self.__aggregates.items():
+            column = self.__table.get_numeric_column(attr)
+            if stats.get_count() < len(column):
+                stats.update(column[stats.get_count():])
+
+    def _rebuild_bitmaps(self):
+        """
+        Index every row of the table from scratch
+        :return: -
+        """
+        self.__bitmaps = {attr: BitmapIndex() for attr in Penguin.get_string_attributes()}
+        self._update_bitmaps()
+
+    def _update_bitmaps(self):
+        """
+        Index the rows appended since the last update
+        :return: -
+        """
+        for attr, index in self.__bitmaps.items():
+            codes = self.__table.get_codes(attr)
+            if len(index) < len(codes):
+                index.extend(codes[len(index):])
 
     def add_penguin(self, penguin: Penguin):
         """
@@ -15,7 +90,11 @@ class PenguinRepo:
         :param penguin: penguin to add
         :return: -
         """
-        self.__penguins.append(penguin)
+        old_size = len(self.__table)
+        self.__table.append(penguin)
+        self._update_bitmaps()
+        self._update_aggregates()
+        self._appended(old_size)
 
     def add_all(self, penguins: list):
         """
@@ -23,13 +102,21 @@ class PenguinRepo:
         :param penguins: list of penguins
         :return: -
         """
-        self.__penguins.extend(penguins)
+        old_size = len(self.__table)
+        self.__table.extend(penguins)
+        self._update_bitmaps()
+        self._update_aggregates()
+        self._appended(old_size)
 
     def get_all_penguins(self) -> list:
         """
         Get all penguins
+        The Penguin objects are built from the columns on first call and
+        cached; appended rows are added to the cache, a replacement drops it
         :return: list of all penguins
         """
+        if self.__penguins is None:
+            self.__penguins = list(self.__table.iter_rows())
         return self.__penguins
 
     def get_penguin_count(self) -> int:
@@ -37,14 +124,35 @@ class PenguinRepo:
         Get the number of penguins
         :return: count of penguins
         """
-        return len(self.__penguins)
+        return len(self.__table)
+
+    def get_table(self) -> PenguinTable:
+        """
+        Get the columnar storage (read-only use)
+        :return: the PenguinTable backing this repository
+        """
+        return self.__table
+
+    def set_table(self, table: PenguinTable):
+        """
+        Replace all penguins with an already built table
+        :param table: new columnar storage
+        :return: -
+        """
+        self.__table = table
+        self._rebuild_bitmaps()
+        self.__aggregates = None
+        self._invalidate()
 
     def clear(self):
         """
         Remove all penguins from repository
         :return: -
         """
-        self.__penguins = []
+        self.__table = PenguinTable()
+        self._rebuild_bitmaps()
+        self.__aggregates = None
+        self._invalidate()
 
     def set_penguins(self, penguins: list):
         """
@@ -52,41 +160,266 @@ class PenguinRepo:
         :param penguins: new list of penguins
         :return: -
         """
-        self.__penguins = penguins
+        table = PenguinTable()
+        table.extend(penguins)
+        self.__table = table
+        self._rebuild_bitmaps()
+        self.__aggregates = None
+        self._invalidate()
 
     def get_penguins_by_filter(self, attribute: str, value, is_numeric: bool) -> list:
         """
         Get penguins filtered by attribute value
         For numeric: returns penguins where attribute > value
         For string: returns penguins where attribute == value
-        
-        Time Complexity: O(n) where n is the number of penguins
+
+        Numeric columns are answered from a sorted index (built on first use),
+        string columns from their bitmap index
+
+        Time Complexity: O(log n + k log k) with a sorted index, O(n / 64 + k) with a
+                         bitmap index, where n is the number of penguins and k the number of matches
         Space Complexity: O(k) where k is the number of matching penguins
-        
+
         :param attribute: attribute name to filter by
         :param value: value to compare against
         :param is_numeric: True if numeric comparison (>), False if string comparison (==)
-        :return: list of matching penguins
-        """
-        result = []
-        for penguin in self.__penguins:
-            attr_value = penguin.get_attribute(attribute)
-            if is_numeric:
-                if attr_value > value:
-                    result.append(penguin)
-            else:
-                if attr_value == value:
-                    result.append(penguin)
-        return result
+        :return: list of matching penguins in repository order
+        """
+        if is_numeric and self.__table.is_numeric(attribute):
+            rows = self.get_sorted_index(attribute).rows_greater(value)
+        elif not is_numeric and attribute in self.__bitmaps:
+            return self.get_penguins_matching({attribute: value})
+        else:
+            rows = self.__table.find_rows(attribute, value, is_numeric)
+        return self._rows_to_penguins(rows)
+
+    def get_penguins_matching(self, conditions: dict) -> list:
+        """
+        Get penguins whose string attributes equal all given values (AND)
+        The bitmaps of the requested values are AND-ed together
+
+        Time Complexity: O(c * n / 64 + k) where c is the number of conditions
+        Space Complexity: O(n / 8) bytes for the intermediate bitset plus O(k)
+
+        :param conditions: dictionary string attribute -> required value
+        :return: list of matching penguins in repository order
+        """
+        return self._rows_to_penguins(BitmapIndex.to_rows(self.match_bitmap(conditions)))
+
+    def count_matching(self, conditions: dict) -> int:
+        """
+        Count penguins whose string attributes equal all given values (AND)
+
+        Time Complexity: O(c * n / 64) where c is the number of conditions
+        Space Complexity: O(n / 8) bytes for the intermediate bitset
+
+        :param conditions: dictionary string attribute -> required value
+        :return: number of matching penguins
+        """
+        return self.match_bitmap(conditions).bit_count()
+
+    def match_bitmap(self, conditions: dict) -> int:
+        """
+        Get the bitset of rows whose string attributes equal all given values
+        :param conditions: dictionary string attribute -> required value
+        :return: int bitset (all rows if there are no conditions)
+        """
+        bits = (1 << len(self.__table)) - 1
+        for attribute, value in conditions.items():
+            index = self.get_bitmap_index(attribute)
+            code = self.__table.get_code(attribute, value)
+            bits &= 0 if code is None else index.get_bitmap(code)
+            if not bits:
+                break
+        return bits
+
+    def get_penguins_in_range(self, attribute: str, low: float, high: float) -> list:
+        """
+        Get penguins whose numeric attribute lies in [low, high]
+
+        Time Complexity: O(log n + k log k) once the sorted index exists
+        Space Complexity: O(k) where k is the number of matching penguins
+
+        :param attribute: numeric attribute name
+        :param low: lower bound (inclusive)
+        :param high: upper bound (inclusive)
+        :return: list of matching penguins in repository order
+        """
+        rows = self.get_sorted_index(attribute).rows_between(low, high)
+        return self._rows_to_penguins(rows)
+
+    def get_bitmap_index(self, attribute: str) -> BitmapIndex:
+        """
+        Get the bitmap index of a string attribute (read-only use)
+        :param attribute: string attribute name
+        :return: BitmapIndex of the column
+        """
+        index = self.__bitmaps.get(attribute)
+        if index is None:
+            raise AttributeError(f"Not a string attribute: {attribute}")
+        return index
+
+    def has_sorted_index(self, attribute: str) -> bool:
+        """
+        Check if the sorted index of an attribute is already built
+        :param attribute: numeric attribute name
+        :return: True if get_sorted_index would not have to build it (it may still catch up on appended rows)
+        """
+        return attribute in self.__sorted_indexes
+
+    def get_sorted_index(self, attribute: str) -> SortedIndex:
+        """
+        Get the sorted index of a numeric attribute, building it if needed
+        Rows appended since the last read are merged in now; the index is
+        dropped when the penguins are replaced
+
+        Time Complexity: O(n log n) on first use, O(n + m log m) after m appended rows, O(1) otherwise
+        Space Complexity: O(n)
+
+        :param attribute: numeric attribute name
+        :return: SortedIndex of the column
+        """
+        index = self.__sorted_indexes.get(attribute)
+        column = self.__table.get_numeric_column(attribute)
+        if index is None:
+            index = SortedIndex(column)
+            self.__sorted_indexes[attribute] = index
+        elif len(index) < len(column):
+            index.extend(column)
+        return index
+
+    def get_penguins_by_rows(self, rows: list) -> list:
+        """
+        Get Penguin objects for row indices (e.g. the result of a query plan)
+        :param rows: row indices
+        :return: list of penguins
+        """
+        return self._rows_to_penguins(rows)
+
+    def _rows_to_penguins(self, rows: list) -> list:
+        """
+        Get Penguin objects for row indices, reusing cached objects if available
+        :param rows: row indices
+        :return: list of penguins
+        """
+        if self.__penguins is not None:
+            penguins = self.__penguins
+            return [penguins[i] for i in rows]
+        get_row = self.__table.get_row
+        return [get_row(i) for i in rows]
 
     def get_attribute_values(self, attribute: str) -> list:
         """
         Get all values for a specific attribute
-        
+
         Time Complexity: O(n) where n is the number of penguins
         Space Complexity: O(n) for the result list
-        
+
         :param attribute: attribute name
         :return: list of attribute values
         """
-        return [penguin.get_attribute(attribute) for penguin in self.__penguins]
+        return self.__table.get_values(attribute)
+
+    def get_numeric_column(self, attribute: str):
+        """
+        Get the contiguous buffer of a numeric attribute without copying
+
+        Time Complexity: O(1)
+        Space Complexity: O(1)
+
+        :param attribute: numeric attribute name
+        :return: array('d') of values (must not be modified)
+        """
+        return self.__table.get_numeric_column(attribute)
+
+    def get_aggregates(self, attribute: str) -> RunningStats:
+        """
+        Get count, sum, min, max, mean and variance of a numeric attribute
+        The aggregates are kept up to date by add_penguin/add_all and rebuilt
+        with one scan the first time they are needed after the data was replaced
+
+        Time Complexity: O(1), O(n) for the first call after set_penguins/set_table/clear
+        Space Complexity: O(1)
+
+        :param attribute: numeric attribute name
+        :return: RunningStats of the column (must not be modified)
+        """
+        if self.__aggregates is None:
+            self.__aggregates = {attr: RunningStats.from_values(self.__table.get_numeric_column(attr))
+                                 for attr in Penguin.get_numeric_attributes()}
+        stats = self.__aggregates.get(attribute)
+        if stats is None:
+            raise AttributeError(f"Not a numeric attribute: {attribute}")
+        return stats
+
+    def group_rows(self, keys: list) -> dict:
+        """
+        Group row ids by the values of one or more attributes
+        One hash pass over the key columns; string columns are grouped on their
+        integer codes and decoded once per group at the end
+
+        Time Complexity: O(n * c) where c is the number of key attributes
+        Space Complexity: O(n) for the row lists
+
+        :param keys: attribute names to group by
+        :return: dictionary key tuple (one value per key attribute) -> list of row ids
+        """
+        table = self.__table
+        columns = [table.get_numeric_column(key) if table.is_numeric(key) else table.get_codes(key)
+                   for key in keys]
+        groups = {}
+        for row, key in enumerate(zip(*columns)):
+            rows = groups.get(key)
+            if rows is None:
+                groups[key] = [row]
+            else:
+                rows.append(row)
+
+        decoders = [None if table.is_numeric(key) else table.get_dictionary(key) for key in keys]
+        return {tuple(value if decoder is None else decoder[value] for value, decoder in zip(key, decoders)): rows
+                for key, rows in groups.items()}
+
+    def group_values(self, keys: list, attribute: str) -> dict:
+        """
+        Get the values of a numeric attribute for every group of rows
+        :param keys: attribute names to group by
+        :param attribute: numeric attribute to collect
+        :return: dictionary key tuple -> list of values in repository order
+        """
+        column = self.__table.get_numeric_column(attribute)
+        return {key: list(map(column.__getitem__, rows)) for key, rows in self.group_rows(keys).items()}
+
+    def group_aggregates(self, keys: list, attributes: list) -> dict:
+        """
+        Get RunningStats of numeric attributes for every group of rows
+
+        Time Complexity: O(n * (c + a)) for c key attributes and a aggregated attributes
+        Space Complexity: O(n) for the row lists plus O(g * a) for g groups
+
+        :param keys: attribute names to group by
+        :param attributes: numeric attributes to aggregate
+        :return: dictionary key tuple -> {attribute: RunningStats}
+        """
+        columns = {attr: self.__table.get_numeric_column(attr) for attr in attributes}
+        result = {}
+        for key, rows in self.group_rows(keys).items():
+            result[key] = {attr: RunningStats.from_values(list(map(column.__getitem__, rows)))
+                           for attr, column in columns.items()}
+        return result
+
+    def count_values(self, attribute: str) -> dict:
+        """
+        Count how many penguins have each value of an attribute
+        String attributes are counted with a popcount of their bitmaps
+
+        Time Complexity: O(n) where n is the number of penguins (O(k * n / 64) for string attributes)
+        Space Complexity: O(k) where k is the number of unique values
+
+        :param attribute: attribute name
+        :return: dictionary mapping values to counts
+        """
+        index = self.__bitmaps.get(attribute)
+        if index is None:
+            return self.__table.count_values(attribute)
+        dictionary = self.__table.get_dictionary(attribute)
+        return {dictionary[code]: count for code, count in sorted(index.counts().items())}
@@ -4,17 +4,48 @@ Handles CSV file operations for penguin data
 """
 import os
 import csv
+import hashlib
+import io
+import struct
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from domain.penguin import Penguin
-from domain.exceptions import FileNotFoundException
+from domain.exceptions import FileNotFoundException, InvalidFileFormatException
+from repository.penguin_table import PenguinTable
 
 
 class PenguinRepoFile:
-    def __init__(self, data_directory: str = "data"):
+    # Accepted column names for each attribute: preprocessed name first, raw export name second
+    COLUMN_ALIASES = {
+        'species': ('species', 'Species'),
+        'flipper_length_mm': ('flipper_length_mm', 'Flipper Length (mm)'),
+        'culmen_length_mm': ('culmen_length_mm', 'Culmen Length (mm)'),
+        'culmen_depth_mm': ('culmen_depth_mm', 'Culmen Depth (mm)'),
+        'body_mass_g': ('body_mass_g', 'Body Mass (g)'),
+        'island': ('island', 'Island'),
+        'sex': ('sex', 'Sex')
+    }
+
+    # Native memory-mapped columnar dataset files
+    COLUMNAR_SUFFIX = '.pcol'
+
+    # Binary sidecar cache: parsed columns stored next to each CSV
+    CACHE_SUFFIX = '.pcache'
+    CACHE_MAGIC = b'PGSC'
+    # magic, CSV size, CSV mtime (ns), CSV content hash
+    CACHE_HEADER = struct.Struct('<4sQq32s')
+    DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+    def __init__(self, data_directory: str = "data", cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
         """
         Initialize file repository
         :param data_directory: directory where CSV files are stored
+        :param cache_max_bytes: total size allowed for sidecar cache files, 0 disables the cache
         """
         self.__data_directory = data_directory
+        self.__cache_max_bytes = cache_max_bytes
         self._ensure_directory_exists()
 
     def _ensure_directory_exists(self):
@@ -28,12 +59,12 @@ class PenguinRepoFile:
 
     def get_available_files(self) -> list:
         """
-        Get list of all CSV files in the data directory
-        :return: list of CSV filenames
+        Get list of all CSV and columnar files in the data directory
+        :return: list of filenames
         """
         try:
             files = os.listdir(self.__data_directory)
-            return [f for f in files if f.endswith('.csv')]
+            return [f for f in files if f.endswith('.csv') or f.endswith(self.COLUMNAR_SUFFIX)]
         except FileNotFoundError:
             return []
 
@@ -44,69 +75,417 @@ class PenguinRepoFile:
         :return: list of Penguin objects
         :raises FileNotFoundException if file doesn't exist
         """
+        return list(self.iter_penguins(filename))
+
+    # ==================== COLUMNAR FILES ====================
+    def is_columnar_file(self, filename: str) -> bool:
+        """Check if a filename refers to the native columnar format"""
+        return filename.endswith(self.COLUMNAR_SUFFIX)
+
+    @staticmethod
+    @contextmanager
+    def _open_replacing(filepath: str, mode: str, **kwargs):
+        """
+        Open a temporary file next to filepath that replaces it once the block succeeds
+        If the block raises, the temporary file is removed and filepath is left untouched,
+        so a failed or interrupted write never leaves partial output behind
+        :param filepath: path of the file to write
+        :param mode: open mode ('w' or 'wb')
+        :param kwargs: further arguments for open
+        :return: the open temporary file
+        """
+        temp_path = filepath + '.tmp'
+        try:
+            with open(temp_path, mode, **kwargs) as file:
+                yield file
+            os.replace(temp_path, filepath)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def save_columnar(self, filename: str, table: PenguinTable):
+        """
+        Save a table in the native columnar format
+        Written to a temporary file first so processes mapping the old file are not disturbed
+        :param filename: name of the file to save to
+        :param table: columns to save
+        :return: -
+        """
+        filepath = os.path.join(self.__data_directory, filename)
+        with self._open_replacing(filepath, 'wb') as file:
+            table.write_columnar(file)
+
+    def save_columnar_chunks(self, filename: str, size: int, typecodes: dict, dictionaries: dict,
+                             column_chunks) -> int:
+        """
+        Save a stream of column chunks in the native columnar format (see PenguinTable.write_columnar_chunks)
+        Written to a temporary file first so an interrupted run leaves no partial output
+        :param filename: name of the file to save to
+        :param size: total number of rows
+        :param typecodes: attribute -> typecode of its column
+        :param dictionaries: string attribute -> list of values indexed by code
+        :param column_chunks: iterable of dicts attribute -> column values
+        :return: number of rows written
+        """
+        filepath = os.path.join(self.__data_directory, filename)
+        with self._open_replacing(filepath, 'wb') as file:
+            PenguinTable.write_columnar_chunks(file, size, typecodes, dictionaries, column_chunks)
+        return size
+
+    def open_columnar(self, filename: str) -> PenguinTable:
+        """
+        Open a columnar file without reading it: columns are memory-mapped
+        :param filename: name of the file to open
+        :return: read-only PenguinTable served from the mapping
+        :raises FileNotFoundException if file doesn't exist
+        :raises InvalidFileFormatException if the file is not a valid columnar file
+        """
+        filepath = os.path.join(self.__data_directory, filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundException(filename)
+        try:
+            return PenguinTable.map_columnar(filepath)
+        except (ValueError, OSError, UnicodeDecodeError, struct.error) as e:
+            raise InvalidFileFormatException(filename, str(e))
+
+    # ==================== SIDECAR CACHE ====================
+    def _cache_path(self, filename: str) -> str:
+        """Path of the (hidden) sidecar file of a CSV file, next to the CSV file"""
+        directory, name = os.path.split(filename)
+        return os.path.join(self.__data_directory, directory, '.' + name + self.CACHE_SUFFIX)
+
+    @staticmethod
+    def _content_hash(filepath: str) -> bytes:
+        """
+        Hash the content of a file
+        :param filepath: file to hash
+        :return: 32-byte BLAKE2b digest
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        with open(filepath, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.digest()
+
+    def load_cached_table(self, filename: str):
+        """
+        Load the parsed columns of a CSV file from its sidecar cache
+        The sidecar is valid when the CSV size and mtime match; if only the mtime
+        changed the content hash decides. Stale or corrupt sidecars are deleted.
+        
+        Time Complexity: O(n) raw reads, no text parsing
+        Space Complexity: O(n) for the columns
+        
+        :param filename: CSV file name
+        :return: PenguinTable, or None if there is no valid sidecar
+        :raises FileNotFoundException if the CSV file doesn't exist
+        """
+        filepath = os.path.join(self.__data_directory, filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundException(filename)
+        cache_path = self._cache_path(filename)
+        if not self.__cache_max_bytes or not os.path.exists(cache_path):
+            return None
+
+        stat = os.stat(filepath)
+        refresh_header = False
+        try:
+            with open(cache_path, 'rb') as cache:
+                magic, size, mtime_ns, content_hash = self.CACHE_HEADER.unpack(
+                    cache.read(self.CACHE_HEADER.size))
+                if magic != self.CACHE_MAGIC or size != stat.st_size:
+                    raise ValueError("stale sidecar")
+                if mtime_ns != stat.st_mtime_ns:
+                    if self._content_hash(filepath) != content_hash:
+                        raise ValueError("stale sidecar")
+                    refresh_header = True
+                table = PenguinTable.load(cache)
+        except (OSError, ValueError, struct.error, UnicodeDecodeError):
+            self._remove_cache_file(cache_path)
+            return None
+
+        try:
+            if refresh_header:
+                # Same content, new timestamp: remember it to skip hashing next time
+                with open(cache_path, 'r+b') as cache:
+                    cache.write(self.CACHE_HEADER.pack(self.CACHE_MAGIC, stat.st_size,
+                                                       stat.st_mtime_ns, content_hash))
+            # Mark as recently used for LRU eviction
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return table
+
+    def get_source_state(self, filename: str):
+        """
+        Capture what a sidecar must match: the CSV size, mtime and content hash
+        Taken before the CSV is parsed, so an edit made during the parse makes
+        the sidecar stale instead of being cached as fresh
+        :param filename: CSV file name
+        :return: tuple (size, mtime in ns, content hash), or None if the cache is disabled or the file unreadable
+        """
+        if not self.__cache_max_bytes:
+            return None
+        filepath = os.path.join(self.__data_directory, filename)
+        try:
+            stat = os.stat(filepath)
+            return stat.st_size, stat.st_mtime_ns, self._content_hash(filepath)
+        except OSError:
+            return None
+
+    def save_cached_table(self, filename: str, table: PenguinTable, source_state: tuple):
+        """
+        Write the sidecar cache of a CSV file, then evict least recently used
+        sidecars while the cache is over its size limit
+        The cache is best-effort: if the sidecar cannot be written (missing
+        directory, read-only directory, full disk) nothing is cached
+        :param filename: CSV file name the table was parsed from
+        :param table: parsed columns
+        :param source_state: get_source_state of the CSV taken before parsing it (None to skip caching)
+        :return: -
+        """
+        if not self.__cache_max_bytes or source_state is None:
+            return
+        cache_path = self._cache_path(filename)
+        temp_path = cache_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as cache:
+                cache.write(self.CACHE_HEADER.pack(self.CACHE_MAGIC, *source_state))
+                table.dump(cache)
+            os.replace(temp_path, cache_path)
+            self._evict_cache()
+        except OSError:
+            self._remove_cache_file(temp_path)
+
+    def _evict_cache(self):
+        """
+        Delete least recently used sidecars (in the data directory and its
+        subdirectories) until their total size fits the limit
+        :return: -
+        """
+        entries = []
+        for directory, _, names in os.walk(self.__data_directory):
+            for name in names:
+                if name.endswith(self.CACHE_SUFFIX):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.__cache_max_bytes:
+                break
+            self._remove_cache_file(path)
+            total -= size
+
+    @staticmethod
+    def _remove_cache_file(path: str):
+        """Delete a sidecar file, ignoring files that are already gone"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def iter_penguins(self, filename: str, chunk_size: int = None):
+        """
+        Stream penguins from a CSV file without reading it all into memory
+        The header is resolved to column positions once, rows are parsed lazily
+        
+        Time Complexity: O(n) over the whole iteration
+        Space Complexity: O(1) per row, O(chunk_size) when chunking
+        
+        :param filename: name of the file to load
+        :param chunk_size: if given, yield lists of up to chunk_size penguins instead of single penguins
+        :return: generator of Penguin objects (or of lists of Penguin objects)
+        :raises FileNotFoundException if file doesn't exist (raised immediately, not on first next())
+        """
         filepath = os.path.join(self.__data_directory, filename)
         if not os.path.exists(filepath):
             raise FileNotFoundException(filename)
 
-        penguins = []
+        penguins = self._iter_file(filepath)
+        if not chunk_size:
+            return penguins
+        return self._iter_chunks(penguins, chunk_size)
+
+    def _iter_file(self, filepath: str):
+        """
+        Generator over the valid penguins of a CSV file
+        :param filepath: path of the file
+        :return: generator of Penguin objects
+        """
         with open(filepath, 'r', encoding='utf-8') as file:
             reader = csv.reader(file)
-            header = next(reader)
-            
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = self._resolve_columns(header)
+
             for values in reader:
                 if len(values) < 7:
                     continue
 
                 try:
-                    penguin = self._create_penguin_from_row(header, values)
+                    penguin = self._create_penguin(values, columns)
                     if penguin:
-                        penguins.append(penguin)
+                        yield penguin
                 except (ValueError, IndexError):
                     # Skip invalid rows
                     continue
 
-        return penguins
+    @staticmethod
+    def _iter_chunks(penguins, chunk_size: int):
+        """
+        Group a stream of penguins into lists
+        :param penguins: iterable of penguins
+        :param chunk_size: maximum length of each list
+        :return: generator of lists
+        """
+        chunk = []
+        for penguin in penguins:
+            chunk.append(penguin)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
-    def _create_penguin_from_row(self, header: list, values: list) -> Penguin:
+    def iter_measurements(self, filename: str, attributes: tuple, chunk_size: int) -> tuple:
         """
-        Create a Penguin object from CSV row data
+        Stream rows of a CSV file that may lack labels, together with the
+        numeric attributes parsed from each row
+        Columns are found through COLUMN_ALIASES, other columns are kept untouched
+
+        Time Complexity: O(n) over the whole iteration
+        Space Complexity: O(chunk_size)
+
+        :param filename: name of the file to read
+        :param attributes: numeric attribute names to parse, e.g. ClassifierService.FEATURES
+        :param chunk_size: maximum number of rows per chunk
+        :return: (header, generator of lists of (row values, point)) where point is the
+                 tuple of parsed attributes, or None if one of them is missing or invalid
+        :raises FileNotFoundException if file doesn't exist
+        :raises InvalidFileFormatException if the file has no header or lacks one of the attributes
+        """
+        filepath = os.path.join(self.__data_directory, filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundException(filename)
+
+        with open(filepath, 'r', encoding='utf-8', newline='') as file:
+            header = next(csv.reader(file), None)
+        if header is None:
+            raise InvalidFileFormatException(filename, "missing header")
+        columns = self._resolve_columns(header)
+        missing = [attribute for attribute in attributes if not columns.get(attribute)]
+        if missing:
+            raise InvalidFileFormatException(filename, f"missing column(s) {', '.join(missing)}")
+
+        return header, self._iter_chunks(self._iter_measurement_rows(filepath, attributes, columns),
+                                         chunk_size)
+
+    def _iter_measurement_rows(self, filepath: str, attributes: tuple, columns: dict):
+        """
+        Generator over the data rows of a CSV file and their parsed attributes
+        :param filepath: path of the file
+        :param attributes: numeric attribute names to parse
+        :param columns: column mapping from _resolve_columns
+        :return: generator of (row values, point or None)
+        """
+        indices = [columns[attribute] for attribute in attributes]
+        field = self._field
+        parse = self._parse_float
+        with open(filepath, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for values in reader:
+                if not values:
+                    continue
+                point = tuple(parse(field(values, positions)) for positions in indices)
+                yield values, (None if None in point else point)
+
+    def save_rows(self, filename: str, header: list, row_chunks) -> int:
+        """
+        Write a CSV file from a stream of row chunks
+        Written to a temporary file first so an interrupted run leaves no partial output
+        :param filename: name of the file to save to
+        :param header: column names
+        :param row_chunks: iterable of lists of rows (lists of values)
+        :return: number of rows written
+        """
+        filepath = os.path.join(self.__data_directory, filename)
+        count = 0
+        with self._open_replacing(filepath, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(header)
+            for rows in row_chunks:
+                writer.writerows(rows)
+                count += len(rows)
+        return count
+
+    @staticmethod
+    def _resolve_columns(header: list) -> dict:
+        """
+        Map each attribute to the positions of the header columns that may hold it
         Handles both raw penguins.csv format and preprocessed penguins_data.csv format
         :param header: list of column names
+        :return: dictionary attribute -> tuple of column indices, in alias priority order
+        """
+        positions = {name.strip(): i for i, name in enumerate(header)}
+        return {
+            attribute: tuple(positions[alias] for alias in aliases if alias in positions)
+            for attribute, aliases in PenguinRepoFile.COLUMN_ALIASES.items()
+        }
+
+    @staticmethod
+    def _field(values: list, indices: tuple) -> str:
+        """
+        Get the first non-empty value among candidate columns
+        :param values: row values
+        :param indices: candidate column indices
+        :return: stripped value or '' if all are missing/empty
+        """
+        for i in indices:
+            if i < len(values):
+                value = values[i].strip()
+                if value:
+                    return value
+        return ''
+
+    @staticmethod
+    def _normalize_species(species_raw: str) -> str:
+        """
+        Handle full species names like "Adelie Penguin (Pygoscelis adeliae)" -> "Adelie"
+        :param species_raw: species as written in the file
+        :return: short species name
+        """
+        if 'Adelie' in species_raw:
+            return 'Adelie'
+        if 'Chinstrap' in species_raw:
+            return 'Chinstrap'
+        if 'Gentoo' in species_raw:
+            return 'Gentoo'
+        return species_raw
+
+    def _create_penguin(self, values: list, columns: dict) -> Penguin:
+        """
+        Create a Penguin object from CSV row data
         :param values: list of values
+        :param columns: column mapping from _resolve_columns
         :return: Penguin object or None if invalid
         """
-        # Create a mapping from header to values
-        data = {header[i].strip(): values[i].strip() for i in range(min(len(header), len(values)))}
+        field = self._field
+        species = self._normalize_species(field(values, columns['species']))
 
-        # Map possible column names (support both raw and preprocessed formats)
-        # Species: handle full name like "Adelie Penguin (Pygoscelis adeliae)" -> "Adelie"
-        species_raw = data.get('species', '') or data.get('Species', '')
-        if 'Adelie' in species_raw:
-            species = 'Adelie'
-        elif 'Chinstrap' in species_raw:
-            species = 'Chinstrap'
-        elif 'Gentoo' in species_raw:
-            species = 'Gentoo'
-        else:
-            species = species_raw
-
-        # Numeric fields: support both naming conventions
-        flipper = self._parse_float(
-            data.get('flipper_length_mm', '') or data.get('Flipper Length (mm)', '')
-        )
-        culmen_len = self._parse_float(
-            data.get('culmen_length_mm', '') or data.get('Culmen Length (mm)', '')
-        )
-        culmen_depth = self._parse_float(
-            data.get('culmen_depth_mm', '') or data.get('Culmen Depth (mm)', '')
-        )
-        body_mass = self._parse_float(
-            data.get('body_mass_g', '') or data.get('Body Mass (g)', '')
-        )
-
-        # String fields
-        island = data.get('island', '') or data.get('Island', '')
-        sex = (data.get('sex', '') or data.get('Sex', '')).upper()
+        flipper = self._parse_float(field(values, columns['flipper_length_mm']))
+        culmen_len = self._parse_float(field(values, columns['culmen_length_mm']))
+        culmen_depth = self._parse_float(field(values, columns['culmen_depth_mm']))
+        body_mass = self._parse_float(field(values, columns['body_mass_g']))
+
+        island = field(values, columns['island'])
+        sex = field(values, columns['sex']).upper()
 
         # Validate all required fields are present
         if not all([species, island, sex]) or None in [flipper, culmen_len, culmen_depth, body_mass]:
@@ -126,6 +505,14 @@ class PenguinRepoFile:
         except (ValueError, TypeError):
             return None
 
+    CSV_HEADER = "species,flipper_length_mm,culmen_length_mm,culmen_depth_mm,body_mass_g,island,sex\n"
+
+    @staticmethod
+    def _format_row(species: str, flipper: float, culmen_len: float, culmen_depth: float,
+                    body_mass: float, island: str, sex: str) -> str:
+        """Format one output CSV line (shared by save and preprocess so outputs match byte for byte)"""
+        return f"{species},{flipper},{culmen_len},{culmen_depth},{body_mass},{island},{sex}\n"
+
     def save_to_file(self, filename: str, penguins: list):
         """
         Save penguins to a CSV file
@@ -137,20 +524,143 @@ class PenguinRepoFile:
         
         with open(filepath, 'w', encoding='utf-8') as file:
             # Write header
-            header = "species,flipper_length_mm,culmen_length_mm,culmen_depth_mm,body_mass_g,island,sex\n"
-            file.write(header)
+            file.write(self.CSV_HEADER)
 
             # Write data rows
             for penguin in penguins:
-                row = (f"{penguin.get_species()},{penguin.get_flipper_length_mm()},"
-                       f"{penguin.get_culmen_length_mm()},{penguin.get_culmen_depth_mm()},"
-                       f"{penguin.get_body_mass_g()},{penguin.get_island()},{penguin.get_sex()}\n")
-                file.write(row)
+                file.write(self._format_row(
+                    penguin.get_species(), penguin.get_flipper_length_mm(),
+                    penguin.get_culmen_length_mm(), penguin.get_culmen_depth_mm(),
+                    penguin.get_body_mass_g(), penguin.get_island(), penguin.get_sex()
+                ))
+
+    REQUIRED_RAW_COLUMNS = ['species', 'flipper_length_mm', 'culmen_length_mm',
+                            'culmen_depth_mm', 'body_mass_g', 'island', 'sex']
+
+    @staticmethod
+    def _resolve_raw_columns(header_line: str) -> dict:
+        """
+        Find the position of each required column in a raw header line
+        Exact names are preferred, otherwise a case-insensitive match is used
+        :param header_line: first line of the raw file
+        :return: dictionary column name -> index (missing columns are absent)
+        """
+        header = [h.strip() for h in header_line.strip().split(',')]
+        col_indices = {}
+        for col in PenguinRepoFile.REQUIRED_RAW_COLUMNS:
+            if col in header:
+                col_indices[col] = header.index(col)
+            else:
+                # Try case-insensitive match
+                for i, h in enumerate(header):
+                    if h.lower() == col.lower():
+                        col_indices[col] = i
+                        break
+        return col_indices
+
+    @staticmethod
+    def _clean_raw_line(line: str, col_indices: dict):
+        """
+        Clean one raw data line
+        :param line: raw line (without or with trailing newline)
+        :param col_indices: column positions from _resolve_raw_columns
+        :return: cleaned output CSV line, '' for blank lines, None if the row is rejected
+        """
+        line = line.strip()
+        if not line:
+            return ''
+
+        values = line.split(',')
+        row_data = {}
+        for col in PenguinRepoFile.REQUIRED_RAW_COLUMNS:
+            if col not in col_indices or col_indices[col] >= len(values):
+                return None
+
+            val = values[col_indices[col]].strip()
+            if not val or val.upper() == 'NA' or val == '.':
+                return None
+
+            row_data[col] = val
+
+        # Validate numeric fields
+        parse = PenguinRepoFile._parse_float
+        flipper = parse(row_data['flipper_length_mm'])
+        culmen_len = parse(row_data['culmen_length_mm'])
+        culmen_depth = parse(row_data['culmen_depth_mm'])
+        body_mass = parse(row_data['body_mass_g'])
+
+        if None in [flipper, culmen_len, culmen_depth, body_mass]:
+            return None
+
+        return PenguinRepoFile._format_row(row_data['species'], flipper, culmen_len, culmen_depth,
+                                           body_mass, row_data['island'], row_data['sex'].upper())
+
+    @staticmethod
+    def _preprocess_byte_range(task: tuple) -> dict:
+        """
+        Clean the lines of a newline-aligned byte range of a raw file
+        Runs inside a worker process
+        :param task: tuple (file path, start offset, end offset, column positions)
+        :return: dictionary with the cleaned lines, counts and timing of the range
+        """
+        filepath, start, end, col_indices = task
+        started = time.perf_counter()
+
+        with open(filepath, 'rb') as file:
+            file.seek(start)
+            data = file.read(end - start)
+
+        lines = []
+        rejected = 0
+        # StringIO splits lines exactly like a file opened in text mode
+        for line in io.StringIO(data.decode('utf-8'), newline=None):
+            cleaned = PenguinRepoFile._clean_raw_line(line, col_indices)
+            if cleaned is None:
+                rejected += 1
+            elif cleaned:
+                lines.append(cleaned)
+
+        return {
+            'start': start,
+            'end': end,
+            'lines': lines,
+            'rows': len(lines),
+            'rejected': rejected,
+            'seconds': time.perf_counter() - started
+        }
+
+    @staticmethod
+    def _split_byte_ranges(filepath: str, start: int, count: int) -> list:
+        """
+        Split a file from a start offset into about count ranges ending on line boundaries
+        :param filepath: file to split
+        :param start: offset of the first byte to include
+        :param count: desired number of ranges
+        :return: list of (start, end) offsets covering [start, file size)
+        """
+        size = os.path.getsize(filepath)
+        if start >= size:
+            return []
+
+        boundaries = [start]
+        step = max(1, (size - start) // max(1, count))
+        with open(filepath, 'rb') as file:
+            for i in range(1, count):
+                file.seek(start + i * step)
+                file.readline()  # move to the start of the next line
+                position = min(file.tell(), size)
+                if position > boundaries[-1]:
+                    boundaries.append(position)
+        if boundaries[-1] < size:
+            boundaries.append(size)
+        return list(zip(boundaries, boundaries[1:]))
 
     def preprocess_raw_data(self, input_filename: str, output_filename: str):
         """
         Preprocess raw penguins.csv to create cleaned penguins_data.csv
         Only keeps rows with all 7 required fields having valid data
+        Rows are cleaned and written one line at a time to a temporary file that
+        replaces the output only once the whole input was processed
         :param input_filename: raw input file name
         :param output_filename: cleaned output file name
         :return: number of valid rows saved
@@ -159,76 +669,76 @@ class PenguinRepoFile:
         if not os.path.exists(input_path):
             raise FileNotFoundException(input_filename)
 
-        valid_penguins = []
-        required_columns = ['species', 'flipper_length_mm', 'culmen_length_mm', 
-                           'culmen_depth_mm', 'body_mass_g', 'island', 'sex']
-
-        with open(input_path, 'r', encoding='utf-8') as file:
-            header = file.readline().strip().split(',')
-            header = [h.strip() for h in header]
-
-            # Find column indices
-            col_indices = {}
-            for col in required_columns:
-                if col in header:
-                    col_indices[col] = header.index(col)
-                else:
-                    # Try case-insensitive match
-                    for i, h in enumerate(header):
-                        if h.lower() == col.lower():
-                            col_indices[col] = i
-                            break
+        output_path = os.path.join(self.__data_directory, output_filename)
+        count = 0
+        with open(input_path, 'r', encoding='utf-8') as file, \
+                self._open_replacing(output_path, 'w', encoding='utf-8') as output:
+            col_indices = self._resolve_raw_columns(file.readline())
+            output.write(self.CSV_HEADER)
 
             for line in file:
-                line = line.strip()
-                if not line:
-                    continue
+                cleaned = self._clean_raw_line(line, col_indices)
+                if cleaned:
+                    output.write(cleaned)
+                    count += 1
 
-                values = line.split(',')
-                
-                try:
-                    # Extract required values
-                    row_data = {}
-                    valid_row = True
-                    
-                    for col in required_columns:
-                        if col not in col_indices or col_indices[col] >= len(values):
-                            valid_row = False
-                            break
-                        
-                        val = values[col_indices[col]].strip()
-                        if not val or val.upper() == 'NA' or val == '.':
-                            valid_row = False
-                            break
-                        
-                        row_data[col] = val
-
-                    if not valid_row:
-                        continue
+        return count
 
-                    # Validate numeric fields
-                    flipper = self._parse_float(row_data['flipper_length_mm'])
-                    culmen_len = self._parse_float(row_data['culmen_length_mm'])
-                    culmen_depth = self._parse_float(row_data['culmen_depth_mm'])
-                    body_mass = self._parse_float(row_data['body_mass_g'])
+    def preprocess_raw_data_parallel(self, input_filename: str, output_filename: str,
+                                     workers: int = None, chunks_per_worker: int = 4) -> dict:
+        """
+        Preprocess a raw file in a process pool
+        The file body is split into newline-aligned byte ranges that are cleaned
+        independently; results are written back in file order, so the output is
+        byte-identical to preprocess_raw_data. At most workers + 1 ranges are in
+        flight, so cleaned lines waiting for their turn stay bounded. Like
+        preprocess_raw_data, the output only appears once every range succeeded
+        :param input_filename: raw input file name
+        :param output_filename: cleaned output file name
+        :param workers: number of worker processes (default: number of CPUs)
+        :param chunks_per_worker: ranges per worker, more ranges balance load better
+        :return: dictionary with 'rows', 'rejected', 'workers', 'seconds' and per-range 'chunks'
+        :raises FileNotFoundException if the input file doesn't exist
+        """
+        input_path = os.path.join(self.__data_directory, input_filename)
+        if not os.path.exists(input_path):
+            raise FileNotFoundException(input_filename)
 
-                    if None in [flipper, culmen_len, culmen_depth, body_mass]:
-                        continue
+        workers = workers or os.cpu_count() or 1
+        started = time.perf_counter()
 
-                    penguin = Penguin(
-                        row_data['species'],
-                        flipper,
-                        culmen_len,
-                        culmen_depth,
-                        body_mass,
-                        row_data['island'],
-                        row_data['sex'].upper()
-                    )
-                    valid_penguins.append(penguin)
-
-                except (ValueError, IndexError, KeyError):
-                    continue
+        with open(input_path, 'rb') as file:
+            header_line = file.readline()
+            body_start = file.tell()
+        col_indices = self._resolve_raw_columns(header_line.decode('utf-8'))
+
+        ranges = self._split_byte_ranges(input_path, body_start, workers * chunks_per_worker)
+        tasks = [(input_path, start, end, col_indices) for start, end in ranges]
+
+        chunks = []
+        output_path = os.path.join(self.__data_directory, output_filename)
+
+        def write(future):
+            result = future.result()
+            output.writelines(result.pop('lines'))
+            chunks.append(result)
+
+        with self._open_replacing(output_path, 'w', encoding='utf-8') as output, \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            output.write(self.CSV_HEADER)
+            # Futures in submission order, written as soon as they are next in line
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(self._preprocess_byte_range, task))
+                if len(pending) > workers:
+                    write(pending.popleft())
+            while pending:
+                write(pending.popleft())
 
-        # Save valid data
-        self.save_to_file(output_filename, valid_penguins)
-        return len(valid_penguins)
+        return {
+            'rows': sum(c['rows'] for c in chunks),
+            'rejected': sum(c['rejected'] for c in chunks),
+            'workers': workers,
+            'seconds': time.perf_counter() - started,
+            'chunks': chunks
+        }
@@ -0,0 +1,549 @@
+"""
+Columnar Penguin Table
+Stores penguin data column by column in contiguous typed arrays
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections import Counter
+
+from domain.penguin import Penguin
+
+
+class PenguinTable:
+    """
+    Column store for penguins
+    Numeric columns are kept in array('d') buffers, string columns are
+    dictionary-encoded: each distinct value gets a small integer code and
+    the column itself is an array of codes
+    """
+
+    NUMERIC_TYPECODE = 'd'
+    CODE_TYPECODE = 'B'
+    WIDE_CODE_TYPECODE = 'H'
+
+    # Binary dump: magic, byte order flag, row count
+    DUMP_MAGIC = b'PGTB'
+    DUMP_HEADER = struct.Struct('<4sBQ')
+
+    # Columnar file: magic, version, byte order flag, row count
+    COLUMNAR_MAGIC = b'PCOL'
+    COLUMNAR_VERSION = 1
+    COLUMNAR_HEADER = struct.Struct('<4sHBxQ')
+    # One entry per column: typecode, data offset, dictionary offset, dictionary length (bytes)
+    COLUMNAR_ENTRY = struct.Struct('<c7xQQQ')
+    COLUMNAR_ALIGNMENT = 8
+
+    def __init__(self):
+        # (mmap, memoryview of it) while the columns are served from a columnar file
+        self.__mapping = None
+        self.clear()
+
+    def __len__(self):
+        return self.__size
+
+    @staticmethod
+    def _typecode(column) -> str:
+        """Typecode of a column stored either as an array or as a memoryview"""
+        return column.typecode if isinstance(column, array) else column.format
+
+    def _ensure_writable(self):
+        """
+        Copy memory-mapped columns into private arrays before the first change
+        The mapped file itself is never modified
+        """
+        if not self.__read_only:
+            return
+        for attr, column in self.__numeric.items():
+            self.__numeric[attr] = self._copy_column(column)
+        for attr, column in self.__codes.items():
+            self.__codes[attr] = self._copy_column(column)
+        self.__read_only = False
+
+    def _copy_column(self, column) -> array:
+        """Copy a column buffer into a new array of the same typecode"""
+        copy = array(self._typecode(column))
+        copy.frombytes(memoryview(column).cast('B'))
+        return copy
+
+    def is_read_only(self) -> bool:
+        """Check if the columns are served straight from a memory-mapped file"""
+        return self.__read_only
+
+    def _encode(self, attribute: str, value: str) -> int:
+        """
+        Get the code of a string value, registering it if it is new
+        Widens the code column when it outgrows one byte per value
+        :param attribute: string attribute name
+        :param value: string value
+        :return: integer code
+        """
+        lookup = self.__lookups[attribute]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self.__dictionaries[attribute])
+            if code == 256 and self.__codes[attribute].typecode == self.CODE_TYPECODE:
+                self.__codes[attribute] = array(self.WIDE_CODE_TYPECODE, self.__codes[attribute])
+            lookup[value] = code
+            self.__dictionaries[attribute].append(value)
+        return code
+
+    def append_values(self, species: str, flipper_length_mm: float, culmen_length_mm: float,
+                      culmen_depth_mm: float, body_mass_g: float, island: str, sex: str):
+        """
+        Append one row given its values (same order as the Penguin constructor)
+        :return: -
+        """
+        if self.__read_only:
+            self._ensure_writable()
+
+        # Encode first: registering a new value may replace a code array
+        species_code = self._encode('species', species)
+        island_code = self._encode('island', island)
+        sex_code = self._encode('sex', sex)
+
+        self.__numeric['flipper_length_mm'].append(flipper_length_mm)
+        self.__numeric['culmen_length_mm'].append(culmen_length_mm)
+        self.__numeric['culmen_depth_mm'].append(culmen_depth_mm)
+        self.__numeric['body_mass_g'].append(body_mass_g)
+        self.__codes['species'].append(species_code)
+        self.__codes['island'].append(island_code)
+        self.__codes['sex'].append(sex_code)
+        self.__size += 1
+
+    def append(self, penguin: Penguin):
+        """
+        Append a penguin as a new row
+        :param penguin: penguin to add
+        :return: -
+        """
+        self.append_values(penguin.get_species(), penguin.get_flipper_length_mm(),
+                           penguin.get_culmen_length_mm(), penguin.get_culmen_depth_mm(),
+                           penguin.get_body_mass_g(), penguin.get_island(), penguin.get_sex())
+
+    def extend(self, penguins):
+        """
+        Append several penguins
+        :param penguins: iterable of penguins
+        :return: -
+        """
+        for penguin in penguins:
+            self.append(penguin)
+
+    def clear(self):
+        """
+        Remove all rows and forget all dictionary values
+        :return: -
+        """
+        self.__size = 0
+        self.__read_only = False
+        self.__numeric = {attr: array(self.NUMERIC_TYPECODE) for attr in Penguin.get_numeric_attributes()}
+        self.__codes = {attr: array(self.CODE_TYPECODE) for attr in Penguin.get_string_attributes()}
+        self.__dictionaries = {attr: [] for attr in Penguin.get_string_attributes()}
+        self.__lookups = {attr: {} for attr in Penguin.get_string_attributes()}
+
+    def get_row(self, index: int) -> Penguin:
+        """
+        Build a Penguin object for a row
+        :param index: row index
+        :return: new Penguin with the row values
+        """
+        numeric = self.__numeric
+        codes = self.__codes
+        dictionaries = self.__dictionaries
+        return Penguin(
+            dictionaries['species'][codes['species'][index]],
+            numeric['flipper_length_mm'][index],
+            numeric['culmen_length_mm'][index],
+            numeric['culmen_depth_mm'][index],
+            numeric['body_mass_g'][index],
+            dictionaries['island'][codes['island'][index]],
+            dictionaries['sex'][codes['sex'][index]]
+        )
+
+    def iter_rows(self):
+        """
+        Iterate over all rows as Penguin objects
+        :return: generator of penguins
+        """
+        for index in range(self.__size):
+            yield self.get_row(index)
+
+    def is_numeric(self, attribute: str) -> bool:
+        """Check if attribute is stored as a numeric column"""
+        return attribute in self.__numeric
+
+    def _check_attribute(self, attribute: str):
+        """Raise AttributeError for unknown attributes (same as Penguin.get_attribute)"""
+        if attribute not in self.__numeric and attribute not in self.__codes:
+            raise AttributeError(f"Unknown attribute: {attribute}")
+
+    def get_numeric_column(self, attribute: str):
+        """
+        Get the underlying buffer of a numeric column
+        The returned array is the live storage and must not be modified
+        :param attribute: numeric attribute name
+        :return: array('d') with one value per row (a memoryview of doubles for mapped tables)
+        """
+        self._check_attribute(attribute)
+        if attribute not in self.__numeric:
+            raise AttributeError(f"Not a numeric attribute: {attribute}")
+        return self.__numeric[attribute]
+
+    def get_codes(self, attribute: str):
+        """
+        Get the code column of a string attribute (must not be modified)
+        :param attribute: string attribute name
+        :return: array of integer codes, one per row
+        """
+        self._check_attribute(attribute)
+        if attribute not in self.__codes:
+            raise AttributeError(f"Not a string attribute: {attribute}")
+        return self.__codes[attribute]
+
+    def get_dictionary(self, attribute: str) -> list:
+        """
+        Get the distinct values of a string attribute, indexed by code
+        :param attribute: string attribute name
+        :return: list of values
+        """
+        self.get_codes(attribute)
+        return list(self.__dictionaries[attribute])
+
+    def get_code(self, attribute: str, value):
+        """
+        Get the dictionary code of a string value
+        :param attribute: string attribute name
+        :param value: value to look up
+        :return: integer code, or None if no row has that value
+        """
+        self.get_codes(attribute)
+        return self.__lookups[attribute].get(value)
+
+    def get_value(self, attribute: str, index: int):
+        """
+        Get a single cell
+        :param attribute: attribute name
+        :param index: row index
+        :return: value of the attribute for that row
+        """
+        self._check_attribute(attribute)
+        if attribute in self.__numeric:
+            return self.__numeric[attribute][index]
+        return self.__dictionaries[attribute][self.__codes[attribute][index]]
+
+    def get_values(self, attribute: str) -> list:
+        """
+        Get all values of a column as a list (string columns are decoded)
+        :param attribute: attribute name
+        :return: list of values
+        """
+        self._check_attribute(attribute)
+        if attribute in self.__numeric:
+            return self.__numeric[attribute].tolist()
+        dictionary = self.__dictionaries[attribute]
+        return [dictionary[code] for code in self.__codes[attribute]]
+
+    def find_rows(self, attribute: str, value, is_numeric: bool) -> list:
+        """
+        Get indices of rows matching a filter
+        For numeric: rows where attribute > value
+        For string: rows where attribute == value (compared on codes)
+
+        Time Complexity: O(n) scan of a single contiguous column
+        Space Complexity: O(k) where k is the number of matching rows
+
+        :param attribute: attribute name
+        :param value: value to compare against
+        :param is_numeric: True for numeric comparison (>), False for equality
+        :return: list of row indices in table order
+        """
+        self._check_attribute(attribute)
+        if attribute in self.__numeric:
+            column = self.__numeric[attribute]
+            if is_numeric:
+                return [i for i, v in enumerate(column) if v > value]
+            return [i for i, v in enumerate(column) if v == value]
+
+        codes = self.__codes[attribute]
+        if is_numeric:
+            dictionary = self.__dictionaries[attribute]
+            return [i for i, code in enumerate(codes) if dictionary[code] > value]
+        code = self.__lookups[attribute].get(value)
+        if code is None:
+            return []
+        return [i for i, c in enumerate(codes) if c == code]
+
+    def count_values(self, attribute: str) -> dict:
+        """
+        Count occurrences of each distinct value of a column
+
+        Time Complexity: O(n) for numeric columns, O(n * d) C-level counts for
+        string columns where d is the (tiny) number of distinct values
+        Space Complexity: O(d) where d is the number of distinct values
+
+        :param attribute: attribute name
+        :return: dictionary mapping values to counts
+        """
+        self._check_attribute(attribute)
+        if attribute in self.__codes:
+            codes = self.__codes[attribute]
+            if isinstance(codes, array):
+                per_code = [codes.count(code) for code in range(len(self.__dictionaries[attribute]))]
+            else:
+                tally = Counter(codes)
+                per_code = [tally[code] for code in range(len(self.__dictionaries[attribute]))]
+            return {value: count for value, count in zip(self.__dictionaries[attribute], per_code) if count}
+
+        counts = {}
+        for val in self.__numeric[attribute]:
+            counts[val] = counts.get(val, 0) + 1
+        return counts
+
+    def dump(self, file):
+        """
+        Write the table to a binary file object
+        Layout: header, then each numeric column as raw doubles, then for each
+        string column its typecode, its string table and its raw codes
+        :param file: file opened in binary write mode
+        :return: -
+        """
+        file.write(self.DUMP_HEADER.pack(self.DUMP_MAGIC, sys.byteorder == 'little', self.__size))
+        for attr in Penguin.get_numeric_attributes():
+            file.write(self.__numeric[attr])
+        for attr in Penguin.get_string_attributes():
+            codes = self.__codes[attr]
+            dictionary = self.__dictionaries[attr]
+            file.write(struct.pack('<cI', self._typecode(codes).encode('ascii'), len(dictionary)))
+            for value in dictionary:
+                encoded = value.encode('utf-8')
+                file.write(struct.pack('<I', len(encoded)))
+                file.write(encoded)
+            file.write(codes)
+
+    @classmethod
+    def load(cls, file):
+        """
+        Read a table written by dump
+        :param file: file opened in binary read mode, positioned at the dump
+        :return: new PenguinTable
+        :raises ValueError if the data is not a table dump or is truncated
+        """
+        header = file.read(cls.DUMP_HEADER.size)
+        if len(header) != cls.DUMP_HEADER.size:
+            raise ValueError("Truncated table dump")
+        magic, little_endian, size = cls.DUMP_HEADER.unpack(header)
+        if magic != cls.DUMP_MAGIC:
+            raise ValueError("Not a penguin table dump")
+        swap = bool(little_endian) != (sys.byteorder == 'little')
+
+        def read_array(typecode: str) -> array:
+            values = array(typecode)
+            try:
+                values.fromfile(file, size)
+            except EOFError:
+                raise ValueError("Truncated table dump")
+            if swap:
+                values.byteswap()
+            return values
+
+        table = cls()
+        for attr in Penguin.get_numeric_attributes():
+            table.__numeric[attr] = read_array(cls.NUMERIC_TYPECODE)
+        for attr in Penguin.get_string_attributes():
+            typecode, count = struct.unpack('<cI', file.read(struct.calcsize('<cI')))
+            dictionary = []
+            for _ in range(count):
+                (length,) = struct.unpack('<I', file.read(4))
+                dictionary.append(file.read(length).decode('utf-8'))
+            table.__dictionaries[attr] = dictionary
+            table.__lookups[attr] = {value: code for code, value in enumerate(dictionary)}
+            table.__codes[attr] = read_array(typecode.decode('ascii'))
+        table.__size = size
+        return table
+
+    # ==================== COLUMNAR FILE ====================
+    @classmethod
+    def _columnar_layout(cls, size: int, typecodes: dict, dictionaries: dict) -> tuple:
+        """
+        Compute where every block of a columnar file goes
+        Column blocks follow the header and are aligned to 8 bytes, the string
+        tables of the dictionary-encoded columns come last
+        :param size: number of rows
+        :param typecodes: attribute -> typecode of its column
+        :param dictionaries: string attribute -> list of values
+        :return: tuple (entries: attribute -> (typecode, offset, dict offset, dict length),
+                        blobs: string attribute -> encoded string table)
+        """
+        position = cls.COLUMNAR_HEADER.size + cls.COLUMNAR_ENTRY.size * len(typecodes)
+        entries = {}
+        for attr, typecode in typecodes.items():
+            position += -position % cls.COLUMNAR_ALIGNMENT
+            entries[attr] = [typecode, position, 0, 0]
+            position += size * array(typecode).itemsize
+
+        blobs = {}
+        for attr, dictionary in dictionaries.items():
+            blob = b''.join(struct.pack('<I', len(encoded)) + encoded
+                            for encoded in (value.encode('utf-8') for value in dictionary))
+            entries[attr][2] = position
+            entries[attr][3] = len(blob)
+            blobs[attr] = blob
+            position += len(blob)
+        return {attr: tuple(entry) for attr, entry in entries.items()}, blobs
+
+    def write_columnar(self, file):
+        """
+        Write the table in the columnar file format (see map_columnar)
+        :param file: file opened in binary write mode, at offset 0
+        :return: -
+        """
+        columns = dict(self.__numeric)
+        columns.update(self.__codes)
+        columns = {attr: columns[attr] for attr in Penguin.get_all_attributes()}
+        typecodes = {attr: self._typecode(column) for attr, column in columns.items()}
+        self.write_columnar_chunks(file, self.__size, typecodes, self.__dictionaries, [columns])
+
+    @classmethod
+    def write_columnar_chunks(cls, file, size: int, typecodes: dict, dictionaries: dict, column_chunks):
+        """
+        Write a columnar file from a stream of column chunks without holding the whole table
+        The row count and dictionaries fix the layout up front, so every chunk is
+        written straight to its place in each column block
+
+        Time Complexity: O(n)
+        Space Complexity: O(chunk size)
+
+        :param file: file opened in binary write mode (seekable), at offset 0
+        :param size: total number of rows in all chunks
+        :param typecodes: attribute -> typecode, for every attribute in Penguin.get_all_attributes() order
+        :param dictionaries: string attribute -> list of values indexed by code
+        :param column_chunks: iterable of dicts attribute -> column values (numbers or codes) of equal lengths
+        :return: -
+        :raises ValueError if the chunks do not hold exactly size rows
+        """
+        entries, blobs = cls._columnar_layout(size, typecodes, dictionaries)
+        file.write(cls.COLUMNAR_HEADER.pack(cls.COLUMNAR_MAGIC, cls.COLUMNAR_VERSION,
+                                            sys.byteorder == 'little', size))
+        for typecode, offset, dict_offset, dict_length in entries.values():
+            file.write(cls.COLUMNAR_ENTRY.pack(typecode.encode('ascii'), offset, dict_offset, dict_length))
+
+        # Gaps left by seeking past the end (alignment padding) read back as zeros
+        written = 0
+        for columns in column_chunks:
+            count = len(columns[Penguin.get_all_attributes()[0]])
+            if written + count > size:
+                raise ValueError(f"Column chunks hold more than {size} rows")
+            for attr, (typecode, offset, _, _) in entries.items():
+                column = columns[attr]
+                if not (isinstance(column, (array, memoryview)) and cls._typecode(column) == typecode):
+                    column = array(typecode, column)
+                file.seek(offset + written * array(typecode).itemsize)
+                file.write(column)
+            written += count
+        if written != size:
+            raise ValueError(f"Column chunks hold {written} rows, expected {size}")
+
+        for attr in dictionaries:
+            file.seek(entries[attr][2])
+            file.write(blobs[attr])
+
+    @classmethod
+    def map_columnar(cls, filepath: str):
+        """
+        Open a columnar file as a read-only table backed by mmap
+        Numeric and code columns are memoryviews into the mapping, so values are
+        read from the page cache on demand: nothing is copied, files larger than
+        RAM can be scanned and processes opening the same file share its pages.
+        The first modification copies the columns into private arrays.
+
+        Time Complexity: O(d) where d is the number of distinct string values
+        Space Complexity: O(d)
+
+        :param filepath: path of the file
+        :return: new read-only PenguinTable
+        :raises ValueError if the file is not a valid columnar file
+        """
+        with open(filepath, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        table = cls()
+        table.__mapping = (mapping, view)
+        try:
+            size = table._map_columns(view)
+        except ValueError:
+            table.close()
+            raise
+        except (struct.error, UnicodeDecodeError) as e:
+            table.close()
+            raise ValueError(f"Truncated or corrupt columnar file: {e}")
+        table.__size = size
+        table.__read_only = True
+        return table
+
+    def _map_columns(self, view: memoryview) -> int:
+        """
+        Point the columns and dictionaries at a mapped columnar file
+        :param view: memoryview of the whole file
+        :return: row count
+        :raises ValueError, struct.error or UnicodeDecodeError if the file is not valid
+        """
+        magic, version, little_endian, size = self.COLUMNAR_HEADER.unpack_from(view, 0)
+        if magic != self.COLUMNAR_MAGIC or version != self.COLUMNAR_VERSION:
+            raise ValueError("Not a penguin columnar file")
+        swap = bool(little_endian) != (sys.byteorder == 'little')
+
+        position = self.COLUMNAR_HEADER.size
+        for attr in Penguin.get_all_attributes():
+            typecode, offset, dict_offset, dict_length = self.COLUMNAR_ENTRY.unpack_from(view, position)
+            position += self.COLUMNAR_ENTRY.size
+            typecode = typecode.decode('ascii')
+            end = offset + size * array(typecode).itemsize
+            if end > len(view) or dict_offset + dict_length > len(view):
+                raise ValueError("Truncated columnar file")
+
+            column = view[offset:end].cast(typecode)
+            if swap:
+                copy = self._copy_column(column)
+                column.release()
+                column = copy
+                column.byteswap()
+
+            if attr in self.__numeric:
+                self.__numeric[attr] = column
+                continue
+
+            self.__codes[attr] = column
+            dictionary = []
+            cursor, dict_end = dict_offset, dict_offset + dict_length
+            while cursor < dict_end:
+                (length,) = struct.unpack_from('<I', view, cursor)
+                dictionary.append(bytes(view[cursor + 4:cursor + 4 + length]).decode('utf-8'))
+                cursor += 4 + length
+            self.__dictionaries[attr] = dictionary
+            self.__lookups[attr] = {value: code for code, value in enumerate(dictionary)}
+        return size
+
+    def close(self):
+        """
+        Release the memory mapping of a table opened with map_columnar and empty it
+        Columns obtained from the table before must not be used afterwards.
+        Tables that are not mapped are only emptied
+        :return: -
+        """
+        columns = list(self.__numeric.values()) + list(self.__codes.values())
+        self.clear()
+        if self.__mapping is None:
+            return
+        mapping, view = self.__mapping
+        self.__mapping = None
+        for column in columns:
+            if isinstance(column, memoryview):
+                column.release()
+        view.release()
+        try:
+            mapping.close()
+        except BufferError:
+            # Views handed out elsewhere are still alive; the mapping closes once they are collected
+            pass
@@ -0,0 +1,111 @@
+"""
+Running Statistics
+Count, sum, min, max, mean and variance of a numeric column that can be
+updated chunk by chunk and merged without revisiting earlier values.
+Each chunk is summarized on its own and combined with the running state
+using Chan et al.'s parallel form of Welford's algorithm
+"""
+import math
+
+
+class RunningStats:
+    def __init__(self):
+        self.__count = 0
+        self.__total = 0.0
+        self.__minimum = math.inf
+        self.__maximum = -math.inf
+        self.__mean = 0.0
+        # Sum of squared differences from the mean (Welford's M2)
+        self.__m2 = 0.0
+
+    @classmethod
+    def from_values(cls, values) -> 'RunningStats':
+        """
+        Summarize a sequence of values
+        :param values: numbers (array('d'), memoryview, list, ...)
+        :return: new RunningStats
+        """
+        stats = cls()
+        stats.update(values)
+        return stats
+
+    def update(self, values):
+        """
+        Add a chunk of values
+
+        Time Complexity: O(m) where m is the number of new values
+        Space Complexity: O(1)
+
+        :param values: numbers to add
+        :return: -
+        """
+        count = len(values)
+        if count == 0:
+            return
+        total = sum(values)
+        mean = total / count
+        chunk = RunningStats()
+        chunk.__count = count
+        chunk.__total = total
+        chunk.__minimum = min(values)
+        chunk.__maximum = max(values)
+        chunk.__mean = mean
+        chunk.__m2 = sum((x - mean) * (x - mean) for x in values)
+        self.merge(chunk)
+
+    def merge(self, other: 'RunningStats'):
+        """
+        Combine another summary into this one (Chan et al.)
+
+        Time Complexity: O(1)
+        Space Complexity: O(1)
+
+        :param other: summary of values not yet counted here
+        :return: -
+        """
+        if other.__count == 0:
+            return
+        count = self.__count + other.__count
+        delta = other.__mean - self.__mean
+        self.__mean += delta * other.__count / count
+        self.__m2 += other.__m2 + delta * delta * self.__count * other.__count / count
+        self.__count = count
+        self.__total += other.__total
+        self.__minimum = min(self.__minimum, other.__minimum)
+        self.__maximum = max(self.__maximum, other.__maximum)
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def get_sum(self) -> float:
+        return self.__total
+
+    def get_min(self) -> float:
+        return self.__minimum
+
+    def get_max(self) -> float:
+        return self.__maximum
+
+    def get_mean(self) -> float:
+        """
+        Mean as sum / count (matches a plain sum over the column)
+        :return: mean, 0.0 for no values
+        """
+        return self.__total / self.__count if self.__count else 0.0
+
+    def get_variance(self, sample: bool = True) -> float:
+        """
+        Variance from Welford's M2
+        :param sample: True for the sample variance (n - 1), False for the population variance
+        :return: variance, 0.0 if it is undefined
+        """
+        divisor = self.__count - 1 if sample else self.__count
+        return self.__m2 / divisor if divisor > 0 else 0.0
+
+    def get_stddev(self, sample: bool = True) -> float:
+        """
+        Standard deviation
+        :param sample: True for the sample standard deviation
+        :return: standard deviation
+        """
+        return math.sqrt(self.get_variance(sample))
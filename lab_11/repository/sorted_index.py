@@ -0,0 +1,149 @@
+"""
+Sorted Secondary Index
+Keeps the values of one numeric column in ascending order together with the
+row each value came from, so range filters are answered by binary search
+instead of a full column scan
+"""
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Row ids are stored as unsigned 32-bit integers (up to ~4 billion rows)
+ROW_TYPECODE = 'I'
+# New rows up to this count are inserted one by one instead of merged
+INSERT_THRESHOLD = 32
+
+
+class SortedIndex:
+    def __init__(self, column):
+        """
+        Build the index of a numeric column
+
+        Time Complexity: O(n log n) where n is the number of rows
+        Space Complexity: O(n) - one value and one row id per row
+
+        :param column: sequence of numeric values (array('d') or memoryview)
+        """
+        order = sorted(range(len(column)), key=column.__getitem__)
+        self.__values = array('d', map(column.__getitem__, order))
+        self.__rows = array(ROW_TYPECODE, order)
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def extend(self, column):
+        """
+        Index the rows appended to the column since the index was built or last extended
+        A few rows are inserted in place; more are sorted and merged in one pass.
+        Equal values stay in row order, as if the index had been rebuilt
+
+        Time Complexity: O(m * n) memmove for m <= INSERT_THRESHOLD new rows,
+                         O(n + m log m) otherwise
+        Space Complexity: O(n + m) for a merge
+
+        :param column: the whole column, whose first len(self) values are already indexed
+        :return: -
+        """
+        start = len(self.__values)
+        new_rows = sorted(range(start, len(column)), key=column.__getitem__)
+        if len(new_rows) <= INSERT_THRESHOLD:
+            for row in new_rows:
+                value = column[row]
+                # Every indexed row is older, so equal values go before the new one
+                position = bisect_right(self.__values, value)
+                self.__values.insert(position, value)
+                self.__rows.insert(position, row)
+            return
+        merged = list(heapq.merge(zip(self.__values, self.__rows),
+                                  ((column[row], row) for row in new_rows)))
+        self.__values = array('d', (value for value, _ in merged))
+        self.__rows = array(ROW_TYPECODE, (row for _, row in merged))
+
+    def get_values(self) -> array:
+        """
+        Get the indexed values in ascending order (must not be modified)
+        :return: array('d') of sorted values
+        """
+        return self.__values
+
+    def _rows_between_positions(self, lo: int, hi: int) -> list:
+        """
+        Get the row ids of sorted positions [lo, hi) in table order
+        :param lo: first position
+        :param hi: position after the last one
+        :return: sorted list of row ids
+        """
+        return sorted(self.__rows[lo:hi])
+
+    def positions(self, low: float, high: float, low_inclusive: bool = True,
+                  high_inclusive: bool = True) -> tuple:
+        """
+        Get the sorted positions whose values lie between two bounds
+        Use -math.inf / math.inf for an open side
+
+        Time Complexity: O(log n)
+        Space Complexity: O(1)
+
+        :param low: lower bound
+        :param high: upper bound
+        :param low_inclusive: True if a value equal to low matches
+        :param high_inclusive: True if a value equal to high matches
+        :return: tuple (lo, hi) of positions, empty if lo >= hi
+        """
+        values = self.__values
+        lo = bisect_left(values, low) if low_inclusive else bisect_right(values, low)
+        hi = bisect_right(values, high) if high_inclusive else bisect_left(values, high)
+        return lo, max(lo, hi)
+
+    def rows_in_bounds(self, low: float, high: float, low_inclusive: bool = True,
+                       high_inclusive: bool = True) -> list:
+        """
+        Get rows whose values lie between two bounds (see positions)
+
+        Time Complexity: O(log n + k log k) where k is the number of matching rows
+        Space Complexity: O(k)
+
+        :return: list of row ids in table order
+        """
+        return self._rows_between_positions(*self.positions(low, high, low_inclusive, high_inclusive))
+
+    def count_in_bounds(self, low: float, high: float, low_inclusive: bool = True,
+                        high_inclusive: bool = True) -> int:
+        """
+        Count rows whose values lie between two bounds (see positions)
+
+        Time Complexity: O(log n)
+        Space Complexity: O(1)
+
+        :return: number of matching rows
+        """
+        lo, hi = self.positions(low, high, low_inclusive, high_inclusive)
+        return hi - lo
+
+    def rows_greater(self, value: float) -> list:
+        """
+        Get rows whose value is strictly greater than a threshold
+
+        Time Complexity: O(log n + k log k) where k is the number of matching rows
+        Space Complexity: O(k)
+
+        :param value: threshold
+        :return: list of row ids in table order
+        """
+        return self._rows_between_positions(bisect_right(self.__values, value), len(self.__values))
+
+    def rows_between(self, low: float, high: float) -> list:
+        """
+        Get rows whose value lies in the closed range [low, high]
+
+        Time Complexity: O(log n + k log k) where k is the number of matching rows
+        Space Complexity: O(k)
+
+        :param low: lower bound (inclusive)
+        :param high: upper bound (inclusive)
+        :return: list of row ids in table order
+        """
+        if low > high:
+            return []
+        return self._rows_between_positions(bisect_left(self.__values, low),
+                                            bisect_right(self.__values, high))
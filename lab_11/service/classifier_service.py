@@ -2,37 +2,214 @@
 Classifier Service
 Implements k-Nearest Neighbors algorithm for species classification
 """
-import math
+import io
+import os
+import random
+import struct
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from domain.penguin import Penguin
-from domain.exceptions import NoDataLoadedException, EmptyDatasetException
+from domain.exceptions import (
+    NoDataLoadedException, EmptyDatasetException, ValidationException, FileNotFoundException,
+    InvalidFileFormatException
+)
 from repository.penguin_repo import PenguinRepo
+from repository.penguin_repo_file import PenguinRepoFile
+from repository.penguin_table import PenguinTable
+from service.knn_model import KnnModel
+
+try:
+    import numpy as np
+except ImportError:  # optional: classify_batch falls back to pure Python
+    np = None
+
+# Classifier of a prediction worker process, set up once by _init_prediction_worker
+_worker_classifier = None
+
+
+def _init_prediction_worker(training_dump: bytes, model_dump: bytes):
+    """
+    Process pool initializer: receive the training set and/or the model once per worker
+    :param training_dump: training table written by PenguinTable.dump, or None
+    :param model_dump: model written by KnnModel.dump, or None to build it from the table
+    :return: -
+    """
+    global _worker_classifier
+    repo = PenguinRepo()
+    if training_dump is not None:
+        repo.set_table(PenguinTable.load(io.BytesIO(training_dump)))
+    _worker_classifier = ClassifierService(repo)
+    if model_dump is not None:
+        _worker_classifier._use_model(KnnModel.load(io.BytesIO(model_dump)),
+                                      from_repository=training_dump is not None)
+
+
+def _classify_points(points: list, k: int) -> list:
+    """
+    Classify a chunk inside a worker process
+    :param points: list of (culmen_len, culmen_depth, flipper_len)
+    :param k: number of nearest neighbors
+    :return: list of (predicted species, confidence)
+    """
+    return _worker_classifier.classify_batch(points, k)
+
+
+def _evaluate_rows(test_rows: list, leave_one_out: bool, k_values: list) -> dict:
+    """
+    Cross-validate a group of rows inside a worker process
+    :param test_rows: repository rows to classify
+    :param leave_one_out: True to train on all other rows, False to train on all rows not in test_rows
+    :param k_values: numbers of neighbours to evaluate
+    :return: dictionary k -> {(actual, predicted): count}
+    """
+    return _worker_classifier._confusion_counts(test_rows, leave_one_out, k_values)
 
 
 class ClassifierService:
-    def __init__(self, penguin_repo: PenguinRepo):
+    # Measurements a point is made of, in query order
+    FEATURES = ('culmen_length_mm', 'culmen_depth_mm', 'flipper_length_mm')
+    # Datasets with at least this many penguins are searched with a KD-tree
+    KD_TREE_THRESHOLD = 1000
+    # Distance-matrix entries computed at once by classify_batch (about 32 MB of float64)
+    BATCH_TILE_ELEMENTS = 1 << 22
+    # Rows read, classified and written together by predict_file
+    PREDICTION_CHUNK_SIZE = 10000
+    # Chunks queued per worker process before predict_file waits for the oldest one
+    IN_FLIGHT_PER_WORKER = 2
+    # Columns appended to every row of a prediction file
+    PREDICTION_COLUMNS = ('predicted_species', 'confidence')
+    # Leave-one-out evaluation hands this many row groups to every worker
+    EVALUATION_TASKS_PER_WORKER = 4
+
+    def __init__(self, penguin_repo: PenguinRepo, penguin_repo_file: PenguinRepoFile = None):
         self.__penguin_repo = penguin_repo
+        self.__penguin_repo_file = penguin_repo_file
+        # Cached model, the repository version it belongs to and whether it was built from the repository
+        self.__model = None
+        self.__model_version = None
+        self.__model_from_repository = False
 
     def _check_data_loaded(self):
         """Check if data is loaded"""
         if self.__penguin_repo.get_penguin_count() == 0:
             raise NoDataLoadedException()
 
-    def _euclidean_distance(self, p1: tuple, p2: tuple) -> float:
+    def _build_model(self, rows: list = None) -> KnnModel:
+        """
+        Build a model from the loaded penguins
+        :param rows: repository rows to train on, None for all of them
+        :return: KnnModel whose training rows are the given rows in order
+                 (repository rows when rows is None); it has a KD-tree from
+                 KD_TREE_THRESHOLD training points on
+        """
+        columns = [self.__penguin_repo.get_numeric_column(f) for f in self.FEATURES]
+        table = self.__penguin_repo.get_table()
+        labels = table.get_codes('species')
+        if rows is not None:
+            columns = [array('d', (column[row] for row in rows)) for column in columns]
+            labels = [labels[row] for row in rows]
+        return KnnModel(columns, labels, table.get_dictionary('species'),
+                        build_kd_tree=len(labels) >= self.KD_TREE_THRESHOLD)
+
+    def _use_model(self, model: KnnModel, from_repository: bool):
+        """Make a model the cached one for the current repository version"""
+        self.__model = model
+        self.__model_version = self.__penguin_repo.get_version()
+        self.__model_from_repository = from_repository
+
+    def get_model(self) -> KnnModel:
         """
-        Calculate Euclidean distance between two points
-        :param p1: tuple of (culmen_len, culmen_depth, flipper_len)
-        :param p2: tuple of (culmen_len, culmen_depth, flipper_len)
-        :return: distance
+        Get the model queries are answered with
+        It is built from the loaded penguins (or loaded with load_model) once and
+        cached until the repository version changes
+
+        Time Complexity: O(1) when cached, O(n log n) expected to rebuild
+        Space Complexity: O(n)
+
+        :return: KnnModel
+        :raises NoDataLoadedException if no data loaded and no model loaded
+        """
+        if self.__model is None or self.__model_version != self.__penguin_repo.get_version():
+            self._check_data_loaded()
+            self._use_model(self._build_model(), from_repository=True)
+        return self.__model
+
+    def _repository_model(self) -> KnnModel:
+        """The model of the loaded penguins, even while a loaded model file answers queries"""
+        model = self.get_model()
+        return model if self.__model_from_repository else self._build_model()
+
+    def _model_path(self, filename: str) -> str:
+        if self.__penguin_repo_file is None:
+            raise ValidationException("no file repository configured")
+        return os.path.join(self.__penguin_repo_file.get_data_directory(), filename)
+
+    def save_model(self, filename: str):
+        """
+        Save the current model (scales, standardized points, labels and KD-tree)
+        Written to a temporary file first so readers never see a partial model
+        :param filename: name of the file in the data directory
+        :return: -
+        :raises NoDataLoadedException if there is no model
+        :raises ValidationException if there is no file repository
+        """
+        model = self.get_model()
+        filepath = self._model_path(filename)
+        temp_path = filepath + '.tmp'
+        with open(temp_path, 'wb') as file:
+            model.dump(file)
+        os.replace(temp_path, filepath)
+
+    def load_model(self, filename: str) -> int:
+        """
+        Load a saved model, answering queries without any training data or rebuilding
+        It is used until the repository changes (e.g. data is loaded)
+        :param filename: name of the file in the data directory
+        :return: number of training points of the model
+        :raises ValidationException if there is no file repository
+        :raises FileNotFoundException if the file doesn't exist
+        :raises InvalidFileFormatException if the file is not a saved model
+        """
+        filepath = self._model_path(filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundException(filename)
+        try:
+            with open(filepath, 'rb') as file:
+                model = KnnModel.load(file)
+        except (ValueError, OSError, UnicodeDecodeError, struct.error) as e:
+            raise InvalidFileFormatException(filename, str(e))
+        self._use_model(model, from_repository=False)
+        return len(model)
+
+    def _nearest_neighbors(self, point: tuple, k: int) -> list:
         """
-        return math.sqrt(sum((a - b) ** 2 for a, b in zip(p1, p2)))
+        Find the k nearest penguins in standardized feature space, through the
+        model's KD-tree for large datasets
+
+        Time Complexity: O(log n + k log k) typical with the KD-tree, O(n log k) without
+        Space Complexity: O(k)
+
+        :param point: (culmen_len, culmen_depth, flipper_len)
+        :param k: number of neighbours
+        :return: list of (standardized distance, species) ordered by distance then training order
+        :raises NoDataLoadedException if no data loaded
+        """
+        model = self.get_model()
+        return [(distance, model.get_label(row)) for distance, row in model.nearest(point, min(k, len(model)))]
 
     def classify(self, culmen_len: float, culmen_depth: float, flipper_len: float, k: int) -> str:
         """
         Classify a penguin species using k-Nearest Neighbors algorithm
-        
-        Time Complexity: O(n log n) for sorting distances, O(n) for distance calculation
-        Space Complexity: O(n) for storing distances
-        
+        Features are standardized with the training means and standard deviations
+        so each one weighs the same; the model (and its KD-tree for datasets of
+        KD_TREE_THRESHOLD penguins or more) is cached until the data changes
+
+        Time Complexity: O(log n + k log k) typical with the KD-tree,
+                         O(n log k) on small datasets
+        Space Complexity: O(n) for the cached model
+
         :param culmen_len: culmen length in mm
         :param culmen_depth: culmen depth in mm
         :param flipper_len: flipper length in mm
@@ -40,75 +217,323 @@ class ClassifierService:
         :return: predicted species
         :raises NoDataLoadedException if no data loaded
         """
-        self._check_data_loaded()
+        return self.classify_with_details(culmen_len, culmen_depth, flipper_len, k)['prediction']
 
-        penguins = self.__penguin_repo.get_all_penguins()
-        if not penguins:
+    def classify_with_details(self, culmen_len: float, culmen_depth: float,
+                             flipper_len: float, k: int) -> dict:
+        """
+        Classify with detailed results including confidence
+        :return: dictionary with prediction and details
+        """
+        k_nearest = self._nearest_neighbors((culmen_len, culmen_depth, flipper_len), k)
+        if not k_nearest:
             raise EmptyDatasetException()
 
-        # Calculate distances to all penguins
-        point = (culmen_len, culmen_depth, flipper_len)
-        distances = []
-
-        for penguin in penguins:
-            penguin_point = (
-                penguin.get_culmen_length_mm(),
-                penguin.get_culmen_depth_mm(),
-                penguin.get_flipper_length_mm()
-            )
-            dist = self._euclidean_distance(point, penguin_point)
-            distances.append((dist, penguin.get_species()))
-
-        # Sort by distance and get k nearest
-        distances.sort(key=lambda x: x[0])
-        k_nearest = distances[:min(k, len(distances))]
+        predicted_species, confidence, votes = self._vote([species for _, species in k_nearest])
+        return {
+            'prediction': predicted_species,
+            'confidence': round(confidence, 2),
+            'votes': votes,
+            'k_used': len(k_nearest)
+        }
 
-        # Vote for species
+    @staticmethod
+    def _vote(neighbor_species: list) -> tuple:
+        """
+        Majority vote of the neighbours, ties go to the species seen first
+        :param neighbor_species: species of the neighbours, nearest first
+        :return: (predicted species, confidence in percent, votes per species)
+        """
         votes = {}
-        for dist, species in k_nearest:
+        for species in neighbor_species:
             votes[species] = votes.get(species, 0) + 1
 
-        # Return species with most votes
         predicted_species = max(votes, key=votes.get)
-        return predicted_species
+        confidence = votes[predicted_species] / len(neighbor_species) * 100
+        return predicted_species, confidence, votes
 
-    def classify_with_details(self, culmen_len: float, culmen_depth: float, 
-                             flipper_len: float, k: int) -> dict:
+    def _numpy_neighbor_rows(self, model: KnnModel, points: list, k: int):
         """
-        Classify with detailed results including confidence
-        :return: dictionary with prediction and details
+        Nearest rows of many queries from a distance matrix computed one tile of
+        queries at a time, so at most BATCH_TILE_ELEMENTS distances exist at once
+        The k-th distance of every query comes from argpartition; all rows up to
+        that distance are then ordered by (distance, row) so ties are broken
+        exactly like the single-query search
+
+        Time Complexity: O(q * n) for q queries and n penguins, vectorized
+        Space Complexity: O(n + BATCH_TILE_ELEMENTS)
+
+        :param model: model to search
+        :param points: list of (culmen_len, culmen_depth, flipper_len)
+        :param k: number of neighbours, 1 <= k <= n
+        :return: generator of training row lists, one per query in order
         """
-        self._check_data_loaded()
+        train = np.column_stack([np.asarray(column, dtype=np.float64) for column in model.get_columns()])
+        queries = np.asarray(points, dtype=np.float64).reshape(-1, len(self.FEATURES))
+        queries = (queries - np.asarray(model.get_means())) / np.asarray(model.get_stds())
+        tile = max(1, self.BATCH_TILE_ELEMENTS // len(train))
 
-        penguins = self.__penguin_repo.get_all_penguins()
-        if not penguins:
-            raise EmptyDatasetException()
+        for start in range(0, len(queries), tile):
+            block = queries[start:start + tile]
+            dx = block[:, 0, None] - train[None, :, 0]
+            dy = block[:, 1, None] - train[None, :, 1]
+            dz = block[:, 2, None] - train[None, :, 2]
+            distances = np.sqrt(dx * dx + dy * dy + dz * dz)
+            del dx, dy, dz
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            kth = np.take_along_axis(distances, nearest, axis=1).max(axis=1)
+            for row_distances, limit in zip(distances, kth):
+                candidates = np.flatnonzero(row_distances <= limit)
+                order = np.lexsort((candidates, row_distances[candidates]))
+                yield candidates[order[:k]].tolist()
 
-        point = (culmen_len, culmen_depth, flipper_len)
-        distances = []
+    def classify_batch(self, points, k: int) -> list:
+        """
+        Classify many penguins in one call
+        With NumPy the query x penguin distances are computed in tiles and the
+        neighbours are selected with argpartition; without it every query is a
+        model lookup (KD-tree, or heapq.nsmallest on small datasets). Both give
+        the same answers as classify
 
-        for penguin in penguins:
-            penguin_point = (
-                penguin.get_culmen_length_mm(),
-                penguin.get_culmen_depth_mm(),
-                penguin.get_flipper_length_mm()
-            )
-            dist = self._euclidean_distance(point, penguin_point)
-            distances.append((dist, penguin.get_species()))
+        Time Complexity: O(q * n) vectorized with NumPy, O(q * (log n + k log k))
+                         typical with the KD-tree, O(q * n log k) otherwise
+        Space Complexity: O(n + BATCH_TILE_ELEMENTS + q) - memory does not grow
+                          with q * n
 
-        distances.sort(key=lambda x: x[0])
-        k_nearest = distances[:min(k, len(distances))]
+        :param points: iterable of (culmen_len, culmen_depth, flipper_len)
+        :param k: number of nearest neighbors
+        :return: list of (predicted species, confidence in percent) in the order of points
+        :raises NoDataLoadedException if no data loaded
+        :raises ValidationException if k is not positive
+        """
+        model = self.get_model()
+        if k <= 0:
+            raise ValidationException("k must be a positive integer")
+        points = [tuple(point) for point in points]
+        k = min(k, len(model))
+        if np is not None:
+            neighbor_rows = self._numpy_neighbor_rows(model, points, k)
+        else:
+            neighbor_rows = ([row for _, row in model.nearest(point, k)] for point in points)
 
-        votes = {}
-        for dist, species in k_nearest:
-            votes[species] = votes.get(species, 0) + 1
+        results = []
+        for rows in neighbor_rows:
+            predicted_species, confidence, _ = self._vote([model.get_label(row) for row in rows])
+            results.append((predicted_species, round(confidence, 2)))
+        return results
 
-        predicted_species = max(votes, key=votes.get)
-        confidence = votes[predicted_species] / len(k_nearest) * 100
+    def _predict_chunks(self, chunks, k: int, workers: int):
+        """
+        Classify chunks of (row values, point) in order
+        With several workers the chunks are classified by a process pool whose
+        workers receive the model once; at most IN_FLIGHT_PER_WORKER chunks
+        per worker are queued, so memory stays bounded however long the input is
+
+        :param chunks: iterable of lists of (row values, point or None)
+        :param k: number of nearest neighbors
+        :param workers: number of worker processes, 1 classifies in this process
+        :return: generator of (chunk, predictions for the chunk's non-None points)
+        """
+        if workers <= 1:
+            for chunk in chunks:
+                yield chunk, self.classify_batch([point for _, point in chunk if point is not None], k)
+            return
+
+        model = io.BytesIO()
+        self.get_model().dump(model)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_prediction_worker,
+                                 initargs=(None, model.getvalue())) as executor:
+            pending = deque()
+            for chunk in chunks:
+                points = [point for _, point in chunk if point is not None]
+                pending.append((chunk, executor.submit(_classify_points, points, k)))
+                if len(pending) >= workers * self.IN_FLIGHT_PER_WORKER:
+                    done, future = pending.popleft()
+                    yield done, future.result()
+            while pending:
+                done, future = pending.popleft()
+                yield done, future.result()
+
+    def predict_file(self, input_filename: str, output_filename: str, k: int, workers: int = 1,
+                     chunk_size: int = None) -> dict:
+        """
+        Classify every row of a CSV file of measurements and write the rows with
+        their predicted species and confidence to another CSV file
+        The input is streamed in chunks and the output keeps the input order;
+        rows with missing or invalid measurements get empty prediction columns
+
+        Time Complexity: O(m * (log n + k log k)) typical for m rows with the KD-tree,
+                         spread over the worker processes
+        Space Complexity: O(n) per worker for the model,
+                          O(workers * IN_FLIGHT_PER_WORKER * chunk_size) for queued chunks
+
+        :param input_filename: CSV file with culmen length, culmen depth and flipper length columns
+        :param output_filename: CSV file to write
+        :param k: number of nearest neighbors
+        :param workers: number of worker processes (None for the number of CPUs), 1 runs in this process
+        :param chunk_size: rows per chunk (default PREDICTION_CHUNK_SIZE)
+        :return: dictionary with 'rows', 'classified', 'skipped', 'workers' and 'seconds'
+        :raises NoDataLoadedException if no training data or model loaded
+        :raises ValidationException if k is not positive or there is no file repository
+        :raises FileNotFoundException if the input file doesn't exist
+        :raises InvalidFileFormatException if the input lacks a measurement column
+        """
+        self.get_model()
+        if k <= 0:
+            raise ValidationException("k must be a positive integer")
+        if self.__penguin_repo_file is None:
+            raise ValidationException("no file repository configured for predictions")
+        workers = workers or os.cpu_count() or 1
+        started = time.perf_counter()
+
+        header, chunks = self.__penguin_repo_file.iter_measurements(
+            input_filename, self.FEATURES, chunk_size or self.PREDICTION_CHUNK_SIZE)
+        skipped = 0
+
+        def output_rows():
+            nonlocal skipped
+            for chunk, predictions in self._predict_chunks(chunks, k, workers):
+                predictions = iter(predictions)
+                rows = []
+                for values, point in chunk:
+                    if point is None:
+                        skipped += 1
+                        rows.append(values + ['', ''])
+                    else:
+                        rows.append(values + list(next(predictions)))
+                yield rows
 
+        rows = self.__penguin_repo_file.save_rows(output_filename, header + list(self.PREDICTION_COLUMNS),
+                                                  output_rows())
         return {
-            'prediction': predicted_species,
-            'confidence': round(confidence, 2),
-            'votes': votes,
-            'k_used': len(k_nearest)
+            'rows': rows,
+            'classified': rows - skipped,
+            'skipped': skipped,
+            'workers': workers,
+            'seconds': time.perf_counter() - started
+        }
+
+    def _confusion_counts(self, test_rows: list, leave_one_out: bool, k_values: list) -> dict:
+        """
+        Classify held-out rows for several k from a single neighbour search
+        Every test row gets its max(k_values) nearest training rows once; the
+        prediction for a smaller k votes over a prefix of that list, which is
+        exactly what a search for k neighbours would return. Folds get a model
+        (scales included) of their own training rows; leave-one-out shares the
+        model of the whole dataset
+
+        Time Complexity: O(t * (log n + K log K)) typical for t test rows and K = max(k_values),
+                         plus O(n log n) to index the training rows of a fold
+        Space Complexity: O(n) for the index, O(K) per test row
+
+        :param test_rows: repository rows to classify
+        :param leave_one_out: True to train on all other rows, False to train on all rows not in test_rows
+        :param k_values: numbers of neighbours to evaluate
+        :return: dictionary k -> {(actual, predicted): count}
+        """
+        columns = [self.__penguin_repo.get_numeric_column(f) for f in self.FEATURES]
+        table = self.__penguin_repo.get_table()
+        max_k = max(k_values)
+
+        if leave_one_out:
+            model = self._repository_model()
+        else:
+            held_out = set(test_rows)
+            model = self._build_model([row for row in range(len(columns[0])) if row not in held_out])
+
+        counts = {k: {} for k in k_values}
+        for row in test_rows:
+            point = tuple(column[row] for column in columns)
+            if leave_one_out:
+                # The row itself is among its max_k + 1 nearest, drop it
+                neighbors = [r for _, r in model.nearest(point, max_k + 1) if r != row][:max_k]
+            else:
+                neighbors = [r for _, r in model.nearest(point, max_k)]
+            if not neighbors:
+                continue
+            species = [model.get_label(r) for r in neighbors]
+            actual = table.get_value('species', row)
+            for k in k_values:
+                predicted = self._vote(species[:k])[0]
+                cell = counts[k]
+                cell[(actual, predicted)] = cell.get((actual, predicted), 0) + 1
+        return counts
+
+    def evaluate(self, k_values, folds: int = None, workers: int = 1, seed: int = None) -> dict:
+        """
+        Cross-validate the classifier for several values of k
+        Neighbour lists up to the largest k are computed once per held-out row and
+        shared by every k, so evaluating many k costs about as much as one.
+        Folds (or groups of rows for leave-one-out) run in parallel when workers > 1
+
+        Time Complexity: O(n * (log n + K log K)) typical for K = max(k_values),
+                         plus O(f * n log n) to index the training rows of f folds
+        Space Complexity: O(n) per worker, O(|k_values| * s^2) for the confusion matrices of s species
+
+        :param k_values: numbers of neighbours to evaluate
+        :param folds: number of folds, None for leave-one-out
+        :param workers: number of worker processes (None for the number of CPUs), 1 runs in this process
+        :param seed: seed of the random fold assignment
+        :return: dictionary with 'folds' (count, 'loo' for leave-one-out), 'best_k' (highest accuracy,
+                 smallest k on ties) and 'results': k -> {'accuracy' (percent), 'correct', 'total',
+                 'confusion': actual species -> predicted species -> count}
+        :raises NoDataLoadedException if no data loaded
+        :raises ValidationException if a k is not positive, there are fewer than 2 folds
+                or fewer than 2 penguins
+        """
+        self._check_data_loaded()
+        k_values = sorted(set(k_values))
+        if not k_values or k_values[0] <= 0:
+            raise ValidationException("k values must be positive integers")
+        count = self.__penguin_repo.get_penguin_count()
+        if count < 2:
+            raise ValidationException("cross-validation needs at least 2 penguins")
+        if folds is not None and folds < 2:
+            raise ValidationException("cross-validation needs at least 2 folds")
+        leave_one_out = folds is None or folds >= count
+        workers = workers or os.cpu_count() or 1
+
+        if leave_one_out:
+            size = max(1, -(-count // (workers * self.EVALUATION_TASKS_PER_WORKER)))
+            groups = [list(range(start, min(start + size, count))) for start in range(0, count, size)]
+        else:
+            order = list(range(count))
+            random.Random(seed).shuffle(order)
+            groups = [sorted(order[fold::folds]) for fold in range(folds)]
+
+        if workers <= 1:
+            partials = [self._confusion_counts(group, leave_one_out, k_values) for group in groups]
+        else:
+            training = io.BytesIO()
+            self.__penguin_repo.get_table().dump(training)
+            model = None
+            if leave_one_out:
+                model = io.BytesIO()
+                self._repository_model().dump(model)
+                model = model.getvalue()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_prediction_worker,
+                                     initargs=(training.getvalue(), model)) as executor:
+                partials = list(executor.map(_evaluate_rows, groups, [leave_one_out] * len(groups),
+                                             [k_values] * len(groups)))
+
+        results = {}
+        for k in k_values:
+            confusion = {}
+            for partial in partials:
+                for (actual, predicted), cell_count in partial[k].items():
+                    row = confusion.setdefault(actual, {})
+                    row[predicted] = row.get(predicted, 0) + cell_count
+            total = sum(sum(row.values()) for row in confusion.values())
+            correct = sum(row.get(actual, 0) for actual, row in confusion.items())
+            results[k] = {
+                'accuracy': round(correct / total * 100, 2) if total else 0.0,
+                'correct': correct,
+                'total': total,
+                'confusion': confusion
+            }
+
+        return {
+            'folds': 'loo' if leave_one_out else folds,
+            'best_k': max(k_values, key=lambda k: (results[k]['correct'], -k)),
+            'results': results
         }
@@ -0,0 +1,182 @@
+"""
+KD-Tree
+Static 3-d tree for k-nearest-neighbour queries, stored as flat arrays.
+
+The points are permuted so that every node is a contiguous range [lo, hi) of
+the arrays: its splitting point sits at mid = (lo + hi) // 2, the left subtree
+is [lo, mid) and the right subtree [mid + 1, hi). Ranges of at most LEAF_SIZE
+points are leaves that are scanned linearly. No node objects are allocated.
+"""
+import heapq
+import math
+import struct
+import sys
+from array import array
+from operator import itemgetter
+
+from repository.sorted_index import ROW_TYPECODE
+from service.order_statistics import select_ranks
+
+# Ranges this small are scanned instead of split further
+LEAF_SIZE = 16
+DIMENSIONS = 3
+# Points sampled per node to pick the dimension with the widest spread
+SPREAD_SAMPLE_SIZE = 256
+
+
+class KdTree:
+    # Binary dump: magic, byte order flag, point count
+    DUMP_MAGIC = b'PKDT'
+    DUMP_HEADER = struct.Struct('<4sBQ')
+
+    def __init__(self, columns: list):
+        """
+        Build the tree
+
+        Time Complexity: O(n log n) expected - every level partitions around a
+                         quickselect median instead of sorting
+        Space Complexity: O(n) - coordinates, row ids and split dimensions
+
+        :param columns: three equally long sequences of coordinates, row i is
+                        the point (columns[0][i], columns[1][i], columns[2][i])
+        """
+        points = list(zip(*columns, range(len(columns[0]))))
+        size = len(points)
+        split_dims = array('B', bytes(size))
+
+        stack = [(0, size)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            segment = points[lo:hi]
+            # Split along the dimension with the widest spread (estimated on a sample)
+            sample = segment[::max(1, len(segment) // SPREAD_SAMPLE_SIZE)]
+            spreads = [max(map(itemgetter(d), sample)) - min(map(itemgetter(d), sample))
+                       for d in range(DIMENSIONS)]
+            dim = spreads.index(max(spreads))
+            mid = (lo + hi) // 2
+            # Three-way partition around the median, the median lands on position mid
+            median = select_ranks(list(map(itemgetter(dim), segment)), [mid - lo])[mid - lo]
+            points[lo:hi] = ([p for p in segment if p[dim] < median]
+                             + [p for p in segment if p[dim] == median]
+                             + [p for p in segment if p[dim] > median])
+            split_dims[mid] = dim
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+        self.__size = size
+        self.__coords = array('d', (value for point in points for value in point[:DIMENSIONS]))
+        self.__rows = array(ROW_TYPECODE, (point[DIMENSIONS] for point in points))
+        self.__split_dims = split_dims
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def dump(self, file):
+        """
+        Write the tree to a binary file object (coordinates, row ids and split dimensions as raw arrays)
+        :param file: file opened in binary write mode
+        :return: -
+        """
+        file.write(self.DUMP_HEADER.pack(self.DUMP_MAGIC, sys.byteorder == 'little', self.__size))
+        file.write(self.__coords)
+        file.write(self.__rows)
+        file.write(self.__split_dims)
+
+    @classmethod
+    def load(cls, file) -> 'KdTree':
+        """
+        Read a tree written by dump without rebuilding it
+        :param file: file opened in binary read mode, positioned at the dump
+        :return: KdTree
+        :raises ValueError if the data is not a tree dump or is truncated
+        """
+        header = file.read(cls.DUMP_HEADER.size)
+        if len(header) != cls.DUMP_HEADER.size:
+            raise ValueError("Truncated KD-tree dump")
+        magic, little_endian, size = cls.DUMP_HEADER.unpack(header)
+        if magic != cls.DUMP_MAGIC:
+            raise ValueError("Not a KD-tree dump")
+        swap = bool(little_endian) != (sys.byteorder == 'little')
+
+        def read_array(typecode: str, count: int) -> array:
+            values = array(typecode)
+            try:
+                values.fromfile(file, count)
+            except EOFError:
+                raise ValueError("Truncated KD-tree dump")
+            if swap:
+                values.byteswap()
+            return values
+
+        tree = cls.__new__(cls)
+        tree.__size = size
+        tree.__coords = read_array('d', DIMENSIONS * size)
+        tree.__rows = read_array(ROW_TYPECODE, size)
+        tree.__split_dims = read_array('B', size)
+        return tree
+
+    def nearest(self, point: tuple, k: int) -> list:
+        """
+        Find the k nearest points with a bounded best-first search
+        Nodes are visited in order of a lower bound of their distance to the
+        query and the search stops once no unvisited node can beat the current
+        k-th neighbour. Ties are broken by row id, so the result equals sorting
+        all points by (distance, row) and taking the first k
+
+        Time Complexity: O(k log k + log n) typical for low-dimensional data, O(n log k) worst case
+        Space Complexity: O(k + depth) for the two heaps
+
+        :param point: query (x, y, z)
+        :param k: number of neighbours
+        :return: list of (distance, row id) ordered by distance then row id
+        """
+        if k <= 0 or self.__size == 0:
+            return []
+        qx, qy, qz = point
+        query = (qx, qy, qz)
+        coords = self.__coords
+        rows = self.__rows
+        split_dims = self.__split_dims
+        sqrt = math.sqrt
+
+        # Max-heap of the best candidates as (-distance, -row)
+        best = []
+        # Min-heap of nodes to visit as (lower bound, lo, hi)
+        pending = [(0.0, 0, self.__size)]
+
+        def consider(position: int):
+            base = DIMENSIONS * position
+            dx = qx - coords[base]
+            dy = qy - coords[base + 1]
+            dz = qz - coords[base + 2]
+            candidate = (-sqrt(dx * dx + dy * dy + dz * dz), -rows[position])
+            if len(best) < k:
+                heapq.heappush(best, candidate)
+            elif candidate > best[0]:
+                heapq.heapreplace(best, candidate)
+
+        while pending:
+            bound, lo, hi = heapq.heappop(pending)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if hi - lo <= LEAF_SIZE:
+                for position in range(lo, hi):
+                    consider(position)
+                continue
+
+            mid = (lo + hi) // 2
+            consider(mid)
+            dim = split_dims[mid]
+            diff = query[dim] - coords[DIMENSIONS * mid + dim]
+            if diff < 0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+            if near[0] < near[1]:
+                heapq.heappush(pending, (bound, *near))
+            if far[0] < far[1]:
+                heapq.heappush(pending, (max(bound, abs(diff)), *far))
+
+        return sorted((-distance, -row) for distance, row in best)
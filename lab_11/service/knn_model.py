@@ -0,0 +1,163 @@
+"""
+kNN Model
+Everything a k-nearest-neighbours query needs, computed once per training set:
+per-feature mean and standard deviation, the standardized training points,
+their labels and (for large training sets) a KD-tree over the standardized points.
+
+Distances are measured between standardized points (z = (x - mean) / std), so
+every feature weighs the same whatever its unit; otherwise flipper length
+(about 200 mm) would dominate culmen depth (about 17 mm).
+"""
+import heapq
+import math
+import struct
+import sys
+from array import array
+
+from repository.running_stats import RunningStats
+from service.kd_tree import KdTree, DIMENSIONS
+
+LABEL_TYPECODE = 'I'
+
+
+class KnnModel:
+    # Binary dump: magic, byte order flag, point count, has KD-tree flag
+    DUMP_MAGIC = b'PKNN'
+    DUMP_HEADER = struct.Struct('<4sBQ?')
+
+    def __init__(self, columns: list, labels, dictionary: list, build_kd_tree: bool = True):
+        """
+        Build a model from raw training columns
+
+        Time Complexity: O(n log n) expected with the KD-tree, O(n) without
+        Space Complexity: O(n)
+
+        :param columns: DIMENSIONS equally long sequences of raw feature values
+        :param labels: label code of every training point
+        :param dictionary: label values indexed by code
+        :param build_kd_tree: True to index the standardized points with a KD-tree
+        """
+        self.__means = []
+        self.__stds = []
+        self.__columns = []
+        for column in columns:
+            stats = RunningStats.from_values(column)
+            mean = stats.get_mean()
+            # A constant feature keeps its scale instead of dividing by zero
+            std = stats.get_stddev(sample=False) or 1.0
+            self.__means.append(mean)
+            self.__stds.append(std)
+            self.__columns.append(array('d', ((x - mean) / std for x in column)))
+        self.__labels = array(LABEL_TYPECODE, labels)
+        self.__dictionary = list(dictionary)
+        self.__kd_tree = KdTree(self.__columns) if build_kd_tree else None
+
+    def __len__(self) -> int:
+        return len(self.__labels)
+
+    def get_means(self) -> tuple:
+        return tuple(self.__means)
+
+    def get_stds(self) -> tuple:
+        return tuple(self.__stds)
+
+    def get_columns(self) -> list:
+        """Standardized training columns (must not be modified)"""
+        return self.__columns
+
+    def get_label(self, row: int) -> str:
+        return self.__dictionary[self.__labels[row]]
+
+    def has_kd_tree(self) -> bool:
+        return self.__kd_tree is not None
+
+    def standardize(self, point: tuple) -> tuple:
+        """
+        Express a raw point in standard deviations from the training means
+        :param point: raw feature values
+        :return: standardized point
+        """
+        return tuple((x - mean) / std for x, mean, std in zip(point, self.__means, self.__stds))
+
+    def nearest(self, point: tuple, k: int) -> list:
+        """
+        Find the k training points nearest to a raw point in standardized space
+        Ties are broken by row, through the KD-tree as well as without it
+
+        Time Complexity: O(log n + k log k) typical with the KD-tree, O(n log k) without
+        Space Complexity: O(k)
+
+        :param point: raw feature values
+        :param k: number of neighbours
+        :return: list of (standardized distance, training row) ordered by distance then row
+        """
+        qx, qy, qz = self.standardize(point)
+        if self.__kd_tree is not None:
+            return self.__kd_tree.nearest((qx, qy, qz), k)
+        sqrt = math.sqrt
+        return heapq.nsmallest(k, ((sqrt((qx - x) * (qx - x) + (qy - y) * (qy - y) + (qz - z) * (qz - z)), row)
+                                   for row, (x, y, z) in enumerate(zip(*self.__columns))))
+
+    def dump(self, file):
+        """
+        Write the model to a binary file object
+        Layout: header, means and standard deviations, the standardized columns as
+        raw doubles, the label dictionary and codes, then the KD-tree if there is one
+        :param file: file opened in binary write mode
+        :return: -
+        """
+        file.write(self.DUMP_HEADER.pack(self.DUMP_MAGIC, sys.byteorder == 'little', len(self),
+                                         self.has_kd_tree()))
+        file.write(array('d', self.__means + self.__stds))
+        for column in self.__columns:
+            file.write(column)
+        file.write(struct.pack('<I', len(self.__dictionary)))
+        for value in self.__dictionary:
+            encoded = value.encode('utf-8')
+            file.write(struct.pack('<I', len(encoded)))
+            file.write(encoded)
+        file.write(self.__labels)
+        if self.__kd_tree is not None:
+            self.__kd_tree.dump(file)
+
+    @classmethod
+    def load(cls, file) -> 'KnnModel':
+        """
+        Read a model written by dump, ready for queries without any rebuilding
+        :param file: file opened in binary read mode, positioned at the dump
+        :return: KnnModel
+        :raises ValueError if the data is not a model dump or is truncated
+        """
+        header = file.read(cls.DUMP_HEADER.size)
+        if len(header) != cls.DUMP_HEADER.size:
+            raise ValueError("Truncated model dump")
+        magic, little_endian, size, has_kd_tree = cls.DUMP_HEADER.unpack(header)
+        if magic != cls.DUMP_MAGIC:
+            raise ValueError("Not a kNN model dump")
+        swap = bool(little_endian) != (sys.byteorder == 'little')
+
+        def read_array(typecode: str, count: int) -> array:
+            values = array(typecode)
+            try:
+                values.fromfile(file, count)
+            except EOFError:
+                raise ValueError("Truncated model dump")
+            if swap:
+                values.byteswap()
+            return values
+
+        def read_uint() -> int:
+            data = file.read(4)
+            if len(data) != 4:
+                raise ValueError("Truncated model dump")
+            return struct.unpack('<I', data)[0]
+
+        model = cls.__new__(cls)
+        scales = read_array('d', 2 * DIMENSIONS)
+        model.__means = list(scales[:DIMENSIONS])
+        model.__stds = list(scales[DIMENSIONS:])
+        model.__columns = [read_array('d', size) for _ in range(DIMENSIONS)]
+        model.__dictionary = [file.read(read_uint()).decode('utf-8') for _ in range(read_uint())]
+        model.__labels = read_array(LABEL_TYPECODE, size)
+        model.__kd_tree = KdTree.load(file) if has_kd_tree else None
+        return model
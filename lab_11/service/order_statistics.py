@@ -0,0 +1,99 @@
+"""
+Order Statistics
+Median and quartiles by quickselect instead of sorting the whole column
+"""
+import math
+
+# Parts this small are finished with one sort instead of more partitioning
+SMALL_PART_SIZE = 64
+
+
+def _pivot(values: list) -> float:
+    """Median of the first, middle and last value"""
+    a, b, c = values[0], values[len(values) // 2], values[-1]
+    if a > b:
+        a, b = b, a
+    if b > c:
+        b = c
+    return max(a, b)
+
+
+def select_ranks(values, ranks) -> dict:
+    """
+    Find the values that would be at several positions of the sorted sequence
+    Three-way quickselect: each partition step keeps only the parts that still
+    contain a wanted rank, so several ranks share the same partitioning work
+
+    Time Complexity: O(n) expected (O(n * r) worst case for r ranks with
+                     pathological pivots), no O(n log n) sort
+    Space Complexity: O(n) for the partitions
+
+    :param values: sequence of numbers (not modified)
+    :param ranks: 0-based positions in sorted order
+    :return: dictionary rank -> value
+    :raises IndexError if a rank is out of range
+    """
+    values = list(values)
+    result = {}
+    wanted = sorted(set(ranks))
+    if wanted and (wanted[0] < 0 or wanted[-1] >= len(values)):
+        raise IndexError("rank out of range")
+
+    # Work items: (part, wanted ranks inside part, rank of part[0] in the whole sequence)
+    stack = [(values, wanted, 0)] if wanted else []
+    while stack:
+        part, part_ranks, offset = stack.pop()
+        if len(part) <= SMALL_PART_SIZE:
+            ordered = sorted(part)
+            for r in part_ranks:
+                result[offset + r] = ordered[r]
+            continue
+        pivot = _pivot(part)
+        lows = [x for x in part if x < pivot]
+        highs = [x for x in part if x > pivot]
+        equal_end = len(part) - len(highs)
+
+        low_ranks = [r for r in part_ranks if r < len(lows)]
+        high_ranks = [r - equal_end for r in part_ranks if r >= equal_end]
+        for r in part_ranks:
+            if len(lows) <= r < equal_end:
+                result[offset + r] = pivot
+
+        if low_ranks:
+            stack.append((lows, low_ranks, offset))
+        if high_ranks:
+            stack.append((highs, high_ranks, offset + equal_end))
+    return result
+
+
+def quantiles(values, fractions, presorted: bool = False) -> list:
+    """
+    Quantiles with linear interpolation between the closest ranks
+    (position (n - 1) * q, the same definition as statistics.quantiles(method='inclusive'))
+
+    Time Complexity: O(n) expected
+    Space Complexity: O(n)
+
+    :param values: non-empty sequence of numbers
+    :param fractions: quantiles in [0, 1], e.g. [0.25, 0.5, 0.75]
+    :param presorted: True if values are already in ascending order (ranks are read directly)
+    :return: list of quantile values in the order of fractions
+    """
+    n = len(values)
+    positions = [(n - 1) * q for q in fractions]
+    ranks = set()
+    for position in positions:
+        ranks.add(math.floor(position))
+        ranks.add(min(math.floor(position) + 1, n - 1))
+    if presorted:
+        selected = {rank: values[rank] for rank in ranks}
+    else:
+        selected = select_ranks(values, ranks)
+
+    result = []
+    for position in positions:
+        below = math.floor(position)
+        above = min(below + 1, n - 1)
+        weight = position - below
+        result.append(selected[below] + (selected[above] - selected[below]) * weight)
+    return result
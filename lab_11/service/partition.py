@@ -0,0 +1,347 @@
+"""
+Partition
+Splits of items into two groups where every group holds at least MIN_GROUP_SIZE
+items and its total mass does not exceed a capacity.
+
+A split and its mirror image are the same split, so item 0 is always placed in
+the first group: every split is produced exactly once, with no duplicate check.
+Small inputs are enumerated depth-first with running group masses, cutting a
+branch as soon as one group is over capacity. From MEET_IN_THE_MIDDLE_THRESHOLD
+items on, the other items are split into two halves whose subset sums are
+enumerated separately (2^(n/2) each); the sums of the second half are sorted, so
+the partners of a first-half subset form one contiguous range found by bisection.
+
+balanced_split looks for the single split with the smallest mass difference
+instead: a subset-sum DP over whole grams with Python ints as bitsets, and
+Karmarkar-Karp differencing when the DP would not fit DP_BIT_BUDGET.
+"""
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import combinations
+
+MIN_GROUP_SIZE = 2
+# Item counts from which meet-in-the-middle replaces the depth-first search
+MEET_IN_THE_MIDDLE_THRESHOLD = 20
+# Largest item count iter_splits and count_splits accept: meet-in-the-middle keeps
+# 2^(n/2) subset sums per half, about 2 s and a few million entries at 40 items
+MAX_SPLIT_ITEMS = 40
+# Bits of DP state (one bitset per item, or per item and group size) kept for
+# rebuilding a balanced split; larger inputs use Karmarkar-Karp differencing
+DP_BIT_BUDGET = 1 << 28
+
+
+def _mask_to_split(mask: int, n: int) -> tuple:
+    """Turn a first-group bitmask into (first group indices, second group indices)"""
+    first = [i for i in range(n) if mask >> i & 1]
+    second = [i for i in range(n) if not mask >> i & 1]
+    return first, second
+
+
+def _depth_first_masks(masses: list, capacity: float):
+    """
+    First-group bitmasks of all valid splits, depth-first with item i going to
+    the first group before the second (the order of a plain recursive enumeration)
+    :param masses: item masses
+    :param capacity: maximum total mass of a group
+    :return: generator of bitmasks
+    """
+    n = len(masses)
+
+    def extend(index: int, mask: int, mass1: float, mass2: float, size1: int):
+        if mass1 > capacity or mass2 > capacity:
+            return
+        size2 = index - size1
+        remaining = n - index
+        if size1 + remaining < MIN_GROUP_SIZE or size2 + remaining < MIN_GROUP_SIZE:
+            return
+        if index == n:
+            yield mask
+            return
+        yield from extend(index + 1, mask | 1 << index, mass1 + masses[index], mass2, size1 + 1)
+        yield from extend(index + 1, mask, mass1, mass2 + masses[index], size1)
+
+    yield from extend(1, 1, masses[0], 0.0, 1)
+
+
+def _subset_sums(masses: list, first_index: int) -> tuple:
+    """
+    All subset sums of consecutive items
+    :param masses: masses of the items
+    :param first_index: index of masses[0] among all items (bit position in the masks)
+    :return: (sums, masks) - parallel lists over the 2^len(masses) subsets
+    """
+    sums = [0.0]
+    masks = [0]
+    for offset, mass in enumerate(masses):
+        bit = 1 << (first_index + offset)
+        sums += [total + mass for total in sums]
+        masks += [mask | bit for mask in masks]
+    return sums, masks
+
+
+def _halves(masses: list) -> tuple:
+    """
+    Subset sums of items 1..h and of items h+1..n-1, the second sorted by sum
+    :param masses: item masses
+    :return: (first sums, first masks, sorted second sums, second masks in the same order)
+    """
+    n = len(masses)
+    middle = 1 + (n - 1) // 2
+    first_sums, first_masks = _subset_sums(masses[1:middle], 1)
+    second_sums, second_masks = _subset_sums(masses[middle:], middle)
+    order = sorted(range(len(second_sums)), key=second_sums.__getitem__)
+    return first_sums, first_masks, [second_sums[i] for i in order], [second_masks[i] for i in order]
+
+
+def _meet_in_the_middle_masks(masses: list, capacity: float):
+    """
+    First-group bitmasks of all valid splits by meet-in-the-middle
+    The first group holds item 0 and a subset R of the rest with
+    total - capacity <= masses[0] + sum(R) <= capacity
+    :param masses: item masses
+    :param capacity: maximum total mass of a group
+    :return: generator of bitmasks, grouped by first-half subset
+    """
+    n = len(masses)
+    total = sum(masses)
+    low = total - capacity - masses[0]
+    high = capacity - masses[0]
+    first_sums, first_masks, second_sums, second_masks = _halves(masses)
+    for first_sum, first_mask in zip(first_sums, first_masks):
+        start = bisect_left(second_sums, low - first_sum)
+        stop = bisect_right(second_sums, high - first_sum)
+        for position in range(start, stop):
+            mask = 1 | first_mask | second_masks[position]
+            size1 = mask.bit_count()
+            if size1 >= MIN_GROUP_SIZE and n - size1 >= MIN_GROUP_SIZE:
+                yield mask
+
+
+def _check_item_count(n: int):
+    """
+    :raises ValueError if there are more than MAX_SPLIT_ITEMS items
+    """
+    if n > MAX_SPLIT_ITEMS:
+        raise ValueError(f"Cannot enumerate the splits of more than {MAX_SPLIT_ITEMS} items (got {n}); "
+                         f"use balanced_split for large colonies")
+
+
+def iter_splits(masses: list, capacity: float):
+    """
+    Stream every valid split once (item 0 always in the first group)
+
+    Time Complexity: O(2^n) worst case below MEET_IN_THE_MIDDLE_THRESHOLD items, with
+                     branches over capacity cut; O(2^(n/2) * n + s * n) for s splits above it
+    Space Complexity: O(n) below the threshold, O(2^(n/2)) for the half sums above it
+
+    :param masses: item masses (non-negative)
+    :param capacity: maximum total mass of a group
+    :return: generator of (first group indices, second group indices); depth-first
+             order below the threshold
+    :raises ValueError if there are more than MAX_SPLIT_ITEMS items (on the first next())
+    """
+    n = len(masses)
+    _check_item_count(n)
+    if n < 2 * MIN_GROUP_SIZE:
+        return
+    if n < MEET_IN_THE_MIDDLE_THRESHOLD:
+        masks = _depth_first_masks(masses, capacity)
+    else:
+        masks = _meet_in_the_middle_masks(masses, capacity)
+    for mask in masks:
+        yield _mask_to_split(mask, n)
+
+
+def count_splits(masses: list, capacity: float) -> int:
+    """
+    Count the valid splits without producing them
+    Above the threshold every first-half subset counts its partners with two
+    bisections; splits that leave a group with fewer than MIN_GROUP_SIZE items are
+    few (O(n) of them for groups of 2) and are subtracted afterwards
+
+    Time Complexity: O(2^n) worst case below MEET_IN_THE_MIDDLE_THRESHOLD items,
+                     O(2^(n/2) * n) above it
+    Space Complexity: O(n) below the threshold, O(2^(n/2)) above it
+
+    :param masses: item masses (non-negative)
+    :param capacity: maximum total mass of a group
+    :return: number of valid splits
+    :raises ValueError if there are more than MAX_SPLIT_ITEMS items
+    """
+    n = len(masses)
+    _check_item_count(n)
+    if n < 2 * MIN_GROUP_SIZE:
+        return 0
+    if n < MEET_IN_THE_MIDDLE_THRESHOLD:
+        return sum(1 for _ in _depth_first_masks(masses, capacity))
+
+    total = sum(masses)
+    low = total - capacity - masses[0]
+    high = capacity - masses[0]
+    first_sums, _, second_sums, _ = _halves(masses)
+    count = 0
+    for first_sum in first_sums:
+        count += bisect_right(second_sums, high - first_sum) - bisect_left(second_sums, low - first_sum)
+
+    # Remove the in-range subsets R that leave a group too small
+    rest = masses[1:]
+    small_sizes = set(range(MIN_GROUP_SIZE - 1)) | set(range(n - MIN_GROUP_SIZE, n))
+    for size in small_sizes:
+        for subset in combinations(rest, size):
+            if low <= sum(subset) <= high:
+                count -= 1
+    return count
+
+
+def _rebuild_subset(snapshots: list, units: list, total: int, count: int = None) -> list:
+    """
+    Walk the DP snapshots backwards to find items reaching a sum
+    Item i is used exactly when the sum (and size) was not reachable before it
+    :param snapshots: reachable-sum bitsets before each item (lists of them per size if count is given)
+    :param units: item weights in DP units
+    :param total: sum to reach
+    :param count: number of items to use, None if the size is free
+    :return: indices of the items used
+    """
+    subset = []
+    for i in range(len(units) - 1, -1, -1):
+        before = snapshots[i] if count is None else snapshots[i][count]
+        if not before >> total & 1:
+            subset.append(i)
+            total -= units[i]
+            if count is not None:
+                count -= 1
+    return subset
+
+
+def _subset_sum_split(units: list, min_size: int, budget: int):
+    """
+    Lightest-half subset closest to half the total: bitset DP where bit s of an
+    int says sum s is reachable, adding an item is reach | reach << weight
+    If the best subset leaves a group too small, a DP per subset size is run instead
+    :param units: integer item weights
+    :param min_size: minimum group size
+    :param budget: maximum number of DP bits to keep
+    :return: (subset indices, method) or None if the DP state would exceed the budget
+    """
+    n = len(units)
+    half = sum(units) // 2
+    if n * (half + 1) > budget:
+        return None
+    limit = (1 << (half + 1)) - 1
+
+    reach = 1
+    snapshots = []
+    for weight in units:
+        snapshots.append(reach)
+        reach = (reach | reach << weight) & limit
+    best = reach.bit_length() - 1
+    subset = _rebuild_subset(snapshots, units, best)
+    if min_size <= len(subset) <= n - min_size:
+        return subset, 'subset_sum_dp'
+
+    # by_size[c]: sums reachable with exactly c items
+    if n * (n + 1) * (half + 1) // 2 > budget:
+        return None
+    by_size = [1] + [0] * n
+    snapshots = []
+    for i, weight in enumerate(units):
+        snapshots.append(by_size.copy())
+        for size in range(i, -1, -1):
+            if by_size[size]:
+                by_size[size + 1] = (by_size[size + 1] | by_size[size] << weight) & limit
+    allowed = range(min_size, n - min_size + 1)
+    valid = 0
+    for size in allowed:
+        valid |= by_size[size]
+    best = valid.bit_length() - 1
+    size = next(size for size in allowed if by_size[size] >> best & 1)
+    return _rebuild_subset(snapshots, units, best, size), 'size_constrained_dp'
+
+
+def _karmarkar_karp(masses: list) -> list:
+    """
+    Largest differencing method: repeatedly replace the two heaviest items by their
+    difference, committing them to opposite groups; the commitments form a tree
+    that is two-coloured at the end
+    :param masses: item masses
+    :return: indices of one group
+    """
+    heap = [(-mass, i) for i, mass in enumerate(masses)]
+    heapq.heapify(heap)
+    opposite = [[] for _ in masses]
+    while len(heap) > 1:
+        heavier, a = heapq.heappop(heap)
+        lighter, b = heapq.heappop(heap)
+        opposite[a].append(b)
+        opposite[b].append(a)
+        heapq.heappush(heap, (heavier - lighter, a))
+
+    side = [None] * len(masses)
+    side[0] = 0
+    queue = deque([0])
+    while queue:
+        node = queue.popleft()
+        for other in opposite[node]:
+            if side[other] is None:
+                side[other] = 1 - side[node]
+                queue.append(other)
+    return [i for i, group in enumerate(side) if group == 0]
+
+
+def _enforce_min_size(masses: list, subset: list, min_size: int) -> list:
+    """
+    Move items into a group that is too small, each time the one that keeps the masses closest
+    :param masses: item masses
+    :param subset: indices of one group
+    :param min_size: minimum group size
+    :return: indices of the adjusted group
+    """
+    n = len(masses)
+    inside = set(subset)
+    total = sum(masses)
+    while len(inside) < min_size or n - len(inside) < min_size:
+        mass = sum(masses[i] for i in inside)
+        if len(inside) < min_size:
+            moved = min((i for i in range(n) if i not in inside),
+                        key=lambda i: abs(total - 2 * (mass + masses[i])))
+            inside.add(moved)
+        else:
+            moved = min(inside, key=lambda i: abs(total - 2 * (mass - masses[i])))
+            inside.remove(moved)
+    return sorted(inside)
+
+
+def balanced_split(masses: list, min_size: int = MIN_GROUP_SIZE, budget: int = DP_BIT_BUDGET) -> tuple:
+    """
+    Split items into two groups of at least min_size items with total masses as close as possible
+    Masses are rounded to whole grams and divided by their greatest common divisor
+    (e.g. 25 g steps), then an exact subset-sum DP over bitsets finds the best
+    lighter group. When the DP state would exceed the budget, Karmarkar-Karp
+    differencing gives a near-optimal split instead
+
+    Time Complexity: O(n * T / w) word operations for total T in DP units and word size w
+                     (O(n^2 * T / w) when sizes must be enforced by the DP); O(n log n) heuristic
+    Space Complexity: O(n * T) bits for rebuilding the subset, O(n) heuristic
+
+    :param masses: non-negative item masses
+    :param min_size: minimum number of items per group
+    :param budget: maximum number of DP bits to keep
+    :return: (first group indices, second group indices, method) with method
+             'subset_sum_dp' or 'size_constrained_dp' (optimal in whole grams) or 'karmarkar_karp'
+    :raises ValueError if there are fewer than 2 * min_size items
+    """
+    n = len(masses)
+    if n < 2 * min_size:
+        raise ValueError(f"Need at least {2 * min_size} items for two groups of {min_size}")
+    grams = [round(mass) for mass in masses]
+    step = math.gcd(*grams) or 1
+    result = _subset_sum_split([gram // step for gram in grams], min_size, budget)
+    if result is None:
+        subset, method = _enforce_min_size(masses, _karmarkar_karp(masses), min_size), 'karmarkar_karp'
+    else:
+        subset, method = result
+    inside = set(subset)
+    return sorted(inside), [i for i in range(n) if i not in inside], method
@@ -5,18 +5,40 @@ logic for penguin data operations including filter, describe, unique, sort, augm
 import random
 import time
 from datetime import datetime
+from itertools import combinations, islice
+from math import comb
 
 from domain.penguin import Penguin
 from domain.exceptions import (
     NoDataLoadedException, InvalidAttributeException, NonNumericAttributeException,
     InvalidSortOrderException, InvalidPercentageException, InvalidAugmentModeException,
-    EmptyDatasetException, InvalidFilterValueException
+    EmptyDatasetException, InvalidFilterValueException, InvalidAggregationException
 )
 from repository.penguin_repo import PenguinRepo
 from repository.penguin_repo_file import PenguinRepoFile
+from repository.penguin_table import PenguinTable
+from repository.running_stats import RunningStats
+from service.order_statistics import quantiles
+from service.partition import MAX_SPLIT_ITEMS, MIN_GROUP_SIZE, balanced_split, count_splits, iter_splits
+from service.quantile_sketch import DEFAULT_EPSILON, KllSketch
+from service.query import parse_query
+from service.sorting import DEFAULT_SORT_ALGORITHM, get_sort_algorithm
 
 
 class PenguinService:
+    # Number of penguins parsed per batch when loading a file
+    LOAD_CHUNK_SIZE = 10000
+    # Percentiles reported by describe_approximate
+    APPROXIMATE_PERCENTILES = (5, 25, 50, 75, 95)
+    # Aggregation functions accepted by group_by
+    AGGREGATIONS = ('count', 'sum', 'mean', 'min', 'max', 'std')
+    # Research groups enumerated at most when no limit is given
+    RESEARCH_GROUP_LIMIT = 10000
+    # Splits returned at most by split_into_groups when no limit is given
+    SPLIT_LIMIT = 10000
+    # Rows generated and written per batch by augment_to_file
+    AUGMENT_CHUNK_SIZE = 10000
+
     def __init__(self, penguin_repo: PenguinRepo, penguin_repo_file: PenguinRepoFile):
         self.__penguin_repo = penguin_repo
         self.__penguin_repo_file = penguin_repo_file
@@ -32,15 +54,48 @@ class PenguinService:
 
     def load_data(self, filename: str) -> int:
         """
-        Load data from a CSV file
+        Load data from a CSV file or a native columnar (.pcol) file
+        Columnar files are memory-mapped and served without copying.
+        If a CSV file was parsed before and has not changed, its columns are read
+        from the binary sidecar cache. Otherwise rows are streamed in chunks
+        straight into the repository (the whole file is never held as a list of
+        Penguin objects) and the sidecar is written for next time.
+        
+        Time Complexity: O(n) where n is the number of rows
+        Space Complexity: O(chunk size) on top of the repository storage
+        
         :param filename: filename to load
         :return: number of penguins loaded
+        :raises FileNotFoundException if file doesn't exist (repository is left untouched)
         """
-        penguins = self.__penguin_repo_file.load_from_file(filename)
-        self.__penguin_repo.clear()
-        self.__penguin_repo.add_all(penguins)
+        if self.__penguin_repo_file.is_columnar_file(filename):
+            table = self.__penguin_repo_file.open_columnar(filename)
+        else:
+            table = self.__penguin_repo_file.load_cached_table(filename)
+        if table is not None:
+            self.__penguin_repo.set_table(table)
+        else:
+            source_state = self.__penguin_repo_file.get_source_state(filename)
+            chunks = self.__penguin_repo_file.iter_penguins(filename, self.LOAD_CHUNK_SIZE)
+            self.__penguin_repo.clear()
+            for chunk in chunks:
+                self.__penguin_repo.add_all(chunk)
+            self.__penguin_repo_file.save_cached_table(filename, self.__penguin_repo.get_table(), source_state)
         self.__current_file = filename
-        return len(penguins)
+        return self.__penguin_repo.get_penguin_count()
+
+    def save_columnar(self, filename: str) -> int:
+        """
+        Save the loaded dataset in the native columnar format
+        :param filename: filename to save to ('.pcol' is appended if missing)
+        :return: number of penguins saved
+        :raises NoDataLoadedException if no data loaded
+        """
+        self._check_data_loaded()
+        if not self.__penguin_repo_file.is_columnar_file(filename):
+            filename += PenguinRepoFile.COLUMNAR_SUFFIX
+        self.__penguin_repo_file.save_columnar(filename, self.__penguin_repo.get_table())
+        return self.__penguin_repo.get_penguin_count()
 
     def get_loaded_penguins(self) -> list:
         """
@@ -76,6 +131,7 @@ class PenguinService:
         Filter penguins by attribute and value
         For numeric attributes: returns penguins where attribute > value
         For string attributes: returns penguins where attribute == value
+        The repository scans a single column instead of every Penguin object
         
         Time Complexity: O(n) where n is the number of penguins
         Space Complexity: O(k) where k is the number of matching penguins
@@ -101,6 +157,84 @@ class PenguinService:
         else:
             return self.__penguin_repo.get_penguins_by_filter(attribute, value, False)
 
+    def filter_matching(self, conditions: dict) -> list:
+        """
+        Filter penguins matching several string equalities at once
+        (e.g. {'species': 'Gentoo', 'island': 'Biscoe'})
+        Answered by AND-ing the bitmap indexes of the requested values
+
+        Time Complexity: O(c * n / 64 + k) where c is the number of conditions
+                         and k the number of matching penguins
+        Space Complexity: O(n / 8) bytes for the intermediate bitset plus O(k)
+
+        :param conditions: dictionary string attribute -> value
+        :return: list of matching penguins
+        :raises NoDataLoadedException if no data loaded
+        :raises InvalidAttributeException if an attribute doesn't exist
+        :raises InvalidFilterValueException if an attribute is numeric
+        """
+        self._check_data_loaded()
+        for attribute in conditions:
+            self._validate_attribute(attribute)
+            if self._is_numeric_attribute(attribute):
+                raise InvalidFilterValueException(attribute, "string attribute")
+        return self.__penguin_repo.get_penguins_matching(conditions)
+
+    def filter_range(self, attribute: str, low: str, high: str) -> list:
+        """
+        Filter penguins whose numeric attribute lies between two bounds (inclusive)
+        Answered by binary search on the attribute's sorted index
+
+        Time Complexity: O(log n + k log k) where k is the number of matching penguins
+                         (O(n log n) once to build the index after the data changes)
+        Space Complexity: O(k) where k is the number of matching penguins
+
+        :param attribute: numeric attribute to filter by
+        :param low: lower bound
+        :param high: upper bound
+        :return: list of matching penguins
+        :raises NoDataLoadedException if no data loaded
+        :raises InvalidAttributeException if attribute doesn't exist
+        :raises NonNumericAttributeException if attribute is not numeric
+        :raises InvalidFilterValueException if a bound is not a number
+        """
+        self._check_data_loaded()
+        self._validate_attribute(attribute)
+
+        if not self._is_numeric_attribute(attribute):
+            raise NonNumericAttributeException(attribute, "filter range")
+
+        bounds = []
+        for bound in (low, high):
+            try:
+                bounds.append(float(bound))
+            except ValueError:
+                raise InvalidFilterValueException(bound, "numeric")
+        return self.__penguin_repo.get_penguins_in_range(attribute, bounds[0], bounds[1])
+
+    def query_data(self, query: str) -> list:
+        """
+        Filter penguins with a query expression, e.g.
+        "species in (Adelie, Gentoo) and body_mass_g between 3500 and 4500 and not sex == MALE"
+        The expression is parsed into a plan (see service/query.py): AND nodes
+        fetch their most selective predicate from its index and test the other
+        predicates only on the surviving rows
+
+        Time Complexity: O(t + log n + k) per index lookup where t is the query length
+                         and k the number of rows that survive the first predicate
+        Space Complexity: O(k) where k is the number of matching penguins
+
+        :param query: filter expression
+        :return: list of matching penguins
+        :raises NoDataLoadedException if no data loaded
+        :raises InvalidQueryException if the expression is malformed
+        :raises InvalidAttributeException if it names an unknown attribute
+        :raises InvalidFilterValueException if a numeric attribute is compared to text
+        """
+        self._check_data_loaded()
+        plan = parse_query(query)
+        return self.__penguin_repo.get_penguins_by_rows(plan.rows(self.__penguin_repo))
+
     def save_filtered_data(self, penguins: list, filename: str):
         """
         Save filtered penguins to a file
@@ -113,8 +247,10 @@ class PenguinService:
     def describe_attribute(self, attribute: str) -> dict:
         """
         Calculate min, max, and mean for a numeric attribute
+        Read from the repository's running aggregates, which are updated as
+        penguins are added instead of rescanning the column on every call
         
-        Time Complexity: O(n) where n is the number of penguins
+        Time Complexity: O(1) (O(n) once after the data was replaced)
         Space Complexity: O(1) - only stores min, max, sum, count
         
         :param attribute: numeric attribute to describe
@@ -129,34 +265,173 @@ class PenguinService:
         if not self._is_numeric_attribute(attribute):
             raise NonNumericAttributeException(attribute, "describe")
 
-        values = self.__penguin_repo.get_attribute_values(attribute)
+        stats = self.__penguin_repo.get_aggregates(attribute)
         
-        if not values:
+        if not stats.get_count():
             raise EmptyDatasetException()
 
-        min_val = values[0]
-        max_val = values[0]
-        total = 0
+        return {
+            'min': stats.get_min(),
+            'max': stats.get_max(),
+            'mean': round(stats.get_mean(), 2)
+        }
 
-        for val in values:
-            if val < min_val:
-                min_val = val
-            if val > max_val:
-                max_val = val
-            total += val
+    def describe_all(self) -> dict:
+        """
+        Describe every numeric attribute: count, min, max, mean, std, q1, median, q3
+        count/min/max/mean/std come from the running aggregates. Quartiles are
+        found with one multi-rank quickselect per column (no full sort), or read
+        directly from the column's sorted index if a filter already built it
 
-        mean_val = total / len(values)
+        Time Complexity: O(a * n) expected where a is the number of numeric attributes
+        Space Complexity: O(n) for the quickselect partitions of one column
 
-        return {
-            'min': min_val,
-            'max': max_val,
-            'mean': round(mean_val, 2)
-        }
+        :return: dictionary attribute -> dictionary of statistics
+        :raises NoDataLoadedException if no data loaded
+        """
+        self._check_data_loaded()
+
+        result = {}
+        for attribute in Penguin.get_numeric_attributes():
+            stats = self.__penguin_repo.get_aggregates(attribute)
+            if self.__penguin_repo.has_sorted_index(attribute):
+                values = self.__penguin_repo.get_sorted_index(attribute).get_values()
+                q1, median, q3 = quantiles(values, [0.25, 0.5, 0.75], presorted=True)
+            else:
+                values = self.__penguin_repo.get_numeric_column(attribute)
+                q1, median, q3 = quantiles(values, [0.25, 0.5, 0.75])
+            result[attribute] = {
+                'count': stats.get_count(),
+                'min': stats.get_min(),
+                'max': stats.get_max(),
+                'mean': round(stats.get_mean(), 2),
+                'std': round(stats.get_stddev(), 2),
+                'q1': round(q1, 2),
+                'median': round(median, 2),
+                'q3': round(q3, 2),
+            }
+        return result
+
+    def describe_approximate(self, filename: str, epsilon: float = DEFAULT_EPSILON,
+                             seed: int = None) -> dict:
+        """
+        Describe every numeric attribute of a file without loading it
+        The file is streamed chunk by chunk. Each chunk gets its own quantile
+        sketch and running statistics, which are merged into the totals, so
+        memory stays bounded by the chunk size and the sketch size O(1 / epsilon).
+        count/min/max/mean/std are exact, percentiles are approximate: the rank of
+        each reported value is within epsilon * count of the requested rank
+        (with high probability)
+
+        Time Complexity: O(n log(1 / epsilon)) where n is the number of rows in the file
+        Space Complexity: O(chunk size + a / epsilon) for a numeric attributes
+
+        :param filename: CSV file in the data directory (the loaded data is not touched)
+        :param epsilon: rank error bound in (0, 1)
+        :param seed: seed of the generator seeding every sketch's coin flips (None for random)
+        :return: dictionary attribute -> dictionary of statistics ('p50' is the median)
+        :raises FileNotFoundException if file doesn't exist
+        :raises ValueError if epsilon is not in (0, 1)
+        :raises EmptyDatasetException if the file has no valid rows
+        """
+        attributes = Penguin.get_numeric_attributes()
+        # Every sketch gets its own seed drawn from one generator: identical coin
+        # flips in every chunk would line up the compaction errors across merges
+        rng = random.Random(seed)
+        sketches = {attr: KllSketch(epsilon, rng.getrandbits(64)) for attr in attributes}
+        totals = {attr: RunningStats() for attr in attributes}
+        getters = {attr: Penguin.get_attribute_getter(attr) for attr in attributes}
+
+        for chunk in self.__penguin_repo_file.iter_penguins(filename, self.LOAD_CHUNK_SIZE):
+            for attr in attributes:
+                values = list(map(getters[attr], chunk))
+                chunk_sketch = KllSketch(epsilon, rng.getrandbits(64))
+                chunk_sketch.update(values)
+                sketches[attr].merge(chunk_sketch)
+                totals[attr].update(values)
+
+        if totals[attributes[0]].get_count() == 0:
+            raise EmptyDatasetException()
+
+        result = {}
+        for attr in attributes:
+            stats = totals[attr]
+            described = {
+                'count': stats.get_count(),
+                'min': stats.get_min(),
+                'max': stats.get_max(),
+                'mean': round(stats.get_mean(), 2),
+                'std': round(stats.get_stddev(), 2),
+            }
+            for percentile in self.APPROXIMATE_PERCENTILES:
+                described[f'p{percentile}'] = sketches[attr].quantile(percentile / 100)
+            result[attr] = described
+        return result
+
+    # ==================== GROUP BY ====================
+    def group_by(self, keys: list, aggregations: dict) -> dict:
+        """
+        Aggregate numeric attributes per group, e.g. mean body mass per species per island:
+        group_by(['species', 'island'], {'body_mass_g': ['mean']})
+        Rows are grouped in one hash pass over the key columns, then every group
+        is summarized with RunningStats
+
+        Time Complexity: O(n * (c + a)) for c key attributes and a aggregated attributes
+        Space Complexity: O(n) for the row groups plus O(g * a) for g groups
+
+        :param keys: attributes to group by (string or numeric)
+        :param aggregations: dictionary numeric attribute -> list of functions from
+                             AGGREGATIONS (None or empty list for all of them)
+        :return: dictionary key tuple -> {attribute: {function: value}}, ordered by key
+        :raises NoDataLoadedException if no data loaded
+        :raises InvalidAttributeException if an attribute doesn't exist
+        :raises NonNumericAttributeException if an aggregated attribute is not numeric
+        :raises InvalidAggregationException if a function is unknown
+        """
+        self._check_data_loaded()
+        if not keys:
+            raise InvalidAttributeException("(none)", Penguin.get_all_attributes())
+        for key in keys:
+            self._validate_attribute(key)
+
+        functions = {}
+        for attribute, requested in aggregations.items():
+            self._validate_attribute(attribute)
+            if not self._is_numeric_attribute(attribute):
+                raise NonNumericAttributeException(attribute, "group_by")
+            for function in requested or []:
+                if function not in self.AGGREGATIONS:
+                    raise InvalidAggregationException(function, self.AGGREGATIONS)
+            functions[attribute] = list(requested or self.AGGREGATIONS)
+
+        groups = self.__penguin_repo.group_aggregates(keys, list(functions))
+        result = {}
+        for key in sorted(groups):
+            result[key] = {attribute: {function: self._aggregate(groups[key][attribute], function)
+                                       for function in attr_functions}
+                           for attribute, attr_functions in functions.items()}
+        return result
+
+    @staticmethod
+    def _aggregate(stats: RunningStats, function: str):
+        """Read one aggregation function from a group's running statistics"""
+        if function == 'count':
+            return stats.get_count()
+        if function == 'sum':
+            return stats.get_sum()
+        if function == 'mean':
+            return round(stats.get_mean(), 2)
+        if function == 'min':
+            return stats.get_min()
+        if function == 'max':
+            return stats.get_max()
+        return round(stats.get_stddev(), 2)
 
     # ==================== UNIQUE ====================
     def unique_values(self, attribute: str) -> dict:
         """
         Get unique values and their counts for an attribute
+        String attributes are counted on their dictionary codes
         
         Time Complexity: O(n) where n is the number of penguins
         Space Complexity: O(k) where k is the number of unique values
@@ -169,31 +444,26 @@ class PenguinService:
         self._check_data_loaded()
         self._validate_attribute(attribute)
 
-        values = self.__penguin_repo.get_attribute_values(attribute)
-        
-        counts = {}
-        for val in values:
-            if val in counts:
-                counts[val] += 1
-            else:
-                counts[val] = 1
-
-        return counts
+        return self.__penguin_repo.count_values(attribute)
 
     # ==================== SORT ====================
-    def sort_data(self, attribute: str, order: str) -> list:
+    def sort_data(self, attribute: str, order: str, algorithm: str = DEFAULT_SORT_ALGORITHM) -> list:
         """
-        Sort penguins by attribute using custom sorting algorithm
+        Sort penguins by attribute using a selectable sorting engine
+        Sort keys are read once from the attribute column, never during comparisons
         
-        Time Complexity: O(n^2) for Selection Sort
-        Space Complexity: O(1) in-place sorting
+        Time Complexity: O(n^2) for Selection Sort (default),
+                         O(n log n) for merge, heap, intro and timsort
+        Space Complexity: O(n) for the sorted copy and the precomputed keys
         
         :param attribute: attribute to sort by
         :param order: 'asc' or 'desc'
+        :param algorithm: sorting engine name (see service.sorting.SORT_ALGORITHMS)
         :return: sorted list of penguins
         :raises NoDataLoadedException if no data loaded
         :raises InvalidAttributeException if attribute doesn't exist
         :raises InvalidSortOrderException if order is invalid
+        :raises InvalidSortAlgorithmException if algorithm is unknown
         """
         self._check_data_loaded()
         self._validate_attribute(attribute)
@@ -202,42 +472,24 @@ class PenguinService:
         if order not in ['asc', 'desc']:
             raise InvalidSortOrderException(order)
 
-        penguins = self.__penguin_repo.get_all_penguins().copy()
+        algorithm_name, sort_engine = get_sort_algorithm(algorithm)
+
+        penguins = self.__penguin_repo.get_all_penguins()
         n = len(penguins)
 
         # Measure execution time
-        start_time = time.time()
-
-        # Selection Sort
-        for i in range(n - 1):
-            # Find the min/max element in remaining unsorted portion
-            extreme_idx = i
-            extreme_value = penguins[i].get_attribute(attribute)
-
-            for j in range(i + 1, n):
-                current_value = penguins[j].get_attribute(attribute)
-                if order == 'asc':
-                    if current_value < extreme_value:
-                        extreme_idx = j
-                        extreme_value = current_value
-                else: 
-                    if current_value > extreme_value:
-                        extreme_idx = j
-                        extreme_value = current_value
-
-            # Swap if needed
-            if extreme_idx != i:
-                penguins[i], penguins[extreme_idx] = penguins[extreme_idx], penguins[i]
-
-        execution_time = time.time() - start_time
+        start_time = time.perf_counter()
+        keys = self.__penguin_repo.get_attribute_values(attribute)
+        sorted_penguins = sort_engine(penguins, keys, order == 'desc')
+        execution_time = time.perf_counter() - start_time
 
         # Log performance
-        self._log_sort_performance(n, "SelectionSort", execution_time)
+        self._log_sort_performance(n, algorithm_name, execution_time)
 
         # Update repository with sorted data
-        self.__penguin_repo.set_penguins(penguins)
+        self.__penguin_repo.set_penguins(sorted_penguins)
 
-        return penguins
+        return sorted_penguins
 
     def _log_sort_performance(self, num_rows: int, algorithm: str, execution_time: float):
         """
@@ -262,18 +514,7 @@ class PenguinService:
         :raises InvalidPercentageException if percent is invalid
         :raises InvalidAugmentModeException if mode is invalid
         """
-        self._check_data_loaded()
-
-        try:
-            percent = float(percent)
-            if percent <= 0:
-                raise ValueError()
-        except ValueError:
-            raise InvalidPercentageException(percent)
-
-        mode = mode.lower()
-        if mode not in ['duplicate', 'create']:
-            raise InvalidAugmentModeException(mode)
+        percent, mode = self._validate_augment(percent, mode)
 
         penguins = self.__penguin_repo.get_all_penguins()
         original_count = len(penguins)
@@ -293,6 +534,128 @@ class PenguinService:
         filename = f"augmented_{mode}_{int(percent)}pct_{len(new_penguins)}.csv"
         return new_penguins, filename
 
+    def _validate_augment(self, percent, mode: str) -> tuple:
+        """
+        Check the arguments of an augmentation
+        :return: tuple (percent as float, lower-case mode)
+        :raises NoDataLoadedException if no data loaded
+        :raises InvalidPercentageException if percent is invalid
+        :raises InvalidAugmentModeException if mode is invalid
+        """
+        self._check_data_loaded()
+
+        try:
+            percent = float(percent)
+            if percent <= 0:
+                raise ValueError()
+        except ValueError:
+            raise InvalidPercentageException(percent)
+
+        mode = mode.lower()
+        if mode not in ['duplicate', 'create']:
+            raise InvalidAugmentModeException(mode)
+        return percent, mode
+
+    def augment_to_file(self, percent: float, mode: str, filename: str = None, seed: int = None,
+                        chunk_size: int = AUGMENT_CHUNK_SIZE) -> dict:
+        """
+        Increase dataset size by percentage, writing the result straight to a file
+        Rows are generated column-wise from the loaded table and written chunk by
+        chunk (CSV, or the columnar format for '.pcol' names), so no Penguin
+        objects are built and memory does not grow with the output. Random draws
+        are made row by row from one seeded generator: the same seed gives the
+        same file whatever the chunk size or format
+        
+        Time Complexity: O(n + a) for n loaded and a added rows
+        Space Complexity: O(chunk_size)
+        
+        :param percent: percentage to increase by
+        :param mode: 'duplicate' or 'create'
+        :param filename: file to write (default: the name augment_data suggests)
+        :param seed: seed of the random generator (None for a random seed, reported back)
+        :param chunk_size: rows per written batch
+        :return: report with filename, rows written, rows added, seed and elapsed seconds
+        :raises NoDataLoadedException if no data loaded
+        :raises InvalidPercentageException if percent is invalid
+        :raises InvalidAugmentModeException if mode is invalid
+        :raises ValueError if chunk_size is not positive
+        """
+        percent, mode = self._validate_augment(percent, mode)
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+
+        table = self.__penguin_repo.get_table()
+        added = int(len(table) * percent / 100)
+        total = len(table) + added
+        if filename is None:
+            filename = f"augmented_{mode}_{int(percent)}pct_{total}.csv"
+        dictionaries = {attr: table.get_dictionary(attr) for attr in Penguin.get_string_attributes()}
+
+        started = time.perf_counter()
+        chunks = self._augmented_chunks(mode, added, random.Random(seed), chunk_size)
+        if self.__penguin_repo_file.is_columnar_file(filename):
+            typecodes = {attr: (PenguinTable.CODE_TYPECODE if len(dictionaries[attr]) <= 256
+                                else PenguinTable.WIDE_CODE_TYPECODE)
+                         if attr in dictionaries else PenguinTable.NUMERIC_TYPECODE
+                         for attr in Penguin.get_all_attributes()}
+            self.__penguin_repo_file.save_columnar_chunks(filename, total, typecodes, dictionaries, chunks)
+        else:
+            row_chunks = (list(zip(*([dictionaries[attr][code] for code in columns[attr]]
+                                     if attr in dictionaries else columns[attr]
+                                     for attr in Penguin.get_all_attributes())))
+                          for columns in chunks)
+            self.__penguin_repo_file.save_rows(filename, Penguin.get_all_attributes(), row_chunks)
+        return {
+            'filename': filename,
+            'rows': total,
+            'added': added,
+            'seed': seed,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _augmented_chunks(self, mode: str, added: int, rng: random.Random, chunk_size: int):
+        """
+        Generate the columns of the augmented dataset: the loaded rows, then the added ones
+        Strings are handled as dictionary codes; 'create' draws every string uniformly
+        among the distinct values and every number uniformly between the column
+        min and max (rounded to 1 decimal), like augment_data
+        :param mode: 'duplicate' or 'create'
+        :param added: number of rows to add
+        :param rng: random generator
+        :param chunk_size: rows per chunk
+        :return: generator of dicts attribute -> column values (numbers or codes)
+        """
+        table = self.__penguin_repo.get_table()
+        columns = {attr: table.get_codes(attr) if attr in Penguin.get_string_attributes()
+                   else table.get_numeric_column(attr)
+                   for attr in Penguin.get_all_attributes()}
+        size = len(table)
+        for start in range(0, size, chunk_size):
+            yield {attr: column[start:start + chunk_size] for attr, column in columns.items()}
+
+        if mode == 'duplicate':
+            for start in range(0, added, chunk_size):
+                rows = [rng.randrange(size) for _ in range(min(chunk_size, added - start))]
+                yield {attr: [column[row] for row in rows] for attr, column in columns.items()}
+            return
+
+        # Same draw order as _generate_random_penguins: species, island, sex, then the numbers
+        string_counts = [(attr, len(table.get_dictionary(attr))) for attr in ('species', 'island', 'sex')]
+        ranges = []
+        for attr in ('flipper_length_mm', 'culmen_length_mm', 'culmen_depth_mm', 'body_mass_g'):
+            stats = self.__penguin_repo.get_aggregates(attr)
+            ranges.append((attr, stats.get_min(), stats.get_max()))
+        for start in range(0, added, chunk_size):
+            chunk = {attr: [] for attr in columns}
+            for _ in range(min(chunk_size, added - start)):
+                for attr, count in string_counts:
+                    chunk[attr].append(rng.randrange(count))
+                for attr, low, high in ranges:
+                    chunk[attr].append(round(rng.uniform(low, high), 1))
+            yield chunk
+
     def _generate_random_penguins(self, existing: list, count: int) -> list:
         """
         Generate new penguins using values from existing data
@@ -369,129 +732,235 @@ class PenguinService:
         return selected
 
     # ==================== GENERATE RESEARCH GROUPS ====================
-    def generate_research_groups(self, k: int) -> list:
+    def iter_research_groups(self, k: int, limit: int = RESEARCH_GROUP_LIMIT):
         """
-        Generate all possible research groups of size k with at least one penguin from each species
-        Requires at most 10 penguins in loaded dataset
+        Lazily generate research groups of size k with at least one penguin from each species
+        Penguins are chosen in dataset order; a branch is cut as soon as the species
+        still missing cannot all be found among the remaining penguins or do not fit
+        in the remaining slots, so every branch explored ends in at least one group
         
-        Time Complexity: O(C(n,k)) where C(n,k) is n choose k combinations
-        Space Complexity: O(C(n,k) * k) for storing all valid groups
+        Time Complexity: O(g * k) for g generated groups (output-sensitive), O(n) setup
+        Space Complexity: O(n + k) - groups are produced one at a time
         
         :param k: size of research groups (must be >= 3)
-        :return: list of valid research groups (each group is a list of penguins)
-        :raises NoDataLoadedException if no data loaded
+        :param limit: maximum number of groups to generate (None for no limit)
+        :return: generator of valid research groups (each group is a list of penguins)
+        :raises NoDataLoadedException if no data loaded (raised immediately, not on first next())
         :raises ValueError if constraints not met
         """
         self._check_data_loaded()
         
         penguins = self.__penguin_repo.get_all_penguins()
         
-        if len(penguins) > 10:
-            raise ValueError(f"Dataset must contain at most 10 penguins (current: {len(penguins)})")
-        
         if k < 3:
             raise ValueError("Group size k must be at least 3")
         
         if k > len(penguins):
             raise ValueError(f"k ({k}) cannot be greater than the number of penguins ({len(penguins)})")
         
-        # Get unique species in the dataset
-        species_in_data = set(p.get_species() for p in penguins)
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
         
-        if len(species_in_data) < 1:
-            raise ValueError("No species found in dataset")
+        return islice(self._research_groups(penguins, k), limit)
+
+    @staticmethod
+    def _research_groups(penguins: list, k: int):
+        """
+        Generator behind iter_research_groups
+        Species are bits of a mask; suffix[i] holds the species among penguins[i:]
+        :param penguins: penguins to choose from
+        :param k: group size
+        :return: generator of groups
+        """
+        species_bits = {}
+        bits = [1 << species_bits.setdefault(p.get_species(), len(species_bits)) for p in penguins]
+        n = len(penguins)
+        everyone = (1 << len(species_bits)) - 1
+        suffix = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            suffix[i] = suffix[i + 1] | bits[i]
+        group = []
+
+        def extend(start: int, covered: int):
+            slots = k - len(group)
+            if slots == 0:
+                yield [penguins[i] for i in group]
+                return
+            missing = everyone & ~covered
+            for i in range(start, n - slots + 1):
+                if missing & ~suffix[i]:
+                    # A missing species no longer occurs from here on
+                    break
+                still_missing = missing & ~bits[i]
+                if still_missing.bit_count() > slots - 1 or still_missing & ~suffix[i + 1]:
+                    continue
+                group.append(i)
+                yield from extend(i + 1, covered | bits[i])
+                group.pop()
+
+        yield from extend(0, 0)
+
+    def generate_research_groups(self, k: int, limit: int = RESEARCH_GROUP_LIMIT) -> list:
+        """
+        Generate research groups of size k with at least one penguin from each species
+        The dataset size is not limited; the number of groups returned is
         
-        # Generate all combinations of size k
-        valid_groups = []
+        Time Complexity: O(g * k) for g returned groups, see iter_research_groups
+        Space Complexity: O(g * k) for storing the groups
         
-        def generate_combinations(start: int, current_group: list):
-            """Recursively generate combinations"""
-            if len(current_group) == k:
-                # Check if group has at least one penguin from each species present in data
-                group_species = set(p.get_species() for p in current_group)
-                if len(group_species) >= min(3, len(species_in_data)) and len(group_species) == len(species_in_data):
-                    valid_groups.append(current_group.copy())
-                return
-            
-            for i in range(start, len(penguins)):
-                current_group.append(penguins[i])
-                generate_combinations(i + 1, current_group)
-                current_group.pop()
+        :param k: size of research groups (must be >= 3)
+        :param limit: maximum number of groups (None for no limit)
+        :return: list of valid research groups (each group is a list of penguins)
+        :raises NoDataLoadedException if no data loaded
+        :raises ValueError if constraints not met
+        """
+        return list(self.iter_research_groups(k, limit))
+
+    def count_research_groups(self, k: int) -> int:
+        """
+        Count the research groups of size k with at least one penguin from each species
+        without generating them, by inclusion-exclusion over the species:
+        sum over species subsets S of (-1)^|S| * C(n - penguins of S, k)
+        
+        Time Complexity: O(2^s * s) for s species, plus O(s * n / 64) to count them
+                         from the species bitmaps - independent of the number of groups
+        Space Complexity: O(s)
+        
+        :param k: size of research groups (must be >= 3)
+        :return: number of valid research groups, equal to the number generate_research_groups
+                 yields without a limit
+        :raises NoDataLoadedException if no data loaded
+        :raises ValueError if constraints not met
+        """
+        self._check_data_loaded()
         
-        generate_combinations(0, [])
+        n = self.__penguin_repo.get_penguin_count()
         
-        return valid_groups
+        if k < 3:
+            raise ValueError("Group size k must be at least 3")
+        
+        if k > n:
+            raise ValueError(f"k ({k}) cannot be greater than the number of penguins ({n})")
+        
+        species_counts = [count for count in self.__penguin_repo.count_values('species').values() if count]
+        total = 0
+        for size in range(len(species_counts) + 1):
+            sign = -1 if size % 2 else 1
+            for excluded in combinations(species_counts, size):
+                total += sign * comb(n - sum(excluded), k)
+        return total
 
     # ==================== SPLIT INTO GROUPS ====================
-    def split_into_groups(self, body_mass_threshold: float) -> list:
+    def _split_masses(self) -> list:
+        """
+        Get the body masses to split, checking there are enough penguins
+        :return: body mass column
+        :raises NoDataLoadedException if no data loaded
+        :raises ValueError if there are fewer than 4 or more than MAX_SPLIT_ITEMS penguins
+        """
+        self._check_data_loaded()
+        n = self.__penguin_repo.get_penguin_count()
+        if n < 2 * MIN_GROUP_SIZE:
+            raise ValueError(f"Need at least 4 penguins to split into two groups of 2 (current: {n})")
+        if n > MAX_SPLIT_ITEMS:
+            raise ValueError(f"Too many penguins to enumerate splits (current: {n}, maximum: "
+                             f"{MAX_SPLIT_ITEMS}); use balanced_split for large colonies")
+        return list(self.__penguin_repo.get_numeric_column('body_mass_g'))
+
+    def iter_splits(self, body_mass_threshold: float):
         """
-        Generate all possible ways to split penguins into two groups such that:
+        Stream the ways to split penguins into two groups such that:
         - Each group has at least 2 penguins
         - Total body mass of each group does not exceed threshold
-        Requires at most 10 penguins in loaded dataset
+        Every split is produced once; the first penguin is always in the first group
+        
+        Time Complexity: O(2^n) worst case with pruning up to 20 penguins,
+                         O(2^(n/2) * n + s * n) for s splits above (meet-in-the-middle)
+        Space Complexity: O(n) up to 20 penguins, O(2^(n/2)) above
         
-        Time Complexity: O(2^n) for generating all possible splits
-        Space Complexity: O(2^n) for storing all valid splits
+        :param body_mass_threshold: maximum total body mass for each group
+        :return: generator of splits (tuples of two lists of penguins)
+        :raises NoDataLoadedException if no data loaded (raised immediately, not on first next())
+        :raises ValueError if there are fewer than 4 or more than MAX_SPLIT_ITEMS penguins
+        """
+        masses = self._split_masses()
+        penguins = self.__penguin_repo.get_all_penguins()
+        return (([penguins[i] for i in first], [penguins[i] for i in second])
+                for first, second in iter_splits(masses, body_mass_threshold))
+
+    def count_splits(self, body_mass_threshold: float) -> int:
+        """
+        Count the splits split_into_groups would produce without a limit
+        
+        Time Complexity: O(2^n) worst case with pruning up to 20 penguins,
+                         O(2^(n/2) * n) above (meet-in-the-middle)
+        Space Complexity: O(n) up to 20 penguins, O(2^(n/2)) above
         
         :param body_mass_threshold: maximum total body mass for each group
+        :return: number of valid splits
+        :raises NoDataLoadedException if no data loaded
+        :raises ValueError if there are fewer than 4 or more than MAX_SPLIT_ITEMS penguins
+        """
+        return count_splits(self._split_masses(), body_mass_threshold)
+
+    def split_into_groups(self, body_mass_threshold: float, limit: int = SPLIT_LIMIT) -> list:
+        """
+        Generate the ways to split penguins into two groups such that:
+        - Each group has at least 2 penguins
+        - Total body mass of each group does not exceed threshold
+        The dataset size is not limited; the number of splits returned is
+        
+        Time Complexity: see iter_splits
+        Space Complexity: O(s * n) for storing s splits
+        
+        :param body_mass_threshold: maximum total body mass for each group
+        :param limit: maximum number of splits (None for no limit)
         :return: list of valid splits (each split is a tuple of two groups)
         :raises NoDataLoadedException if no data loaded
         :raises ValueError if constraints not met
         """
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+        return list(islice(self.iter_splits(body_mass_threshold), limit))
+
+    def balanced_split(self, min_size: int = MIN_GROUP_SIZE) -> dict:
+        """
+        Find the split into two groups with the smallest body mass difference
+        Exact (in whole grams) through a bitset subset-sum DP; colonies whose DP
+        would not fit in memory get a Karmarkar-Karp heuristic split
+
+        Time Complexity: O(n * M / w) for total mass M in gram steps and word size w,
+                         O(n log n) for the heuristic
+        Space Complexity: O(n * M) bits, O(n) for the heuristic
+
+        :param min_size: minimum number of penguins per group
+        :return: report with both groups, their masses, the imbalance, the method,
+                 whether the split is optimal and the solve time in seconds
+        :raises NoDataLoadedException if no data loaded
+        :raises ValueError if min_size < 1 or there are fewer than 2 * min_size penguins
+        """
+        if min_size < 1:
+            raise ValueError("min_size must be at least 1")
         self._check_data_loaded()
-        
+        n = self.__penguin_repo.get_penguin_count()
+        if n < 2 * min_size:
+            raise ValueError(f"Need at least {2 * min_size} penguins to split into two groups of "
+                             f"{min_size} (current: {n})")
+        masses = list(self.__penguin_repo.get_numeric_column('body_mass_g'))
         penguins = self.__penguin_repo.get_all_penguins()
-        n = len(penguins)
-        
-        if n > 10:
-            raise ValueError(f"Dataset must contain at most 10 penguins (current: {n})")
-        
-        if n < 4:
-            raise ValueError(f"Need at least 4 penguins to split into two groups of 2 (current: {n})")
-        
-        valid_splits = []
-        
-        def get_group_mass(group: list) -> float:
-            """Calculate total body mass of a group"""
-            return sum(p.get_body_mass_g() for p in group)
-        
-        def generate_splits(index: int, group1: list, group2: list):
-            """Recursively generate all possible splits"""
-            if index == n:
-                # Check constraints
-                if len(group1) >= 2 and len(group2) >= 2:
-                    mass1 = get_group_mass(group1)
-                    mass2 = get_group_mass(group2)
-                    if mass1 <= body_mass_threshold and mass2 <= body_mass_threshold:
-                        # Store as tuple of lists
-                        valid_splits.append((group1.copy(), group2.copy()))
-                return
-            
-            # Try adding current penguin to group1
-            group1.append(penguins[index])
-            generate_splits(index + 1, group1, group2)
-            group1.pop()
-            
-            # Try adding current penguin to group2
-            group2.append(penguins[index])
-            generate_splits(index + 1, group1, group2)
-            group2.pop()
-        
-        generate_splits(0, [], [])
-        
-        # Remove duplicate splits (group1, group2) and (group2, group1) are the same
-        unique_splits = []
-        seen = set()
-        for g1, g2 in valid_splits:
-            # Create a hashable representation
-            key1 = tuple(sorted(id(p) for p in g1))
-            key2 = tuple(sorted(id(p) for p in g2))
-            normalized_key = tuple(sorted([key1, key2]))
-            if normalized_key not in seen:
-                seen.add(normalized_key)
-                unique_splits.append((g1, g2))
-        
-        return unique_splits
+        start = time.perf_counter()
+        first, second, method = balanced_split(masses, min_size)
+        seconds = time.perf_counter() - start
+        first_mass = sum(masses[i] for i in first)
+        second_mass = sum(masses[i] for i in second)
+        return {
+            'groups': ([penguins[i] for i in first], [penguins[i] for i in second]),
+            'masses': (first_mass, second_mass),
+            'imbalance': abs(first_mass - second_mass),
+            'method': method,
+            'optimal': method != 'karmarkar_karp',
+            'seconds': seconds,
+        }
 
     # ==================== PREPROCESS ====================
     def preprocess_data(self, input_file: str, output_file: str) -> int:
@@ -502,3 +971,14 @@ class PenguinService:
         :return: number of valid rows
         """
         return self.__penguin_repo_file.preprocess_raw_data(input_file, output_file)
+
+    def preprocess_data_parallel(self, input_file: str, output_file: str, workers: int = None) -> dict:
+        """
+        Preprocess raw data file with a pool of worker processes
+        Output is identical to preprocess_data
+        :param input_file: raw input filename
+        :param output_file: cleaned output filename
+        :param workers: number of worker processes (default: number of CPUs)
+        :return: report with total rows, rejected rows, elapsed seconds and per-chunk details
+        """
+        return self.__penguin_repo_file.preprocess_raw_data_parallel(input_file, output_file, workers)
@@ -0,0 +1,188 @@
+"""
+Quantile Sketch
+KLL sketch (Karnin, Lang, Liberty 2016) for approximate quantiles of a stream
+in bounded memory.
+
+Values are kept in a stack of compactors. Level h holds items that each stand
+for 2^h original values. When a level is full it is sorted and every other
+item (starting at a random offset) is promoted to the next level, which halves
+the memory while moving each rank by at most 2^h. Lower levels get
+geometrically smaller capacities, so the sketch keeps O(k) items in total.
+
+Two sketches built from different parts of the data merge by concatenating
+their levels and compacting again, so chunks can be sketched independently
+(e.g. by parallel workers) and combined afterwards.
+"""
+import math
+import random
+
+DEFAULT_EPSILON = 0.01
+# Capacity of the top compactor per unit of 1 / epsilon, chosen so the observed
+# normalized rank error stays well inside epsilon (see tests)
+K_PER_EPSILON = 2.0
+# Capacity ratio between a level and the one above it
+CAPACITY_DECAY = 2 / 3
+MIN_CAPACITY = 2
+MIN_K = 8
+
+
+class KllSketch:
+    def __init__(self, epsilon: float = DEFAULT_EPSILON, seed: int = None):
+        """
+        Create an empty sketch
+        :param epsilon: target normalized rank error (0.01 = quantiles within 1% of the ranks)
+        :param seed: seed of the compaction coin flips (None for a random seed)
+        :raises ValueError if epsilon is not in (0, 1)
+        """
+        if not 0 < epsilon < 1:
+            raise ValueError(f"epsilon must be between 0 and 1, got {epsilon}")
+        self.__epsilon = epsilon
+        self.__k = max(MIN_K, math.ceil(K_PER_EPSILON / epsilon))
+        self.__levels = [[]]
+        self.__count = 0
+        self.__minimum = math.inf
+        self.__maximum = -math.inf
+        self.__rng = random.Random(seed)
+        # Sorted (value, cumulative weight) pairs, rebuilt after changes
+        self.__view = None
+
+    def get_epsilon(self) -> float:
+        return self.__epsilon
+
+    def get_count(self) -> int:
+        """Number of values seen"""
+        return self.__count
+
+    def get_min(self) -> float:
+        return self.__minimum
+
+    def get_max(self) -> float:
+        return self.__maximum
+
+    def get_retained(self) -> int:
+        """Number of values stored (the memory footprint), O(k) independent of get_count"""
+        return sum(len(level) for level in self.__levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.__levels) - level - 1
+        return max(MIN_CAPACITY, math.ceil(self.__k * CAPACITY_DECAY ** depth))
+
+    def _max_retained(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.__levels)))
+
+    def update(self, values):
+        """
+        Add a chunk of values
+
+        Time Complexity: O(m log k) amortized where m is the number of new values
+        Space Complexity: O(k) after compaction
+
+        :param values: numbers to add
+        :return: -
+        """
+        if not len(values):
+            return
+        self.__levels[0].extend(values)
+        self.__count += len(values)
+        self.__minimum = min(self.__minimum, min(values))
+        self.__maximum = max(self.__maximum, max(values))
+        self._compress()
+
+    def merge(self, other: 'KllSketch'):
+        """
+        Add all values summarized by another sketch
+
+        Time Complexity: O(k log k)
+        Space Complexity: O(k)
+
+        :param other: sketch of other values
+        :return: -
+        """
+        if other.__count == 0:
+            return
+        while len(self.__levels) < len(other.__levels):
+            self.__levels.append([])
+        for level, items in enumerate(other.__levels):
+            self.__levels[level].extend(items)
+        self.__count += other.__count
+        self.__minimum = min(self.__minimum, other.__minimum)
+        self.__maximum = max(self.__maximum, other.__maximum)
+        self._compress()
+
+    def _compress(self):
+        """Compact full levels (lowest first) until the sketch fits its capacity"""
+        self.__view = None
+        while self.get_retained() > self._max_retained():
+            for level, items in enumerate(self.__levels):
+                if len(items) >= self._capacity(level):
+                    break
+            if level + 1 == len(self.__levels):
+                self.__levels.append([])
+            items.sort()
+            # An odd item out stays behind so the promoted half has exactly half the weight
+            kept = [items.pop()] if len(items) % 2 else []
+            self.__levels[level + 1].extend(items[self.__rng.randrange(2)::2])
+            self.__levels[level] = kept
+
+    def _sorted_view(self) -> list:
+        if self.__view is None:
+            weighted = sorted((value, 1 << level)
+                              for level, items in enumerate(self.__levels) for value in items)
+            view = []
+            total = 0
+            for value, weight in weighted:
+                total += weight
+                view.append((value, total))
+            self.__view = view
+        return self.__view
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Approximate quantile: a value whose rank is within epsilon * count of fraction * count
+        (with high probability)
+
+        Time Complexity: O(k log k) for the first query after a change, O(k) afterwards
+        Space Complexity: O(k)
+
+        :param fraction: quantile in [0, 1]
+        :return: value
+        :raises ValueError if the sketch is empty or fraction is out of range
+        """
+        if self.__count == 0:
+            raise ValueError("quantile of an empty sketch")
+        if not 0 <= fraction <= 1:
+            raise ValueError(f"fraction must be between 0 and 1, got {fraction}")
+        if fraction == 0:
+            return self.__minimum
+        if fraction == 1:
+            return self.__maximum
+        view = self._sorted_view()
+        target = fraction * view[-1][1]
+        for value, cumulative in view:
+            if cumulative >= target:
+                return value
+        return self.__maximum
+
+    def quantiles(self, fractions) -> list:
+        """
+        Approximate quantiles for several fractions
+        :param fractions: quantiles in [0, 1]
+        :return: list of values in the order of fractions
+        """
+        return [self.quantile(fraction) for fraction in fractions]
+
+    def rank(self, value: float) -> float:
+        """
+        Approximate normalized rank: fraction of values <= value
+        :param value: value to rank
+        :return: fraction in [0, 1]
+        """
+        if self.__count == 0:
+            return 0.0
+        view = self._sorted_view()
+        below = 0
+        for item, cumulative in view:
+            if item > value:
+                break
+            below = cumulative
+        return below / view[-1][1]
@@ -0,0 +1,385 @@
+"""
+Filter Query Language
+Parses filter expressions such as
+
+    species == Gentoo and (body_mass_g between 4000 and 5000 or sex != MALE)
+    island in (Biscoe, Dream) and not flipper_length_mm < 190
+
+into a tree of plan nodes that run against the repository indexes.
+
+Grammar (keywords are case-insensitive):
+    expression := term ('or' term)*
+    term       := factor ('and' factor)*
+    factor     := 'not' factor | '(' expression ')' | predicate
+    predicate  := attribute op value
+                | attribute ['not'] 'between' value 'and' value
+                | attribute ['not'] 'in' '(' value (',' value)* ')'
+    op         := '<' | '<=' | '>' | '>=' | '==' | '=' | '!='
+    value      := number | word | 'quoted text' | "quoted text"
+
+Every node can estimate how many rows it matches from the indexes alone
+(bisect on a sorted index, popcount on a bitmap). An AND node fetches the rows
+of its most selective child from that child's index and only tests the other
+children on those surviving rows.
+"""
+import math
+import operator
+import re
+from abc import ABC, abstractmethod
+from itertools import compress
+
+from domain.exceptions import (
+    InvalidQueryException, InvalidAttributeException, InvalidFilterValueException
+)
+from domain.penguin import Penguin
+from repository.bitmap_index import BitmapIndex
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<op><=|>=|==|!=|<|>|=|\(|\)|,)
+      | (?P<word>[A-Za-z_][A-Za-z_0-9]*)
+    )""", re.VERBOSE)
+
+KEYWORDS = {'and', 'or', 'not', 'between', 'in'}
+COMPARISON_OPERATORS = {'<', '<=', '>', '>=', '==', '=', '!='}
+
+
+class QueryNode(ABC):
+    """Base class of plan nodes, every method gets the PenguinRepo to run against"""
+
+    @abstractmethod
+    def estimate(self, repo) -> int:
+        """
+        Estimate the number of matching rows using indexes only
+        :param repo: PenguinRepo
+        :return: estimated row count
+        """
+
+    @abstractmethod
+    def rows(self, repo) -> list:
+        """
+        Get the matching rows
+        :param repo: PenguinRepo
+        :return: ascending list of row ids
+        """
+
+    @abstractmethod
+    def tester(self, repo):
+        """
+        Get a per-row check, used on rows that survived a more selective node
+        :param repo: PenguinRepo
+        :return: function(row id) -> bool
+        """
+
+
+class NumericRange(QueryNode):
+    """low (<|<=) attribute (<|<=) high, answered by the attribute's sorted index"""
+
+    def __init__(self, attribute: str, low: float, high: float,
+                 low_inclusive: bool = True, high_inclusive: bool = True):
+        self.attribute = attribute
+        self.bounds = (low, high, low_inclusive, high_inclusive)
+
+    def estimate(self, repo) -> int:
+        return repo.get_sorted_index(self.attribute).count_in_bounds(*self.bounds)
+
+    def rows(self, repo) -> list:
+        return repo.get_sorted_index(self.attribute).rows_in_bounds(*self.bounds)
+
+    def tester(self, repo):
+        column = repo.get_numeric_column(self.attribute)
+        low, high, low_inclusive, high_inclusive = self.bounds
+        above = operator.le if low_inclusive else operator.lt
+        below = operator.le if high_inclusive else operator.lt
+        return lambda row: above(low, column[row]) and below(column[row], high)
+
+    def __str__(self):
+        low, high, low_inclusive, high_inclusive = self.bounds
+        if low == high:
+            return f"{self.attribute} == {low:g}"
+        if low == -math.inf:
+            return f"{self.attribute} {'<=' if high_inclusive else '<'} {high:g}"
+        if high == math.inf:
+            return f"{self.attribute} {'>=' if low_inclusive else '>'} {low:g}"
+        return f"{self.attribute} between {low:g} and {high:g}"
+
+
+class ValueIn(QueryNode):
+    """attribute in (values) for a string attribute, answered by its bitmap index"""
+
+    def __init__(self, attribute: str, values: list):
+        self.attribute = attribute
+        self.values = values
+
+    def _codes(self, repo) -> set:
+        table = repo.get_table()
+        codes = (table.get_code(self.attribute, value) for value in self.values)
+        return {code for code in codes if code is not None}
+
+    def estimate(self, repo) -> int:
+        index = repo.get_bitmap_index(self.attribute)
+        return sum(index.count(code) for code in self._codes(repo))
+
+    def rows(self, repo) -> list:
+        index = repo.get_bitmap_index(self.attribute)
+        bits = 0
+        for code in self._codes(repo):
+            bits |= index.get_bitmap(code)
+        return BitmapIndex.to_rows(bits)
+
+    def tester(self, repo):
+        column = repo.get_table().get_codes(self.attribute)
+        codes = self._codes(repo)
+        return lambda row: column[row] in codes
+
+    def __str__(self):
+        if len(self.values) == 1:
+            return f"{self.attribute} == {self.values[0]!r}"
+        return f"{self.attribute} in ({', '.join(repr(v) for v in self.values)})"
+
+
+class And(QueryNode):
+    def __init__(self, children: list):
+        self.children = children
+
+    def estimate(self, repo) -> int:
+        return min(child.estimate(repo) for child in self.children)
+
+    def rows(self, repo) -> list:
+        # Most selective child through its index, the rest only on survivors
+        ordered = sorted(self.children, key=lambda child: child.estimate(repo))
+        rows = ordered[0].rows(repo)
+        for child in ordered[1:]:
+            if not rows:
+                break
+            rows = list(filter(child.tester(repo), rows))
+        return rows
+
+    def tester(self, repo):
+        testers = [child.tester(repo) for child in self.children]
+        return lambda row: all(test(row) for test in testers)
+
+    def __str__(self):
+        return " and ".join(f"({child})" if isinstance(child, Or) else str(child)
+                            for child in self.children)
+
+
+class Or(QueryNode):
+    def __init__(self, children: list):
+        self.children = children
+
+    def estimate(self, repo) -> int:
+        return min(repo.get_penguin_count(), sum(child.estimate(repo) for child in self.children))
+
+    def rows(self, repo) -> list:
+        matched = set()
+        for child in self.children:
+            matched.update(child.rows(repo))
+        return sorted(matched)
+
+    def tester(self, repo):
+        testers = [child.tester(repo) for child in self.children]
+        return lambda row: any(test(row) for test in testers)
+
+    def __str__(self):
+        return " or ".join(str(child) for child in self.children)
+
+
+class Not(QueryNode):
+    def __init__(self, child: QueryNode):
+        self.child = child
+
+    def estimate(self, repo) -> int:
+        return repo.get_penguin_count() - self.child.estimate(repo)
+
+    def rows(self, repo) -> list:
+        count = repo.get_penguin_count()
+        keep = bytearray(b'\x01') * count
+        for row in self.child.rows(repo):
+            keep[row] = 0
+        return list(compress(range(count), keep))
+
+    def tester(self, repo):
+        test = self.child.tester(repo)
+        return lambda row: not test(row)
+
+    def __str__(self):
+        if isinstance(self.child, (NumericRange, ValueIn)):
+            return f"not {self.child}"
+        return f"not ({self.child})"
+
+
+class _Parser:
+    def __init__(self, query: str):
+        self.__query = query
+        self.__tokens = self._tokenize(query)
+        self.__position = 0
+
+    def _tokenize(self, query: str) -> list:
+        """
+        Split a query into (kind, text) tokens, kind is one of
+        'number', 'string', 'op', 'word' or 'keyword'
+        """
+        tokens = []
+        position = 0
+        query = query.rstrip()
+        while position < len(query):
+            match = _TOKEN_RE.match(query, position)
+            if match is None or match.end() == position:
+                raise InvalidQueryException(self.__query, f"unexpected character at position {position}")
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == 'word' and text.lower() in KEYWORDS:
+                kind, text = 'keyword', text.lower()
+            elif kind == 'string':
+                text = text[1:-1]
+            tokens.append((kind, text))
+            position = match.end()
+        return tokens
+
+    def _error(self, reason: str):
+        return InvalidQueryException(self.__query, reason)
+
+    def _peek(self) -> tuple:
+        if self.__position < len(self.__tokens):
+            return self.__tokens[self.__position]
+        return None, None
+
+    def _next(self) -> tuple:
+        token = self._peek()
+        if token[0] is None:
+            raise self._error("unexpected end of query")
+        self.__position += 1
+        return token
+
+    def _accept(self, kind: str, text: str) -> bool:
+        if self._peek() == (kind, text):
+            self.__position += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, text: str):
+        if not self._accept(kind, text):
+            found = self._peek()[1]
+            raise self._error(f"expected '{text}'" + (f" but found '{found}'" if found else ""))
+
+    def parse(self) -> QueryNode:
+        if not self.__tokens:
+            raise self._error("empty query")
+        node = self._expression()
+        if self._peek()[0] is not None:
+            raise self._error(f"unexpected '{self._peek()[1]}'")
+        return node
+
+    def _expression(self) -> QueryNode:
+        children = [self._term()]
+        while self._accept('keyword', 'or'):
+            children.append(self._term())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def _term(self) -> QueryNode:
+        children = [self._factor()]
+        while self._accept('keyword', 'and'):
+            children.append(self._factor())
+        return children[0] if len(children) == 1 else And(children)
+
+    def _factor(self) -> QueryNode:
+        if self._accept('keyword', 'not'):
+            return Not(self._factor())
+        if self._accept('op', '('):
+            node = self._expression()
+            self._expect('op', ')')
+            return node
+        return self._predicate()
+
+    def _predicate(self) -> QueryNode:
+        kind, attribute = self._next()
+        if kind != 'word':
+            raise self._error(f"expected an attribute but found '{attribute}'")
+        if attribute not in Penguin.get_all_attributes():
+            raise InvalidAttributeException(attribute, Penguin.get_all_attributes())
+
+        negate = self._accept('keyword', 'not')
+        if self._accept('keyword', 'between'):
+            low = self._value(attribute)
+            self._expect('keyword', 'and')
+            high = self._value(attribute)
+            node = self._between(attribute, low, high)
+        elif self._accept('keyword', 'in'):
+            node = self._in(attribute, self._value_list(attribute))
+        elif negate:
+            raise self._error("'not' after an attribute must be followed by 'between' or 'in'")
+        else:
+            kind, op = self._next()
+            if kind != 'op' or op not in COMPARISON_OPERATORS:
+                raise self._error(f"expected a comparison after '{attribute}' but found '{op}'")
+            node = self._comparison(attribute, op, self._value(attribute))
+        return Not(node) if negate else node
+
+    def _value(self, attribute: str):
+        kind, text = self._next()
+        if kind not in ('number', 'string', 'word'):
+            raise self._error(f"expected a value but found '{text}'")
+        if attribute not in Penguin.get_numeric_attributes():
+            return text
+        try:
+            return float(text)
+        except ValueError:
+            raise InvalidFilterValueException(text, "numeric")
+
+    def _value_list(self, attribute: str) -> list:
+        self._expect('op', '(')
+        values = [self._value(attribute)]
+        while self._accept('op', ','):
+            values.append(self._value(attribute))
+        self._expect('op', ')')
+        return values
+
+    def _comparison(self, attribute: str, op: str, value) -> QueryNode:
+        if attribute not in Penguin.get_numeric_attributes():
+            if op in ('==', '='):
+                return ValueIn(attribute, [value])
+            if op == '!=':
+                return Not(ValueIn(attribute, [value]))
+            raise self._error(f"'{op}' needs a numeric attribute, '{attribute}' is text")
+
+        if op == '!=':
+            return Not(NumericRange(attribute, value, value))
+        bounds = {
+            '<': (-math.inf, value, True, False),
+            '<=': (-math.inf, value, True, True),
+            '>': (value, math.inf, False, True),
+            '>=': (value, math.inf, True, True),
+            '==': (value, value, True, True),
+            '=': (value, value, True, True),
+        }
+        return NumericRange(attribute, *bounds[op])
+
+    def _between(self, attribute: str, low, high) -> QueryNode:
+        if attribute not in Penguin.get_numeric_attributes():
+            raise self._error(f"'between' needs a numeric attribute, '{attribute}' is text")
+        return NumericRange(attribute, low, high)
+
+    def _in(self, attribute: str, values: list) -> QueryNode:
+        if attribute not in Penguin.get_numeric_attributes():
+            return ValueIn(attribute, values)
+        ranges = [NumericRange(attribute, value, value) for value in values]
+        return ranges[0] if len(ranges) == 1 else Or(ranges)
+
+
+def parse_query(query: str) -> QueryNode:
+    """
+    Parse a filter expression into a plan
+
+    Time Complexity: O(t) where t is the number of tokens
+    Space Complexity: O(t)
+
+    :param query: filter expression
+    :return: root QueryNode
+    :raises InvalidQueryException if the expression is malformed
+    :raises InvalidAttributeException if it names an unknown attribute
+    :raises InvalidFilterValueException if a numeric attribute is compared to text
+    """
+    return _Parser(query).parse()
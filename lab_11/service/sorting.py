@@ -0,0 +1,300 @@
+"""
+Sorting Engines
+Sorting algorithms used by PenguinService.sort_data, selectable by name
+
+Every engine has the same signature:
+    engine(items: list, keys: list, reverse: bool) -> list
+keys[i] is the precomputed sort key of items[i], so an engine never calls
+get_attribute during comparisons. The input lists are not modified, a new
+sorted list of items is returned.
+"""
+import math
+import operator
+
+from domain.exceptions import InvalidSortAlgorithmException
+
+# Partitions smaller than this are left to the final insertion sort pass
+INSERTION_SORT_THRESHOLD = 16
+
+
+def _comparator(reverse: bool):
+    """
+    Get the "comes before" relation for an order
+    :param reverse: True for descending order
+    :return: function(a, b) -> True if key a must be placed before key b
+    """
+    return operator.gt if reverse else operator.lt
+
+
+def selection_sort(items: list, keys: list, reverse: bool = False) -> list:
+    """
+    Selection Sort (teaching baseline)
+
+    Time Complexity: O(n^2) comparisons, O(n) swaps
+    Space Complexity: O(n) for the working copies
+
+    :param items: items to sort
+    :param keys: sort key of each item
+    :param reverse: True for descending order
+    :return: new sorted list of items
+    """
+    before = _comparator(reverse)
+    items = list(items)
+    keys = list(keys)
+    n = len(items)
+
+    for i in range(n - 1):
+        # Find the min/max element in remaining unsorted portion
+        extreme_idx = i
+        extreme_key = keys[i]
+        for j in range(i + 1, n):
+            if before(keys[j], extreme_key):
+                extreme_idx = j
+                extreme_key = keys[j]
+
+        if extreme_idx != i:
+            keys[i], keys[extreme_idx] = keys[extreme_idx], keys[i]
+            items[i], items[extreme_idx] = items[extreme_idx], items[i]
+
+    return items
+
+
+def merge_sort(items: list, keys: list, reverse: bool = False) -> list:
+    """
+    Bottom-up Merge Sort (stable)
+
+    Time Complexity: O(n log n) in all cases
+    Space Complexity: O(n) for the merge buffers
+
+    :param items: items to sort
+    :param keys: sort key of each item
+    :param reverse: True for descending order
+    :return: new sorted list of items
+    """
+    before = _comparator(reverse)
+    n = len(items)
+    src_keys, src_items = list(keys), list(items)
+    dst_keys, dst_items = [None] * n, [None] * n
+
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i, j, out = lo, mid, lo
+
+            while i < mid and j < hi:
+                # Take from the right run only if strictly before: keeps equal keys in order
+                if before(src_keys[j], src_keys[i]):
+                    dst_keys[out] = src_keys[j]
+                    dst_items[out] = src_items[j]
+                    j += 1
+                else:
+                    dst_keys[out] = src_keys[i]
+                    dst_items[out] = src_items[i]
+                    i += 1
+                out += 1
+
+            # At most one of the runs still has elements
+            dst_keys[out:out + mid - i] = src_keys[i:mid]
+            dst_items[out:out + mid - i] = src_items[i:mid]
+            out += mid - i
+            dst_keys[out:out + hi - j] = src_keys[j:hi]
+            dst_items[out:out + hi - j] = src_items[j:hi]
+
+        src_keys, dst_keys = dst_keys, src_keys
+        src_items, dst_items = dst_items, src_items
+        width *= 2
+
+    return src_items
+
+
+def _heap_sort_range(keys: list, items: list, lo: int, hi: int, before):
+    """
+    Heap sort keys[lo:hi] (and items alongside) in place
+    The heap is rooted at lo and keeps the element that goes last on top
+    """
+    size = hi - lo
+
+    def sift_down(root: int, end: int):
+        while True:
+            child = 2 * root + 1
+            if child >= end:
+                return
+            if child + 1 < end and before(keys[lo + child], keys[lo + child + 1]):
+                child += 1
+            if not before(keys[lo + root], keys[lo + child]):
+                return
+            a, b = lo + root, lo + child
+            keys[a], keys[b] = keys[b], keys[a]
+            items[a], items[b] = items[b], items[a]
+            root = child
+
+    for start in range(size // 2 - 1, -1, -1):
+        sift_down(start, size)
+
+    for end in range(size - 1, 0, -1):
+        a, b = lo, lo + end
+        keys[a], keys[b] = keys[b], keys[a]
+        items[a], items[b] = items[b], items[a]
+        sift_down(0, end)
+
+
+def heap_sort(items: list, keys: list, reverse: bool = False) -> list:
+    """
+    Heap Sort
+
+    Time Complexity: O(n log n) in all cases
+    Space Complexity: O(n) for the working copies (the sort itself is in place)
+
+    :param items: items to sort
+    :param keys: sort key of each item
+    :param reverse: True for descending order
+    :return: new sorted list of items
+    """
+    items = list(items)
+    keys = list(keys)
+    _heap_sort_range(keys, items, 0, len(items), _comparator(reverse))
+    return items
+
+
+def _insertion_sort(keys: list, items: list, before):
+    """Insertion sort in place, linear on nearly sorted input"""
+    for i in range(1, len(keys)):
+        key, item = keys[i], items[i]
+        j = i - 1
+        while j >= 0 and before(key, keys[j]):
+            keys[j + 1] = keys[j]
+            items[j + 1] = items[j]
+            j -= 1
+        keys[j + 1] = key
+        items[j + 1] = item
+
+
+def _partition(keys: list, items: list, lo: int, hi: int, before) -> int:
+    """
+    Hoare partition of keys[lo:hi] around a median-of-three pivot
+    :return: split index p, every key in [lo, p] is not after every key in [p + 1, hi)
+    """
+    mid = (lo + hi - 1) // 2
+    last = hi - 1
+    # Order lo, mid, last so the median ends up in the middle
+    for a, b in ((lo, mid), (mid, last), (lo, mid)):
+        if before(keys[b], keys[a]):
+            keys[a], keys[b] = keys[b], keys[a]
+            items[a], items[b] = items[b], items[a]
+
+    pivot = keys[mid]
+    i, j = lo - 1, hi
+    while True:
+        i += 1
+        while before(keys[i], pivot):
+            i += 1
+        j -= 1
+        while before(pivot, keys[j]):
+            j -= 1
+        if i >= j:
+            return j
+        keys[i], keys[j] = keys[j], keys[i]
+        items[i], items[j] = items[j], items[i]
+
+
+def intro_sort(items: list, keys: list, reverse: bool = False) -> list:
+    """
+    Introsort: quicksort with median-of-three pivots that switches to heap sort
+    when recursion gets too deep, small partitions are finished by insertion sort
+
+    Time Complexity: O(n log n) worst case
+    Space Complexity: O(log n) stack plus O(n) for the working copies
+
+    :param items: items to sort
+    :param keys: sort key of each item
+    :param reverse: True for descending order
+    :return: new sorted list of items
+    """
+    before = _comparator(reverse)
+    items = list(items)
+    keys = list(keys)
+    n = len(items)
+    if n < 2:
+        return items
+
+    stack = [(0, n, 2 * int(math.log2(n)))]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo > INSERTION_SORT_THRESHOLD:
+            if depth == 0:
+                _heap_sort_range(keys, items, lo, hi, before)
+                break
+            depth -= 1
+            split = _partition(keys, items, lo, hi, before)
+            # Keep looping on the smaller side, defer the larger one
+            if split + 1 - lo < hi - split - 1:
+                stack.append((split + 1, hi, depth))
+                hi = split + 1
+            else:
+                stack.append((lo, split + 1, depth))
+                lo = split + 1
+
+    _insertion_sort(keys, items, before)
+    return items
+
+
+def tim_sort(items: list, keys: list, reverse: bool = False) -> list:
+    """
+    Python's built-in Timsort on the precomputed keys (stable)
+
+    Time Complexity: O(n log n) worst case, O(n) on presorted runs
+    Space Complexity: O(n)
+
+    :param items: items to sort
+    :param keys: sort key of each item
+    :param reverse: True for descending order
+    :return: new sorted list of items
+    """
+    order = sorted(range(len(items)), key=keys.__getitem__, reverse=reverse)
+    return [items[i] for i in order]
+
+
+# name -> (name written to the performance log, engine)
+SORT_ALGORITHMS = {
+    'selection': ('SelectionSort', selection_sort),
+    'merge': ('MergeSort', merge_sort),
+    'heap': ('HeapSort', heap_sort),
+    'intro': ('IntroSort', intro_sort),
+    'timsort': ('Timsort', tim_sort),
+}
+
+DEFAULT_SORT_ALGORITHM = 'selection'
+
+
+def get_sort_algorithm_names() -> list:
+    """
+    Get names accepted by get_sort_algorithm
+    :return: list of algorithm names
+    """
+    return list(SORT_ALGORITHMS.keys())
+
+
+def get_sort_algorithm(name: str) -> tuple:
+    """
+    Look up a sorting engine by name
+    :param name: algorithm name (case-insensitive)
+    :return: tuple (log name, engine function)
+    :raises InvalidSortAlgorithmException if no engine has that name
+    """
+    entry = SORT_ALGORITHMS.get(name.lower())
+    if entry is None:
+        raise InvalidSortAlgorithmException(name, get_sort_algorithm_names())
+    return entry
+
+
+def register_sort_algorithm(name: str, log_name: str, engine):
+    """
+    Add (or replace) a sorting engine
+    :param name: name used to select the engine
+    :param log_name: name written to the performance log
+    :param engine: function(items, keys, reverse) -> sorted list
+    :return: -
+    """
+    SORT_ALGORITHMS[name.lower()] = (log_name, engine)
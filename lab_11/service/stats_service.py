@@ -100,19 +100,13 @@ class StatsService:
         if groupby not in ['island', 'species']:
             raise InvalidAttributeException(groupby, ['island', 'species'])
 
-        penguins = self.__penguin_repo.get_all_penguins()
-        
-        # Group data
-        groups = {}
-        for penguin in penguins:
-            group_key = penguin.get_attribute(groupby)
-            if group_key not in groups:
-                groups[group_key] = []
-            groups[group_key].append(penguin.get_attribute(attribute))
+        # Same grouping as PenguinService.group_by, keys are 1-tuples
+        groups = self.__penguin_repo.group_values([groupby], attribute)
 
         # Sort groups for consistent display
-        sorted_groups = sorted(groups.keys())
-        data = [groups[g] for g in sorted_groups]
+        sorted_keys = sorted(groups.keys())
+        sorted_groups = [key[0] for key in sorted_keys]
+        data = [groups[key] for key in sorted_keys]
 
         plt.figure(figsize=(10, 6))
         bp = plt.boxplot(data, labels=sorted_groups, patch_artist=True)
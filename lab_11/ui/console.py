@@ -3,17 +3,25 @@ Console UI
 Command-line interface for the Penguin Data Application
 """
 import random
+from collections import Counter
 
 from domain.penguin import Penguin
 from domain.exceptions import (
     PenguinAppException, InvalidCommandException, FileNotFoundException
 )
+from repository.penguin_repo_file import PenguinRepoFile
 from service.penguin_service import PenguinService
 from service.stats_service import StatsService
 from service.classifier_service import ClassifierService
+from service.partition import MIN_GROUP_SIZE
+from service.quantile_sketch import DEFAULT_EPSILON
+from service.sorting import DEFAULT_SORT_ALGORITHM, get_sort_algorithm_names
 
 
 class Console:
+    # Results printed before asking whether to continue
+    PAGE_SIZE = 10
+
     def __init__(self, penguin_service: PenguinService, stats_service: StatsService,
                  classifier_service: ClassifierService):
         self.__penguin_service = penguin_service
@@ -43,21 +51,31 @@ class Console:
         print("\n1. print available_data")
         print("2. load")
         print("3. save_random")
-        print("4. filter")
-        print("5. describe")
-        print("6. unique")
-        print("7. sort")
-        print("8. augment")
-        print("9. generate research_groups")
-        print("10. split_into_groups")
-        print("11. scatter")
-        print("12. hist")
-        print("13. boxplot")
-        print("14. classify")
-        print("15. random_fact")
-        print("16. draw_penguin")
-        print("17. help")
-        print("18. quit")
+        print("4. save_columnar")
+        print("5. filter")
+        print("6. query")
+        print("7. describe")
+        print("8. unique")
+        print("9. group_by")
+        print("10. sort")
+        print("11. augment")
+        print("12. generate research_groups")
+        print("13. count research_groups")
+        print("14. split_into_groups")
+        print("15. count splits")
+        print("16. balanced_split")
+        print("17. scatter")
+        print("18. hist")
+        print("19. boxplot")
+        print("20. classify")
+        print("21. predict")
+        print("22. evaluate")
+        print("23. save_model")
+        print("24. load_model")
+        print("25. random_fact")
+        print("26. draw_penguin")
+        print("27. help")
+        print("28. quit")
 
     @staticmethod
     def print_quick_commands():
@@ -65,30 +83,40 @@ class Console:
         print("\n1. print available_data")
         print("2. load")
         print("3. save_random")
-        print("4. filter")
-        print("5. describe")
-        print("6. unique")
-        print("7. sort")
-        print("8. augment")
-        print("9. generate research_groups")
-        print("10. split_into_groups")
-        print("11. scatter")
-        print("12. hist")
-        print("13. boxplot")
-        print("14. classify")
-        print("15. random_fact")
-        print("16. draw_penguin")
-        print("17. help")
-        print("18. quit")
+        print("4. save_columnar")
+        print("5. filter")
+        print("6. query")
+        print("7. describe")
+        print("8. unique")
+        print("9. group_by")
+        print("10. sort")
+        print("11. augment")
+        print("12. generate research_groups")
+        print("13. count research_groups")
+        print("14. split_into_groups")
+        print("15. count splits")
+        print("16. balanced_split")
+        print("17. scatter")
+        print("18. hist")
+        print("19. boxplot")
+        print("20. classify")
+        print("21. predict")
+        print("22. evaluate")
+        print("23. save_model")
+        print("24. load_model")
+        print("25. random_fact")
+        print("26. draw_penguin")
+        print("27. help")
+        print("28. quit")
 
     def handle_print_available(self):
         """Handle 'print available_data' command"""
         files = self.__penguin_service.get_available_files()
         if not files:
-            print("No CSV files found in data directory.")
+            print("No data files found in data directory.")
             print("Please add CSV files to the 'data' folder.")
         else:
-            print(f"\nAvailable CSV files ({len(files)}):")
+            print(f"\nAvailable data files ({len(files)}):")
             for f in files:
                 print(f"  - {f}")
 
@@ -101,11 +129,30 @@ class Console:
             print(f"Error: {e}")
             print("Use 'print available_data' to see available files.")
 
+    def handle_save_columnar(self, filename: str):
+        """Handle 'save_columnar <filename>' command"""
+        count = self.__penguin_service.save_columnar(filename)
+        print(f"Saved {count} penguins in columnar format. Load it with 'load <name>.pcol'.")
+
     def handle_filter(self, attribute: str, value: str):
         """Handle 'filter <attribute> <value>' command"""
         filtered = self.__penguin_service.filter_data(attribute, value)
+        self._report_filtered(filtered)
+
+    def handle_filter_range(self, attribute: str, low: str, high: str):
+        """Handle 'filter <attribute> <low> <high>' command"""
+        filtered = self.__penguin_service.filter_range(attribute, low, high)
+        self._report_filtered(filtered)
+
+    def handle_query(self, query: str):
+        """Handle 'query <expression>' command"""
+        filtered = self.__penguin_service.query_data(query)
+        self._report_filtered(filtered)
+
+    def _report_filtered(self, filtered: list):
+        """Print the number of filtered penguins and offer to save them"""
         print(f"\nFilter results: {len(filtered)} penguins match the criteria")
-        
+
         if filtered:
             save = input("Do you want to save this data to a new file? (y/n): ").strip().lower()
             if save == 'y':
@@ -123,6 +170,48 @@ class Console:
         print(f"  Maximum: {stats['max']}")
         print(f"  Mean:    {stats['mean']}")
 
+    def handle_describe_all(self):
+        """Handle 'describe *' command"""
+        described = self.__penguin_service.describe_all()
+        columns = ['count', 'min', 'max', 'mean', 'std', 'q1', 'median', 'q3']
+        print(f"\n{'attribute':20}" + "".join(f"{c:>10}" for c in columns))
+        for attribute, stats in described.items():
+            print(f"{attribute:20}" + "".join(f"{stats[c]:>10g}" for c in columns))
+
+    def handle_describe_approximate(self, filename: str, epsilon: str = None):
+        """Handle 'describe approx <filename> [epsilon]' command"""
+        try:
+            epsilon = float(epsilon) if epsilon is not None else DEFAULT_EPSILON
+        except ValueError:
+            print(f"Invalid epsilon: {epsilon}")
+            return
+        if not 0 < epsilon < 1:
+            print("Epsilon must be between 0 and 1 (e.g. 0.01)")
+            return
+        described = self.__penguin_service.describe_approximate(filename, epsilon)
+        columns = ['count', 'min', 'max', 'mean', 'std'] + \
+            [f'p{p}' for p in self.__penguin_service.APPROXIMATE_PERCENTILES]
+        print(f"\nStreaming statistics for '{filename}' (percentiles within {epsilon:.2%} of rank):")
+        print(f"{'attribute':20}" + "".join(f"{c:>10}" for c in columns))
+        for attribute, stats in described.items():
+            print(f"{attribute:20}" + "".join(f"{stats[c]:>10g}" for c in columns))
+
+    def handle_group_by(self, keys: str, specs: list):
+        """Handle 'group_by <key[,key...]> <attr[:func,func...]> ...' command"""
+        aggregations = {}
+        for spec in specs:
+            attribute, _, functions = spec.partition(':')
+            aggregations[attribute] = [f for f in functions.split(',') if f]
+        key_names = [k for k in keys.split(',') if k]
+        grouped = self.__penguin_service.group_by(key_names, aggregations)
+
+        columns = [(attr, function) for attr, functions in next(iter(grouped.values())).items()
+                   for function in functions] if grouped else []
+        print(f"\n{' / '.join(key_names):30}" + "".join(f"{f'{f}({a})':>26}" for a, f in columns))
+        for key, values in grouped.items():
+            label = ' / '.join(str(k) for k in key)
+            print(f"{label:30}" + "".join(f"{values[a][f]:>26g}" for a, f in columns))
+
     def handle_unique(self, attribute: str):
         """Handle 'unique <attribute>' command"""
         unique_vals = self.__penguin_service.unique_values(attribute)
@@ -130,10 +219,10 @@ class Console:
         for val, count in sorted(unique_vals.items(), key=lambda x: -x[1]):
             print(f"  {val}: {count} penguins")
 
-    def handle_sort(self, attribute: str, order: str):
-        """Handle 'sort <attribute> <asc|desc>' command"""
-        sorted_penguins = self.__penguin_service.sort_data(attribute, order)
-        print(f"\nData sorted by '{attribute}' in {order}ending order.")
+    def handle_sort(self, attribute: str, order: str, algorithm: str = DEFAULT_SORT_ALGORITHM):
+        """Handle 'sort <attribute> <asc|desc> [algorithm]' command"""
+        sorted_penguins = self.__penguin_service.sort_data(attribute, order, algorithm)
+        print(f"\nData sorted by '{attribute}' in {order}ending order using {algorithm} sort.")
         print(f"Total: {len(sorted_penguins)} penguins")
         print("(Performance logged to sort_performance.log)")
         
@@ -142,8 +231,11 @@ class Console:
         for i, p in enumerate(sorted_penguins[:5]):
             print(f"  {i+1}. {p.get_attribute(attribute)} - {p.get_species()} ({p.get_island()})")
 
-    def handle_augment(self, percent: str, mode: str):
-        """Handle 'augment <percent> <duplicate|create>' command"""
+    def handle_augment(self, percent: str, mode: str, filename: str = None, seed: str = None):
+        """Handle 'augment <percent> <duplicate|create> [filename [seed]]' command"""
+        if filename is not None:
+            self.handle_augment_to_file(percent, mode, filename, seed)
+            return
         augmented, suggested_filename = self.__penguin_service.augment_data(percent, mode)
         print(f"\nAugmented dataset created: {len(augmented)} penguins")
         
@@ -160,6 +252,20 @@ class Console:
         else:
             print("Data not saved.")
 
+    def handle_augment_to_file(self, percent: str, mode: str, filename: str, seed: str = None):
+        """Stream an augmented dataset straight to a CSV or .pcol file"""
+        try:
+            seed_val = int(seed) if seed is not None else None
+        except ValueError:
+            print("Error: seed must be a valid integer")
+            return
+        if not filename.endswith('.csv') and not filename.endswith(PenguinRepoFile.COLUMNAR_SUFFIX):
+            filename += '.csv'
+
+        report = self.__penguin_service.augment_to_file(percent, mode, filename, seed_val)
+        print(f"\nWrote {report['rows']} penguins ({report['added']} added) to '{report['filename']}' "
+              f"in {report['seconds']:.2f}s (seed {report['seed']})")
+
     def handle_scatter(self, attr1: str, attr2: str):
         """Handle 'scatter <attr1> <attr2>' command"""
         print(f"Generating scatter plot: {attr1} vs {attr2}...")
@@ -207,6 +313,62 @@ class Console:
         print(f"  Vote Distribution: {result['votes']}")
         print(f"  k neighbors used: {result['k_used']}")
 
+    def handle_predict(self, input_file: str, output_file: str, k: str, workers: str = "1"):
+        """Handle 'predict <input_file> <output_file> <k> [workers]' command"""
+        try:
+            k_val = int(k)
+            workers_val = int(workers)
+        except ValueError:
+            print("Error: k and workers must be integers")
+            return
+        if k_val <= 0 or workers_val <= 0:
+            print("Error: k and workers must be positive integers")
+            return
+
+        report = self.__classifier_service.predict_file(input_file, output_file, k_val, workers_val)
+        print(f"Classified {report['classified']} of {report['rows']} rows into '{output_file}' "
+              f"({report['skipped']} skipped, {report['workers']} workers, {report['seconds']:.3f}s)")
+
+    def handle_evaluate(self, k_values: str, folds: str = "loo", workers: str = "1"):
+        """Handle 'evaluate <k[,k...]> [folds|loo] [workers]' command"""
+        try:
+            ks = [int(k) for k in k_values.split(',') if k]
+            folds_val = None if folds.lower() == 'loo' else int(folds)
+            workers_val = int(workers)
+        except ValueError:
+            print("Error: k values, folds and workers must be integers")
+            return
+        if workers_val <= 0:
+            print("Error: workers must be a positive integer")
+            return
+
+        report = self.__classifier_service.evaluate(ks, folds_val, workers_val)
+        folds_label = "leave-one-out" if report['folds'] == 'loo' else f"{report['folds']}-fold"
+        print(f"\n{folds_label} cross-validation:")
+        for k, result in report['results'].items():
+            print(f"  k={k:<4} accuracy {result['accuracy']:6.2f}% ({result['correct']}/{result['total']})")
+
+        best = report['best_k']
+        confusion = report['results'][best]['confusion']
+        species = sorted(set(confusion) | {p for row in confusion.values() for p in row})
+        width = max(len(s) for s in species) + 2
+        print(f"\nBest k: {best}. Confusion matrix (rows: actual, columns: predicted):")
+        print(" " * width + "".join(f"{s:>{width}}" for s in species))
+        for actual in species:
+            row = confusion.get(actual, {})
+            print(f"{actual:<{width}}" + "".join(f"{row.get(p, 0):>{width}}" for p in species))
+
+    def handle_save_model(self, filename: str):
+        """Handle 'save_model <filename>' command"""
+        self.__classifier_service.save_model(filename)
+        print(f"Saved the classifier model ({len(self.__classifier_service.get_model())} penguins) to '{filename}'")
+
+    def handle_load_model(self, filename: str):
+        """Handle 'load_model <filename>' command"""
+        count = self.__classifier_service.load_model(filename)
+        print(f"Loaded a classifier model of {count} penguins from '{filename}' "
+              f"(used until the data changes)")
+
     def handle_random_fact(self):
         """Handle 'random_fact' command"""
         fact = random.choice(self.__penguin_facts)
@@ -235,64 +397,155 @@ class Console:
         except ValueError as e:
             print(f"Error: {e}")
 
-    def handle_generate_research_groups(self, k: str):
-        """Handle 'generate research_groups <k>' command"""
+    def handle_generate_research_groups(self, k: str, limit: str = None):
+        """Handle 'generate research_groups <k> [limit]' command, one page of groups at a time"""
         try:
             k_val = int(k)
             if k_val < 3:
                 print("Error: k must be at least 3")
                 return
+            limit_val = int(limit) if limit is not None else PenguinService.RESEARCH_GROUP_LIMIT
+            if limit_val <= 0:
+                print("Error: limit must be a positive integer")
+                return
         except ValueError:
-            print("Error: k must be a valid integer")
+            print("Error: k and limit must be valid integers")
             return
         
         try:
-            groups = self.__penguin_service.generate_research_groups(k_val)
-            if not groups:
-                print(f"\nNo valid research groups of size {k_val} found.")
-                print("A valid group must have at least one penguin from each species.")
-            else:
-                print(f"\n🔬 Found {len(groups)} valid research group(s) of size {k_val}:")
-                print("-" * 50)
-                for i, group in enumerate(groups, 1):
-                    print(f"\nGroup {i}:")
-                    for p in group:
-                        print(f"  - {p.get_species()} ({p.get_island()}, {p.get_sex()}, {p.get_body_mass_g()}g)")
+            groups = self.__penguin_service.iter_research_groups(k_val, limit_val)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        print(f"\n🔬 Research groups of size {k_val} (at most {limit_val}):")
+        print("-" * 50)
+        shown = 0
+        for group in groups:
+            shown += 1
+            print(f"\nGroup {shown}:")
+            for p in group:
+                print(f"  - {p.get_species()} ({p.get_island()}, {p.get_sex()}, {p.get_body_mass_g()}g)")
+            if shown % self.PAGE_SIZE == 0 and shown < limit_val:
+                if input("\n-- Enter for more, q to stop -- ").strip().lower() == 'q':
+                    break
+
+        if shown == 0:
+            print(f"\nNo valid research groups of size {k_val} found.")
+            print("A valid group must have at least one penguin from each species.")
+        else:
+            print(f"\nListed {shown} group(s).")
+
+    def handle_count_research_groups(self, k: str):
+        """Handle 'count research_groups <k>' command"""
+        try:
+            k_val = int(k)
+        except ValueError:
+            print("Error: k must be a valid integer")
+            return
+
+        try:
+            count = self.__penguin_service.count_research_groups(k_val)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"\n🔬 {count} valid research group(s) of size {k_val} "
+              f"(at least one penguin from each species)")
+
+    def handle_balanced_split(self, min_size: str = None):
+        """Handle 'balanced_split [min_size]' command"""
+        try:
+            min_size_val = int(min_size) if min_size is not None else MIN_GROUP_SIZE
+        except ValueError:
+            print("Error: min_size must be a valid integer")
+            return
+
+        try:
+            report = self.__penguin_service.balanced_split(min_size_val)
         except ValueError as e:
             print(f"Error: {e}")
+            return
 
-    def handle_split_into_groups(self, threshold: str):
-        """Handle 'split_into_groups <body_mass_threshold>' command"""
+        method = "optimal" if report['optimal'] else "heuristic"
+        print(f"\n⚖️ Balanced split ({method}, {report['method']}, "
+              f"solved in {report['seconds'] * 1000:.1f} ms):")
+        for name, group, mass in zip("AB", report['groups'], report['masses']):
+            species_counts = Counter(p.get_species() for p in group)
+            breakdown = ", ".join(f"{species}: {count}" for species, count in sorted(species_counts.items()))
+            print(f"  Group {name} ({len(group)} penguins, total mass: {mass:.0f}g) - {breakdown}")
+        print(f"  Imbalance: {report['imbalance']:.0f}g")
+
+    def handle_split_into_groups(self, threshold: str, limit: str = None):
+        """Handle 'split_into_groups <body_mass_threshold> [limit]' command, one page of splits at a time"""
         try:
             threshold_val = float(threshold)
             if threshold_val <= 0:
                 print("Error: threshold must be positive")
                 return
+            limit_val = int(limit) if limit is not None else PenguinService.SPLIT_LIMIT
+            if limit_val <= 0:
+                print("Error: limit must be a positive integer")
+                return
         except ValueError:
-            print("Error: threshold must be a valid number")
+            print("Error: threshold must be a valid number and limit a valid integer")
             return
         
         try:
-            splits = self.__penguin_service.split_into_groups(threshold_val)
-            if not splits:
-                print(f"\nNo valid splits found with mass threshold {threshold_val}g.")
-                print("Each group needs at least 2 penguins and total mass <= threshold.")
-            else:
-                print(f"\n✂️ Found {len(splits)} valid way(s) to split penguins:")
+            splits = self.__penguin_service.iter_splits(threshold_val)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        # Splits are counted while they are listed, so the search runs only once
+        shown = 0
+        complete = True
+        for g1, g2 in splits:
+            if shown == 0:
+                print(f"\n✂️ Valid ways to split penguins, showing at most {limit_val}:")
                 print(f"   (Each group has ≥2 penguins and total mass ≤ {threshold_val}g)")
                 print("-" * 60)
-                for i, (g1, g2) in enumerate(splits, 1):
-                    mass1 = sum(p.get_body_mass_g() for p in g1)
-                    mass2 = sum(p.get_body_mass_g() for p in g2)
-                    print(f"\nSplit {i}:")
-                    print(f"  Group A ({len(g1)} penguins, total mass: {mass1}g):")
-                    for p in g1:
-                        print(f"    - {p.get_species()} ({p.get_body_mass_g()}g)")
-                    print(f"  Group B ({len(g2)} penguins, total mass: {mass2}g):")
-                    for p in g2:
-                        print(f"    - {p.get_species()} ({p.get_body_mass_g()}g)")
+            elif shown == limit_val:
+                complete = False
+                break
+            elif shown % self.PAGE_SIZE == 0:
+                if input("\n-- Enter for more, q to stop -- ").strip().lower() == 'q':
+                    complete = False
+                    break
+            shown += 1
+            mass1 = sum(p.get_body_mass_g() for p in g1)
+            mass2 = sum(p.get_body_mass_g() for p in g2)
+            print(f"\nSplit {shown}:")
+            print(f"  Group A ({len(g1)} penguins, total mass: {mass1}g):")
+            for p in g1:
+                print(f"    - {p.get_species()} ({p.get_body_mass_g()}g)")
+            print(f"  Group B ({len(g2)} penguins, total mass: {mass2}g):")
+            for p in g2:
+                print(f"    - {p.get_species()} ({p.get_body_mass_g()}g)")
+
+        if shown == 0:
+            print(f"\nNo valid splits found with mass threshold {threshold_val}g.")
+            print("Each group needs at least 2 penguins and total mass <= threshold.")
+        elif complete:
+            print(f"\nFound {shown} valid split(s).")
+        else:
+            print(f"\nListed {shown} split(s), more exist. "
+                  f"Use 'count splits {threshold}' for the total.")
+
+    def handle_count_splits(self, threshold: str):
+        """Handle 'count splits <body_mass_threshold>' command"""
+        try:
+            threshold_val = float(threshold)
+        except ValueError:
+            print("Error: threshold must be a valid number")
+            return
+
+        try:
+            count = self.__penguin_service.count_splits(threshold_val)
         except ValueError as e:
             print(f"Error: {e}")
+            return
+        print(f"\n✂️ {count} valid way(s) to split penguins "
+              f"(each group has ≥2 penguins and total mass ≤ {threshold_val}g)")
 
     @staticmethod
     def handle_draw_penguin():
@@ -350,28 +603,68 @@ class Console:
                     else:
                         self.handle_save_random(parts[1], parts[2])
 
+                elif command == 'save_columnar':
+                    if len(parts) < 2:
+                        print("Usage: save_columnar <filename>")
+                    else:
+                        self.handle_save_columnar(parts[1])
+
                 elif command == 'generate':
                     if len(parts) >= 3 and parts[1].lower() == 'research_groups':
-                        self.handle_generate_research_groups(parts[2])
+                        self.handle_generate_research_groups(*parts[2:4])
+                    else:
+                        print("Usage: generate research_groups <k> [limit]")
+
+                elif command == 'count':
+                    if len(parts) >= 3 and parts[1].lower() == 'research_groups':
+                        self.handle_count_research_groups(parts[2])
+                    elif len(parts) >= 3 and parts[1].lower() == 'splits':
+                        self.handle_count_splits(parts[2])
                     else:
-                        print("Usage: generate research_groups <k>")
+                        print("Usage: count research_groups <k> | count splits <body_mass_threshold>")
 
                 elif command == 'split_into_groups':
                     if len(parts) < 2:
-                        print("Usage: split_into_groups <body_mass_threshold>")
+                        print("Usage: split_into_groups <body_mass_threshold> [limit]")
                     else:
-                        self.handle_split_into_groups(parts[1])
+                        self.handle_split_into_groups(*parts[1:3])
+
+                elif command == 'balanced_split':
+                    self.handle_balanced_split(*parts[1:2])
 
                 elif command == 'filter':
                     if len(parts) < 3:
-                        print("Usage: filter <attribute> <value>")
+                        print("Usage: filter <attribute> <value> | filter <attribute> <low> <high>")
+                    elif len(parts) >= 4:
+                        self.handle_filter_range(parts[1], parts[2], parts[3])
                     else:
                         self.handle_filter(parts[1], parts[2])
 
+                elif command == 'query':
+                    if len(parts) < 2:
+                        print("Usage: query <expression>  "
+                              "(e.g. query species == Gentoo and body_mass_g between 4000 and 5000)")
+                    else:
+                        self.handle_query(user_input.split(None, 1)[1])
+
+                elif command == 'group_by':
+                    if len(parts) < 3:
+                        print("Usage: group_by <key[,key...]> <attribute[:func,func...]> ...")
+                        print(f"Functions: {', '.join(PenguinService.AGGREGATIONS)} (default: all)")
+                    else:
+                        self.handle_group_by(parts[1], parts[2:])
+
                 elif command == 'describe':
                     if len(parts) < 2:
-                        print("Usage: describe <attribute>")
+                        print("Usage: describe <attribute> | describe * | describe approx <filename> [epsilon]")
                         print(f"Numeric attributes: {', '.join(Penguin.get_numeric_attributes())}")
+                    elif parts[1] == '*':
+                        self.handle_describe_all()
+                    elif parts[1] == 'approx':
+                        if len(parts) < 3:
+                            print("Usage: describe approx <filename> [epsilon]")
+                        else:
+                            self.handle_describe_approximate(parts[2], parts[3] if len(parts) > 3 else None)
                     else:
                         self.handle_describe(parts[1])
 
@@ -384,15 +677,18 @@ class Console:
 
                 elif command == 'sort':
                     if len(parts) < 3:
-                        print("Usage: sort <attribute> <asc|desc>")
+                        print("Usage: sort <attribute> <asc|desc> [algorithm]")
+                        print(f"Algorithms: {', '.join(get_sort_algorithm_names())} (default: {DEFAULT_SORT_ALGORITHM})")
+                    elif len(parts) >= 4:
+                        self.handle_sort(parts[1], parts[2], parts[3])
                     else:
                         self.handle_sort(parts[1], parts[2])
 
                 elif command == 'augment':
                     if len(parts) < 3:
-                        print("Usage: augment <percent> <duplicate|create>")
+                        print("Usage: augment <percent> <duplicate|create> [filename [seed]]")
                     else:
-                        self.handle_augment(parts[1], parts[2])
+                        self.handle_augment(*parts[1:5])
 
                 elif command == 'scatter':
                     if len(parts) < 3:
@@ -419,6 +715,30 @@ class Console:
                     else:
                         self.handle_classify(parts[1], parts[2], parts[3], parts[4])
 
+                elif command == 'predict':
+                    if len(parts) < 4:
+                        print("Usage: predict <input_file> <output_file> <k> [workers]")
+                    else:
+                        self.handle_predict(*parts[1:5])
+
+                elif command == 'evaluate':
+                    if len(parts) < 2:
+                        print("Usage: evaluate <k[,k...]> [folds|loo] [workers]")
+                    else:
+                        self.handle_evaluate(*parts[1:4])
+
+                elif command == 'save_model':
+                    if len(parts) < 2:
+                        print("Usage: save_model <filename>")
+                    else:
+                        self.handle_save_model(parts[1])
+
+                elif command == 'load_model':
+                    if len(parts) < 2:
+                        print("Usage: load_model <filename>")
+                    else:
+                        self.handle_load_model(parts[1])
+
                 elif command == 'random_fact':
                     self.handle_random_fact()
 